@@ -0,0 +1,295 @@
+"""
+Caches for the API.
+
+Data only changes when the scraper stores a new batch, so everything here is
+keyed by the database's data key (its instance id plus data version, so a
+different database at the same version never matches):
+
+- SharedCache keeps expensive payloads (dashboard, latest snapshot) on disk so
+  every uvicorn worker serves the same copy and only one of them rebuilds it.
+- cached_response is a per-process LRU + TTL cache for read endpoints, keyed by
+  endpoint and normalized query params.
+
+Both keep payloads as rendered JSON bytes, so a hit is sent without being
+encoded again.
+"""
+import os
+import re
+import sys
+import time
+import inspect
+import tempfile
+import functools
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows — fall back to unlocked builds
+    fcntl = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from database import get_data_key, get_data_version
+from api.responses import ProfiledJSONResponse, dumps, loads
+
+CACHE_DIR = os.environ.get("PH_CACHE_DIR") or os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "data", "cache"
+)
+
+# How often a worker re-reads the data version from SQLite
+VERSION_POLL_INTERVAL = 5  # seconds
+
+_version = 0
+_data_key = ""
+_version_checked_at = 0.0
+
+
+def _poll_version():
+    global _version, _data_key, _version_checked_at
+
+    now = time.time()
+    if now - _version_checked_at > VERSION_POLL_INTERVAL:
+        _data_key = get_data_key()
+        _version = get_data_version()
+        _version_checked_at = now
+
+
+def current_data_version() -> int:
+    """Get the data version, re-reading it from the database at most every few seconds."""
+    _poll_version()
+    return _version
+
+
+def current_data_key() -> str:
+    """Get the data key (database instance id + data version), polled like current_data_version()."""
+    _poll_version()
+    return _data_key
+
+
+class SharedCache:
+    """On-disk JSON cache keyed by name and data key, shared across worker processes.
+
+    get() returns the payload; get_rendered() returns its JSON encoding (the
+    bytes of the on-disk file), which endpoints can send without re-encoding.
+    """
+
+    def __init__(self, cache_dir: str = None):
+        self.cache_dir = cache_dir or CACHE_DIR
+        self._local = {}  # name -> [data key, built_at, payload or None until parsed, body]
+        self.hits = 0
+        self.disk_hits = 0
+        self.builds = 0
+
+    def _path(self, name: str, version: str) -> str:
+        return os.path.join(self.cache_dir, f"{name}-{version}.json")
+
+    def get(self, name: str, builder: Callable[[], Dict], ttl: float = None) -> Dict:
+        """Return the cached payload for the current data key, building it if needed."""
+        return self.get_both(name, builder, ttl)[0]
+
+    def get_rendered(self, name: str, builder: Callable[[], Dict], ttl: float = None) -> bytes:
+        """Like get(), but return the payload as JSON bytes."""
+        return self._entry(name, builder, ttl)[3]
+
+    def get_both(self, name: str, builder: Callable[[], Dict], ttl: float = None) -> Tuple[Dict, bytes]:
+        """(payload, JSON bytes); a payload read from disk is parsed once per process."""
+        entry = self._entry(name, builder, ttl)
+        if entry[2] is None:
+            entry[2] = loads(entry[3])
+        return entry[2], entry[3]
+
+    def _entry(self, name: str, builder: Callable[[], Dict], ttl: float = None) -> list:
+        version = current_data_key()
+        now = time.time()
+
+        entry = self._local.get(name)
+        if entry and entry[0] == version and (ttl is None or now - entry[1] <= ttl):
+            self.hits += 1
+            return entry
+
+        body = self._read(name, version, ttl)
+        if body is None:
+            entry = [version, now, *self._build(name, version, builder, ttl)]
+        else:
+            self.disk_hits += 1
+            entry = [version, now, None, body]
+
+        self._local[name] = entry
+        return entry
+
+    def clear(self):
+        """Drop this process's copies; on-disk entries are left for other workers."""
+        self._local.clear()
+
+    def stats(self) -> Dict:
+        return {
+            "entries": sorted(self._local),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "builds": self.builds,
+        }
+
+    def _read(self, name: str, version: str, ttl: float = None):
+        path = self._path(name, version)
+        try:
+            if ttl is not None and time.time() - os.path.getmtime(path) > ttl:
+                return None
+            with open(path, "rb") as f:
+                return f.read() or None
+        except OSError:
+            return None
+
+    def _build(self, name: str, version: str, builder: Callable[[], Dict], ttl: float = None) -> Tuple:
+        """Build (or pick up another worker's build of) the payload. Returns (payload or None, body)."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        lock_path = os.path.join(self.cache_dir, f"{name}.lock")
+
+        with open(lock_path, "w") as lock:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                # Another worker may have finished the build while we waited
+                body = self._read(name, version, ttl)
+                if body is not None:
+                    return None, body
+
+                payload = builder()
+                body = dumps(payload)
+                self.builds += 1
+                self._write(name, version, body)
+                return payload, body
+            finally:
+                if fcntl:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _write(self, name: str, version: str, body: bytes):
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=f".{name}-", suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(body)
+        os.replace(tmp_path, self._path(name, version))
+
+        # Remove payloads from older data versions and other databases
+        pattern = re.compile(rf"{re.escape(name)}-(?:[0-9a-f]+-)?v\d+\.json")
+        for filename in os.listdir(self.cache_dir):
+            if pattern.fullmatch(filename) and filename != os.path.basename(self._path(name, version)):
+                try:
+                    os.remove(os.path.join(self.cache_dir, filename))
+                except OSError:
+                    pass
+
+
+shared_cache = SharedCache()
+
+
+# ============================================================
+# Per-endpoint response cache
+# ============================================================
+
+RESPONSE_CACHE_TTL = 3600  # 1 hour; data versions normally invalidate sooner
+
+_response_caches: Dict[str, "ResponseCache"] = {}
+
+
+class ResponseCache:
+    """LRU + TTL cache for one endpoint; entries are dropped when the data key changes."""
+
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (stored_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key, version: str):
+        with self._lock:
+            if version != self.version:
+                self._entries.clear()
+                self.version = version
+            entry = self._entries.get(key)
+            if entry and time.time() - entry[0] <= self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            self.misses += 1
+            return False, None
+
+    def put(self, key, version: str, value):
+        with self._lock:
+            if version != self.version:
+                return
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "endpoint": self.name,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+def _normalize(value):
+    """Make query param values hashable (repeated params arrive as lists)."""
+    if isinstance(value, (list, tuple)):
+        return tuple(_normalize(v) for v in value)
+    return value
+
+
+def cached_response(maxsize: int = 128, ttl: float = RESPONSE_CACHE_TTL):
+    """Cache an endpoint's response by its (defaulted) arguments and the data key.
+
+    The endpoint's payload is rendered to JSON once, when it is computed, and
+    the cache stores those bytes. Every call returns a ProfiledJSONResponse,
+    so FastAPI's jsonable_encoder never runs for these endpoints. Payloads
+    must hold only types dumps() can encode.
+    """
+    def decorator(func):
+        cache = ResponseCache(func.__name__, maxsize, ttl)
+        _response_caches[func.__name__] = cache
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = tuple(sorted((k, _normalize(v)) for k, v in bound.arguments.items()))
+            version = current_data_key()
+
+            found, body = cache.get(key, version)
+            if not found:
+                body = ProfiledJSONResponse(func(*args, **kwargs)).body
+                cache.put(key, version, body)
+            return ProfiledJSONResponse(body)
+
+        wrapper.cache = cache
+        return wrapper
+    return decorator
+
+
+def response_cache_stats() -> List[Dict]:
+    """Hit/miss/eviction counters for every cached endpoint."""
+    return [cache.stats() for cache in _response_caches.values()]
+
+
+def clear_response_caches():
+    for cache in _response_caches.values():
+        cache.clear()
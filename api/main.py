@@ -7,30 +7,86 @@ import sys
 import io
 import csv
 import time
-import json as jsonlib
-from datetime import datetime, timedelta
+from contextlib import asynccontextmanager
+from datetime import date as date_cls, datetime
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from fastapi import FastAPI, Query, HTTPException, Response
+import numpy as np
+from fastapi import FastAPI, Query, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, StreamingResponse
-from typing import Optional
+from fastapi.responses import StreamingResponse, FileResponse, PlainTextResponse
+from typing import List, Optional
 from database import (
     get_prices_by_date, get_latest_prices, get_commodity_history,
     get_all_commodities, get_date_range, search_prices, get_stats,
-    get_categories, get_prices_range, export_all
+    get_categories, get_prices_range, export_chunks, get_history_batch,
+    iter_changes, get_change_seq, warm_db
 )
+from exports import get_columnar_export
+from metrics import MetricsMiddleware, register_collector, render as render_metrics
+from profiling import SlowLogMiddleware, sampler
+from api.matrix import get_matrix
+from api.cache import shared_cache, cached_response, response_cache_stats, current_data_key, current_data_version
+from api.responses import ProfiledJSONResponse, dumps
 
 # ============================================================
-# Dashboard Cache — computed once, served to all users
+# Dashboard Cache — computed once per data version, shared by all workers
 # ============================================================
-_dashboard_cache = {}
-_dashboard_cache_ts = 0
 DASHBOARD_CACHE_TTL = 3600  # 1 hour
 
+MAX_BATCH_COMMODITIES = 200
+
+# Price series stored in prices.source_type
+SERIES_PATTERN = "^(daily|weekly|cigarette)$"
+
 API_VERSION = "2.0.0"
 
+# /debug/profiler endpoints are only registered when this is set
+DEBUG_ENDPOINTS = os.environ.get("PH_DEBUG_ENDPOINTS", "0") == "1"
+
+
+# Set PH_WARMUP=0 to skip building caches at startup (e.g. with --reload)
+WARMUP = os.environ.get("PH_WARMUP", "1") != "0"
+
+# Seconds spent on each warm-up step, reported by /api/cache/stats
+startup_timings = {}
+
+
+def _warm_up():
+    """Build everything the first requests need so they are served from warm caches."""
+    steps = [
+        ("indexes", warm_db),
+        ("matrix", get_matrix),
+        ("dashboard", lambda: shared_cache.get("dashboard", _build_dashboard, ttl=DASHBOARD_CACHE_TTL)),
+        ("latest", lambda: shared_cache.get("latest", get_latest_prices, ttl=DASHBOARD_CACHE_TTL)),
+        ("root", root),
+        ("stats", stats),
+        ("dates", dates),
+        ("categories", categories),
+    ]
+    started = time.perf_counter()
+    for name, step in steps:
+        step_started = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            # A cold cache is slower, not broken — keep starting up
+            print(f"[startup] Warm-up step '{name}' failed: {e}")
+        startup_timings[name] = round(time.perf_counter() - step_started, 4)
+    startup_timings["total"] = round(time.perf_counter() - started, 4)
+    print(f"[startup] Warm-up done in {startup_timings['total']:.3f}s")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if WARMUP:
+        _warm_up()
+    yield
+
+
 app = FastAPI(
+    lifespan=lifespan,
+    default_response_class=ProfiledJSONResponse,
     title="PH Price Index API",
     description="""
     🇵🇭 Free, open-source API for daily agricultural commodity prices in the Philippines.
@@ -53,9 +109,41 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(SlowLogMiddleware)
+
+
+def _cache_metrics():
+    """Cache counters for /metrics, read from the caches themselves at scrape time."""
+    shared = shared_cache.stats()
+    for result in ("hits", "disk_hits", "builds"):
+        yield ("ph_shared_cache_total", "counter", "Dashboard/latest payload cache lookups by result",
+               {"result": result}, shared[result])
+    for cache in response_cache_stats():
+        for result in ("hits", "misses", "evictions"):
+            yield ("ph_response_cache_total", "counter", "Per-endpoint response cache lookups by result",
+                   {"endpoint": cache["endpoint"], "result": result}, cache[result])
+
+
+register_collector(_cache_metrics)
+
+
+def _validate_dates(*dates):
+    import re
+    for d in dates:
+        if not d:
+            continue
+        if not re.match(r'^\d{4}-\d{2}-\d{2}$', d):
+            raise HTTPException(status_code=400, detail="Dates must be in YYYY-MM-DD format")
+        # SQLite's julianday() rolls impossible dates over (2025-02-30 → 2025-03-02)
+        try:
+            date_cls.fromisoformat(d)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid date: {d}")
 
 
 @app.get("/")
+@cached_response(maxsize=1)
 def root():
     """API info and links."""
     stats = get_stats()
@@ -77,10 +165,17 @@ def root():
             "GET /api/prices/range?from=YYYY-MM-DD&to=YYYY-MM-DD": "Prices for a date range",
             "GET /api/commodities": "List all tracked commodities (paginated)",
             "GET /api/commodities/{name}/history": "Price history for a commodity",
+            "GET /api/history?id=1&id=2&from=&to=": "Price history for many commodities in one call",
             "GET /api/categories": "List all categories with commodity counts",
             "GET /api/search?q=rice": "Search commodities",
             "GET /api/export/csv": "Download entire database as CSV",
             "GET /api/export/json": "Download entire database as JSON",
+            "GET /api/export/parquet": "Download entire database as Parquet",
+            "GET /api/export/arrow": "Download entire database as Arrow IPC (Feather)",
+            "GET /api/analytics/volatility": "Price volatility (std, coefficient of variation) per commodity or category",
+            "GET /api/analytics/change?period=mom|yoy": "Month-over-month or year-over-year change in average prices",
+            "GET /api/analytics/rolling?commodity=&window=30": "Rolling mean and standard deviation series",
+            "GET /api/changes?since=SEQ": "Prices added or modified since a change sequence (NDJSON)",
             "GET /api/stats": "Database statistics",
             "GET /api/dates": "Available date range",
             "GET /docs": "Interactive API documentation (Swagger UI)",
@@ -90,54 +185,57 @@ def root():
 
 
 @app.get("/api/prices/latest")
-def latest_prices(response: Response):
-    """Get the most recent available prices."""
-    data = get_latest_prices()
+def latest_prices(
+    source: str = Query("daily", pattern=SERIES_PATTERN, description="Series: daily, weekly or cigarette"),
+):
+    """Get the most recent available prices of a series."""
+    key = "latest" if source == "daily" else f"latest_{source}"
+    data, body = shared_cache.get_both(key, lambda: get_latest_prices(source), ttl=DASHBOARD_CACHE_TTL)
     if not data["prices"]:
         raise HTTPException(status_code=404, detail="No price data available")
-    response.headers["Cache-Control"] = "public, max-age=3600"
-    return data
+    return ProfiledJSONResponse(body, headers={"Cache-Control": "public, max-age=3600"})
 
 
 @app.get("/api/prices/range")
+@cached_response(maxsize=32)
 def prices_range(
     date_from: str = Query(..., alias="from", description="Start date (YYYY-MM-DD)"),
     date_to: str = Query(..., alias="to", description="End date (YYYY-MM-DD)"),
     commodity: Optional[str] = Query(None, description="Filter by commodity name"),
+    source: str = Query("daily", pattern=SERIES_PATTERN, description="Series: daily, weekly or cigarette"),
 ):
     """Get prices for a date range, optionally filtered by commodity."""
-    import re
-    for d in [date_from, date_to]:
-        if not re.match(r'^\d{4}-\d{2}-\d{2}$', d):
-            raise HTTPException(status_code=400, detail="Dates must be in YYYY-MM-DD format")
+    _validate_dates(date_from, date_to)
     
-    results = get_prices_range(date_from, date_to, commodity)
+    results = get_prices_range(date_from, date_to, commodity, source_type=source, compact=True)
     return {
         "from": date_from,
         "to": date_to,
         "commodity": commodity,
+        "source": source,
         "count": len(results),
         "prices": results,
     }
 
 
 @app.get("/api/prices/{date}")
+@cached_response(maxsize=256)
 def prices_by_date(
     date: str,
     page: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(50, ge=1, le=500, description="Results per page"),
+    source: str = Query("daily", pattern=SERIES_PATTERN, description="Series: daily, weekly or cigarette"),
 ):
-    """Get all prices for a specific date (format: YYYY-MM-DD)."""
-    import re
-    if not re.match(r'^\d{4}-\d{2}-\d{2}$', date):
-        raise HTTPException(status_code=400, detail="Date must be in YYYY-MM-DD format")
+    """Get all prices for a specific date (format: YYYY-MM-DD). Weekly averages are dated by the week's last day."""
+    _validate_dates(date)
     
-    data = get_prices_by_date(date, page=page, limit=limit)
+    data = get_prices_by_date(date, page=page, limit=limit, source_type=source)
     if not data["prices"]:
         raise HTTPException(status_code=404, detail=f"No prices found for {date}")
     
     return {
         "date": date,
+        "source": source,
         "count": len(data["prices"]),
         "prices": data["prices"],
         "meta": data["meta"],
@@ -145,6 +243,7 @@ def prices_by_date(
 
 
 @app.get("/api/commodities")
+@cached_response(maxsize=64)
 def list_commodities(
     category: Optional[str] = Query(None, description="Filter by category"),
     page: int = Query(1, ge=1, description="Page number"),
@@ -166,25 +265,63 @@ def list_commodities(
 
 
 @app.get("/api/commodities/{name}/history")
+@cached_response(maxsize=256)
 def commodity_history(
     name: str,
     days: Optional[int] = Query(None, ge=1, description="Number of days of history"),
     date_from: Optional[str] = Query(None, alias="from", description="Start date (YYYY-MM-DD)"),
     date_to: Optional[str] = Query(None, alias="to", description="End date (YYYY-MM-DD)"),
+    source: str = Query("daily", pattern=SERIES_PATTERN, description="Series: daily, weekly or cigarette"),
 ):
     """Get price history for a specific commodity. Use from/to for date range, or days for recent history."""
-    history = get_commodity_history(name, days=days, date_from=date_from, date_to=date_to)
+    _validate_dates(date_from, date_to)
+    history = get_commodity_history(name, days=days, date_from=date_from, date_to=date_to,
+                                    source_type=source, compact=True)
     if not history:
         raise HTTPException(status_code=404, detail=f"No history found for '{name}'")
     
     return {
         "commodity": name,
+        "source": source,
         "count": len(history),
         "history": history,
     }
 
 
+@app.get("/api/history")
+@cached_response(maxsize=128)
+def history_batch(
+    id: Optional[List[int]] = Query(None, description="Commodity id (repeat for several)"),
+    name: Optional[List[str]] = Query(None, description="Exact commodity name (repeat for several)"),
+    days: int = Query(30, ge=1, le=3650, description="Trading days of history when 'from' is omitted"),
+    date_from: Optional[str] = Query(None, alias="from", description="Start date (YYYY-MM-DD)"),
+    date_to: Optional[str] = Query(None, alias="to", description="End date (YYYY-MM-DD)"),
+    source: str = Query("daily", pattern=SERIES_PATTERN, description="Series: daily, weekly or cigarette"),
+):
+    """Price history for many commodities in one call, as columnar arrays on a shared date axis."""
+    _validate_dates(date_from, date_to)
+    if not id and not name:
+        raise HTTPException(status_code=400, detail="Pass at least one 'id' or 'name'")
+    if len(id or []) + len(name or []) > MAX_BATCH_COMMODITIES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_COMMODITIES} commodities per request")
+    
+    data = get_history_batch(id, name, date_from=date_from, date_to=date_to, days=days,
+                             source_type=source)
+    if not data["series"]:
+        raise HTTPException(status_code=404, detail="No matching commodities")
+    
+    return {
+        "from": data["from"],
+        "to": data["to"],
+        "count": len(data["series"]),
+        "dates": data["dates"],
+        "series": data["series"],
+        "missing": data["missing"],
+    }
+
+
 @app.get("/api/categories")
+@cached_response(maxsize=1)
 def categories():
     """List all categories with commodity and price counts."""
     cats = get_categories()
@@ -195,17 +332,21 @@ def categories():
 
 
 @app.get("/api/search")
+@cached_response(maxsize=512)
 def search(
     q: str = Query(..., min_length=2, description="Search query"),
     date: Optional[str] = Query(None, description="Specific date (YYYY-MM-DD)"),
     limit: int = Query(50, ge=1, le=500, description="Results per page"),
     offset: int = Query(0, ge=0, description="Offset for pagination"),
+    source: str = Query("daily", pattern=SERIES_PATTERN, description="Series: daily, weekly or cigarette"),
 ):
     """Search commodities by name or category."""
-    data = search_prices(q, date=date, limit=limit, offset=offset)
+    _validate_dates(date)
+    data = search_prices(q, date=date, limit=limit, offset=offset, source_type=source)
     return {
         "query": q,
         "date": date,
+        "source": source,
         "count": len(data["results"]),
         "results": data["results"],
         "meta": data["meta"],
@@ -218,16 +359,13 @@ def export_csv():
     def generate():
         output = io.StringIO()
         writer = csv.writer(output)
-        writer.writerow(["date", "category", "commodity", "specification", "unit", "price"])
+        writer.writerow(["date", "source_type", "category", "commodity", "specification", "unit", "price"])
         yield output.getvalue()
         output.seek(0)
         output.truncate(0)
         
-        for row in export_all():
-            writer.writerow([
-                row["date"], row["category"], row["commodity"],
-                row["specification"], row["unit"], row["price"]
-            ])
+        for chunk in export_chunks():
+            writer.writerows(chunk)
             yield output.getvalue()
             output.seek(0)
             output.truncate(0)
@@ -242,17 +380,15 @@ def export_csv():
 @app.get("/api/export/json")
 def export_json():
     """Download the entire database as a JSON file."""
-    import json
-    
     def generate():
-        yield '{"prices":['
+        yield b'{"prices":['
         first = True
-        for row in export_all():
+        for chunk in export_chunks():
             if not first:
-                yield ','
-            yield json.dumps(row)
+                yield b','
+            yield dumps(chunk)[1:-1]
             first = False
-        yield ']}'
+        yield b']}'
     
     return StreamingResponse(
         generate(),
@@ -261,24 +397,277 @@ def export_json():
     )
 
 
+@app.get("/api/export/parquet")
+def export_parquet():
+    """Download the entire database as a Parquet file (typed, dictionary-encoded columns)."""
+    path = get_columnar_export("parquet", current_data_key())
+    return FileResponse(
+        path,
+        media_type="application/vnd.apache.parquet",
+        filename="ph-price-index.parquet",
+        headers={"Cache-Control": "public, max-age=3600"},
+    )
+
+
+@app.get("/api/export/arrow")
+def export_arrow():
+    """Download the entire database as an Arrow IPC (Feather v2) file."""
+    path = get_columnar_export("arrow", current_data_key())
+    return FileResponse(
+        path,
+        media_type="application/vnd.apache.arrow.file",
+        filename="ph-price-index.arrow",
+        headers={"Cache-Control": "public, max-age=3600"},
+    )
+
+
+@app.get("/api/changes")
+def changes(
+    since: str = Query("0", description="Change sequence number, or ISO timestamp (YYYY-MM-DD[ HH:MM:SS] UTC)"),
+    limit: Optional[int] = Query(None, ge=1, description="Maximum number of changes"),
+):
+    """
+    Stream price rows inserted or updated after `since`, as newline-delimited JSON.
+    Each row carries its `seq`; pass the highest one back as `since` on the next sync.
+    """
+    import re
+    if since.isdigit():
+        rows = iter_changes(since_seq=int(since), limit=limit)
+    elif re.match(r'^\d{4}-\d{2}-\d{2}([ T]\d{2}:\d{2}(:\d{2})?)?$', since):
+        rows = iter_changes(since_time=since.replace("T", " "), limit=limit)
+    else:
+        raise HTTPException(status_code=400, detail="'since' must be a sequence number or an ISO timestamp")
+    
+    def generate():
+        for row in rows:
+            yield dumps(row) + b"\n"
+    
+    return StreamingResponse(
+        generate(),
+        media_type="application/x-ndjson",
+        headers={"X-Change-Seq": str(get_change_seq())},
+    )
+
+
 @app.get("/api/stats")
+@cached_response(maxsize=1)
 def stats():
     """Get database statistics."""
     return get_stats()
 
 
 @app.get("/api/dates")
+@cached_response(maxsize=1)
 def dates():
     """Get available date range."""
     return get_date_range()
 
 
+@app.get("/api/cache/stats")
+def cache_stats():
+    """Hit rates and sizes of the server-side caches."""
+    return {
+        "data_version": current_data_version(),
+        "shared": shared_cache.stats(),
+        "endpoints": response_cache_stats(),
+        "matrix": get_matrix().info(),
+        "startup": startup_timings,
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus text-format metrics, summed across API workers."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+if DEBUG_ENDPOINTS:
+    @app.post("/debug/profiler/start", include_in_schema=False)
+    def profiler_start(interval_ms: float = Query(5, ge=1, le=1000)):
+        """Start sampling this worker's thread stacks."""
+        sampler.start(interval_ms / 1000)
+        return sampler.status()
+
+    @app.post("/debug/profiler/stop", include_in_schema=False)
+    def profiler_stop():
+        """Stop sampling and return collapsed stacks for flamegraph.pl / speedscope."""
+        return PlainTextResponse(sampler.stop())
+
+    @app.get("/debug/profiler", include_in_schema=False)
+    def profiler_status():
+        return sampler.status()
+
+
+# ============================================================
+# ANALYTICS — computed from the in-memory price matrix
+# ============================================================
+
+def _num(value, ndigits: int = 2):
+    """Round a NumPy scalar for JSON output; NaN becomes null."""
+    value = float(value)
+    return None if np.isnan(value) else round(value, ndigits)
+
+
+def _analytics_rows(matrix, values, group: str):
+    """Pick commodity or category rows; returns (row labels, values)."""
+    if group == "category":
+        categories, values, counts = matrix.by_category(values)
+        labels = [{"category": c, "commodity_count": n} for c, n in zip(categories, counts)]
+        return labels, values
+    labels = [
+        {"id": c["id"], "name": c["name"], "category": c["category"], "specification": c["specification"]}
+        for c in matrix.commodities
+    ]
+    return labels, values
+
+
+@app.get("/api/analytics/volatility")
+@cached_response(maxsize=64)
+def analytics_volatility(
+    date_from: Optional[str] = Query(None, alias="from", description="Start date (YYYY-MM-DD)"),
+    date_to: Optional[str] = Query(None, alias="to", description="End date (YYYY-MM-DD)"),
+    group: str = Query("commodity", pattern="^(commodity|category)$", description="commodity or category"),
+):
+    """Mean, standard deviation and coefficient of variation of daily prices, most volatile first."""
+    _validate_dates(date_from, date_to)
+    matrix = get_matrix()
+    labels, values = _analytics_rows(matrix, matrix.window(date_from, date_to), group)
+    summary = matrix.summary(values)
+
+    results = []
+    for i, label in enumerate(labels):
+        if not summary["count"][i]:
+            continue
+        results.append({
+            **label,
+            "mean": _num(summary["mean"][i]),
+            "std": _num(summary["std"][i]),
+            "cv": _num(summary["cv"][i], 4),
+            "min": _num(summary["min"][i]),
+            "max": _num(summary["max"][i]),
+            "observations": int(summary["count"][i]),
+        })
+    results.sort(key=lambda r: -(r["cv"] or 0))
+
+    return {
+        "from": date_from or (matrix.dates[0] if matrix.dates else None),
+        "to": date_to or (matrix.dates[-1] if matrix.dates else None),
+        "group": group,
+        "count": len(results),
+        "results": results,
+    }
+
+
+@app.get("/api/analytics/change")
+@cached_response(maxsize=64)
+def analytics_change(
+    period: str = Query("mom", pattern="^(mom|yoy)$", description="mom (month-over-month) or yoy (year-over-year)"),
+    month: Optional[str] = Query(None, description="Month to compare (YYYY-MM), defaults to the latest"),
+    group: str = Query("commodity", pattern="^(commodity|category)$", description="commodity or category"),
+):
+    """Change in monthly average price versus the previous month or the same month last year."""
+    import re
+    if month and not re.match(r'^\d{4}-\d{2}$', month):
+        raise HTTPException(status_code=400, detail="Month must be in YYYY-MM format")
+
+    matrix = get_matrix()
+    labels, values = _analytics_rows(matrix, matrix.values, group)
+    months, monthly = matrix.resample("M", values=values)
+    if not months:
+        raise HTTPException(status_code=404, detail="No price data available")
+
+    month = month or months[-1]
+    year, mon = int(month[:4]), int(month[5:])
+    if period == "mom":
+        year, mon = (year - 1, 12) if mon == 1 else (year, mon - 1)
+    else:
+        year -= 1
+    previous = f"{year:04d}-{mon:02d}"
+
+    if month not in months or previous not in months:
+        raise HTTPException(status_code=404, detail=f"No data to compare {month} with {previous}")
+
+    current_avg = monthly[:, months.index(month)]
+    previous_avg = monthly[:, months.index(previous)]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change = (current_avg - previous_avg) / previous_avg * 100
+
+    results = []
+    for i, label in enumerate(labels):
+        if np.isnan(change[i]):
+            continue
+        results.append({
+            **label,
+            "current_avg": _num(current_avg[i]),
+            "previous_avg": _num(previous_avg[i]),
+            "change_pct": _num(change[i]),
+        })
+    results.sort(key=lambda r: -r["change_pct"])
+
+    return {
+        "period": period,
+        "month": month,
+        "compared_to": previous,
+        "group": group,
+        "count": len(results),
+        "results": results,
+    }
+
+
+@app.get("/api/analytics/rolling")
+@cached_response(maxsize=128)
+def analytics_rolling(
+    commodity: Optional[str] = Query(None, description="Filter by commodity name"),
+    category: Optional[str] = Query(None, description="Filter by category"),
+    window: int = Query(30, ge=2, le=365, description="Window size in trading days"),
+    date_from: Optional[str] = Query(None, alias="from", description="Start date (YYYY-MM-DD)"),
+    date_to: Optional[str] = Query(None, alias="to", description="End date (YYYY-MM-DD)"),
+    group: str = Query("commodity", pattern="^(commodity|category)$", description="commodity or category"),
+):
+    """Rolling mean and standard deviation as columnar arrays over a shared date axis."""
+    _validate_dates(date_from, date_to)
+    matrix = get_matrix()
+    labels, values = _analytics_rows(matrix, matrix.values, group)
+
+    # Roll over the full history so the first points of the window are complete
+    mean, std = matrix.rolling(window, values=values)
+    cols = matrix.date_slice(date_from, date_to)
+
+    series = []
+    for i, label in enumerate(labels):
+        if commodity and (group == "category" or commodity.lower() not in label["name"].lower()):
+            continue
+        if category and category.lower() not in (label["category"] or "").lower():
+            continue
+        prices = values[i, cols]
+        if np.isnan(prices).all():
+            continue
+        series.append({
+            **label,
+            "price": [_num(v) for v in prices],
+            "rolling_mean": [_num(v) for v in mean[i, cols]],
+            "rolling_std": [_num(v) for v in std[i, cols]],
+        })
+
+    if not series:
+        raise HTTPException(status_code=404, detail="No matching price series")
+
+    return {
+        "window": window,
+        "group": group,
+        "dates": matrix.dates[cols],
+        "count": len(series),
+        "series": series,
+    }
+
+
 # ============================================================
 # DASHBOARD — Pre-computed, cached, single-call endpoint
 # ============================================================
 
 def _build_dashboard():
     """Pre-compute the entire AnoMura dashboard payload."""
+    matrix = get_matrix()
     stats_data = get_stats()
     latest_data = get_latest_prices()
     latest_prices = latest_data.get("prices", [])
@@ -286,25 +675,20 @@ def _build_dashboard():
 
     # Pre-compute for all 3 time ranges
     periods = {}
+    latest_day = date_cls.fromisoformat(latest_date).toordinal()
     for label, days in [("30d", 30), ("90d", 90), ("1y", 365)]:
-        to_date = latest_date
-        from_dt = datetime.strptime(latest_date, "%Y-%m-%d") - timedelta(days=days)
-        from_date = from_dt.strftime("%Y-%m-%d")
-        range_prices = get_prices_range(from_date, to_date)
-
-        # Group history by name+spec (the key fix for zigzag)
-        hist_map = {}
-        for p in range_prices:
-            key = f"{p['name']}||{p.get('specification', '')}"
-            if key not in hist_map:
-                hist_map[key] = []
-            hist_map[key].append(p["price"])
+        window = matrix.day_window(latest_day - days, latest_day)
 
         # Build per-commodity signals
         items = []
         for item in latest_prices:
-            key = f"{item['name']}||{item.get('specification', '')}"
-            prices = hist_map.get(key, [])
+            # History is keyed by name+spec (the key fix for zigzag)
+            row = matrix.row_for(item["name"], item.get("specification"))
+            prices = []
+            if row is not None:
+                series = window[row]
+                # Source prices have 2 decimals; rounding undoes float32 storage error
+                prices = np.round(series[~np.isnan(series)].astype(np.float64), 2).tolist()
             avg = sum(prices) / len(prices) if prices else item["price"]
             change_pct = ((item["price"] - avg) / avg) * 100 if avg else 0
 
@@ -362,25 +746,20 @@ def _build_dashboard():
 
 
 @app.get("/api/dashboard")
-def dashboard(response: Response):
+def dashboard():
     """
     Pre-computed dashboard for AnoMura.
     Returns stats, latest prices with signals, best deals, getting expensive,
     and sparkline data for 30D/90D/1Y — all in one call.
-    Cached server-side for 1 hour.
+    Cached server-side per data version (at most 1 hour) and shared across workers.
     """
-    global _dashboard_cache, _dashboard_cache_ts
-
-    now = time.time()
-    if not _dashboard_cache or (now - _dashboard_cache_ts) > DASHBOARD_CACHE_TTL:
-        _dashboard_cache = _build_dashboard()
-        _dashboard_cache_ts = now
+    body = shared_cache.get_rendered("dashboard", _build_dashboard, ttl=DASHBOARD_CACHE_TTL)
 
     # Tell browsers + CDN to cache for 1 hour
-    response.headers["Cache-Control"] = "public, max-age=3600, s-maxage=3600"
-    return _dashboard_cache
+    return ProfiledJSONResponse(body, headers={"Cache-Control": "public, max-age=3600, s-maxage=3600"})
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run("api.main:app", host="0.0.0.0", port=8000,
+                workers=int(os.environ.get("WEB_CONCURRENCY", "1")))
@@ -0,0 +1,263 @@
+"""
+In-memory price matrix for analytics.
+
+All daily prices are held as a dense commodity × date float32 matrix with NaN
+for missing days, plus index maps from commodity id / date to row / column.
+Averages, percent changes, rolling windows and resampling are vectorized over
+the whole matrix, so analytics endpoints never touch SQLite per request.
+
+The matrix is loaded on startup and reloaded when the data version changes.
+"""
+import os
+import sys
+import time
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import date as date_cls
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from database import get_price_points, natural_key
+from api.cache import current_data_version
+
+
+class PriceMatrix:
+    """Dense commodity × date price matrix with vectorized analytics."""
+
+    def __init__(self, commodities: List[Dict], dates: List[str], values: np.ndarray,
+                 version: int = 0, load_seconds: float = 0.0, days: List[int] = None):
+        self.commodities = commodities
+        self.commodity_ids = np.array([c["id"] for c in commodities], dtype=np.int64)
+        self.id_index = {c["id"]: i for i, c in enumerate(commodities)}
+        self.key_index = {}
+        for i, c in enumerate(commodities):
+            self.key_index.setdefault(natural_key(c["name"], c["specification"]), i)
+        self.dates = dates
+        self.date_index = {d: j for j, d in enumerate(dates)}
+        if days is None:
+            days = [date_cls.fromisoformat(d).toordinal() for d in dates]
+        self.ordinals = np.array(days, dtype=np.int32)  # prices.day of each column
+        self.values = values
+        self.version = version
+        self.load_seconds = load_seconds
+
+    @classmethod
+    def load(cls, source_type: str = "daily", db_path: str = None, version: int = 0) -> "PriceMatrix":
+        """Build the matrix from every stored price of one source type."""
+        started = time.perf_counter()
+        data = get_price_points(source_type, db_path=db_path)
+        commodities, dates = data["commodities"], data["dates"]
+
+        id_index = {c["id"]: i for i, c in enumerate(commodities)}
+        date_index = {d: j for j, d in enumerate(dates)}
+        points = data["points"]
+
+        rows = np.fromiter((id_index[p[0]] for p in points), dtype=np.int32, count=len(points))
+        cols = np.fromiter((date_index[p[1]] for p in points), dtype=np.int32, count=len(points))
+        prices = np.fromiter((p[2] for p in points), dtype=np.float32, count=len(points))
+
+        values = np.full((len(commodities), len(dates)), np.nan, dtype=np.float32)
+        values[rows, cols] = prices
+
+        matrix = cls(commodities, dates, values, version=version,
+                     load_seconds=time.perf_counter() - started, days=data["days"])
+        print(f"[matrix] Loaded {len(commodities)} commodities × {len(dates)} dates "
+              f"({matrix.nbytes / 1024:.1f} KB) in {matrix.load_seconds:.3f}s")
+        return matrix
+
+    # === Introspection ===
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.values.shape
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes + self.commodity_ids.nbytes + self.ordinals.nbytes
+
+    def info(self) -> Dict:
+        return {
+            "commodities": self.shape[0],
+            "dates": self.shape[1],
+            "observations": int(np.count_nonzero(~np.isnan(self.values))),
+            "bytes": self.nbytes,
+            "load_seconds": round(self.load_seconds, 4),
+            "data_version": self.version,
+        }
+
+    # === Lookups ===
+
+    def row_for(self, name: str, specification: Optional[str] = None) -> Optional[int]:
+        return self.key_index.get(natural_key(name, specification))
+
+    def date_slice(self, date_from: str = None, date_to: str = None) -> slice:
+        """Column slice covering date_from..date_to inclusive (ISO strings)."""
+        start = bisect_left(self.dates, date_from) if date_from else 0
+        stop = bisect_right(self.dates, date_to) if date_to else len(self.dates)
+        return slice(start, stop)
+
+    def day_slice(self, day_from: int, day_to: int) -> slice:
+        """Column slice covering day numbers day_from..day_to inclusive."""
+        start, stop = np.searchsorted(self.ordinals, [day_from, day_to + 1])
+        return slice(int(start), int(stop))
+
+    def window(self, date_from: str = None, date_to: str = None) -> np.ndarray:
+        return self.values[:, self.date_slice(date_from, date_to)]
+
+    def day_window(self, day_from: int, day_to: int) -> np.ndarray:
+        return self.values[:, self.day_slice(day_from, day_to)]
+
+    # === Vectorized analytics ===
+
+    def averages(self, date_from: str = None, date_to: str = None) -> np.ndarray:
+        """Mean price per commodity over a date range (NaN where no observations)."""
+        return _nanmean(self.window(date_from, date_to), axis=1)
+
+    def pct_change(self, periods: int = 1, values: np.ndarray = None) -> np.ndarray:
+        """Percent change versus `periods` columns earlier, per commodity."""
+        values = self.values if values is None else values
+        out = np.full(values.shape, np.nan, dtype=np.float32)
+        if periods < values.shape[1]:
+            prev = values[:, :-periods]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                out[:, periods:] = (values[:, periods:] - prev) / prev * 100
+        return out
+
+    def rolling(self, window: int, values: np.ndarray = None,
+                min_periods: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """Rolling mean and standard deviation over the last `window` columns, ignoring gaps."""
+        values = self.values if values is None else values
+        present = ~np.isnan(values)
+        filled = np.where(present, values, 0).astype(np.float64)
+
+        def windowed(a):
+            c = np.cumsum(a, axis=1)
+            c[:, window:] = c[:, window:] - c[:, :-window]
+            return c
+
+        count = windowed(present.astype(np.float64))
+        total = windowed(filled)
+        total_sq = windowed(filled * filled)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = total / count
+            var = total_sq / count - mean * mean
+            # Sample standard deviation, like pandas
+            std = np.sqrt(np.maximum(var, 0) * count / (count - 1))
+        mean[count < max(min_periods, 1)] = np.nan
+        std[count < max(min_periods, 2)] = np.nan
+        return mean.astype(np.float32), std.astype(np.float32)
+
+    def resample(self, freq: str = "M", values: np.ndarray = None,
+                 date_from: str = None, date_to: str = None) -> Tuple[List[str], np.ndarray]:
+        """Average prices per calendar period: "W" (ISO week), "M" (month) or "Y" (year).
+
+        Returns the period labels and a commodity × period matrix of means. If
+        `values` is given it must cover the same columns as date_from..date_to.
+        """
+        cols = self.date_slice(date_from, date_to)
+        values = self.values[:, cols] if values is None else values
+        dates = self.dates[cols]
+        if not dates:
+            return [], np.empty((self.shape[0], 0), dtype=np.float32)
+
+        labels = [_period_label(d, freq) for d in dates]
+        # Dates are sorted, so each period is a contiguous run of columns
+        starts = [0] + [j for j in range(1, len(labels)) if labels[j] != labels[j - 1]]
+
+        present = ~np.isnan(values)
+        sums = np.add.reduceat(np.where(present, values, 0).astype(np.float64), starts, axis=1)
+        counts = np.add.reduceat(present.astype(np.int32), starts, axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            means = (sums / counts).astype(np.float32)
+        return [labels[j] for j in starts], means
+
+    def summary(self, values: np.ndarray = None) -> Dict[str, np.ndarray]:
+        """Per-row mean, sample std, coefficient of variation, min, max and observation count."""
+        values = self.values if values is None else values
+        present = ~np.isnan(values)
+        count = present.sum(axis=1)
+        filled = np.where(present, values, 0).astype(np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = filled.sum(axis=1) / count
+            var = (np.where(present, values - mean[:, None], 0) ** 2).sum(axis=1) / (count - 1)
+            std = np.where(count > 1, np.sqrt(var), np.nan)
+            cv = std / mean
+        return {
+            "mean": mean,
+            "std": std,
+            "cv": cv,
+            "min": np.where(count > 0, np.where(present, values, np.inf).min(axis=1, initial=np.inf), np.nan),
+            "max": np.where(count > 0, np.where(present, values, -np.inf).max(axis=1, initial=-np.inf), np.nan),
+            "count": count,
+        }
+
+    def by_category(self, values: np.ndarray = None) -> Tuple[List[str], np.ndarray, List[int]]:
+        """Average the commodity rows of each category into one row per category.
+
+        Returns category names, a category × date matrix, and commodities per category.
+        """
+        values = self.values if values is None else values
+        groups = {}
+        for i, c in enumerate(self.commodities):
+            if c["category"]:
+                groups.setdefault(c["category"], []).append(i)
+
+        categories = sorted(groups)
+        out = np.empty((len(categories), values.shape[1]), dtype=np.float32)
+        for k, category in enumerate(categories):
+            out[k] = _nanmean(values[groups[category]], axis=0)
+        return categories, out, [len(groups[c]) for c in categories]
+
+    def latest(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Last observed price and its column index per commodity (-1 if never observed)."""
+        present = ~np.isnan(self.values)
+        n = self.values.shape[1]
+        last = np.where(present.any(axis=1), n - 1 - np.argmax(present[:, ::-1], axis=1), -1)
+        prices = np.where(last >= 0, self.values[np.arange(len(last)), np.maximum(last, 0)], np.nan)
+        return prices.astype(np.float32), last
+
+
+def _nanmean(values: np.ndarray, axis: int) -> np.ndarray:
+    """nanmean without the all-NaN RuntimeWarning, accumulated in float64."""
+    present = ~np.isnan(values)
+    counts = present.sum(axis=axis)
+    sums = np.where(present, values, 0).sum(axis=axis, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return sums / counts
+
+
+def _period_label(iso_date: str, freq: str) -> str:
+    if freq == "M":
+        return iso_date[:7]
+    if freq == "Y":
+        return iso_date[:4]
+    if freq == "W":
+        year, week, _ = date_cls.fromisoformat(iso_date).isocalendar()
+        return f"{year}-W{week:02d}"
+    raise ValueError(f"Unknown resample frequency: {freq}")
+
+
+# ============================================================
+# Process-wide matrix, refreshed when the data version changes
+# ============================================================
+
+_matrix: Optional[PriceMatrix] = None
+_matrix_lock = threading.Lock()
+
+
+def get_matrix() -> PriceMatrix:
+    """Get the current price matrix, reloading it after an ingest."""
+    global _matrix
+
+    version = current_data_version()
+    if _matrix is not None and _matrix.version == version:
+        return _matrix
+
+    with _matrix_lock:
+        if _matrix is None or _matrix.version != version:
+            _matrix = PriceMatrix.load(version=version)
+    return _matrix
@@ -0,0 +1,49 @@
+"""
+JSON encoding for the API.
+
+Responses, cached payloads and streamed exports are encoded with orjson,
+which serializes dicts, lists, NumPy arrays and scalars in C. Compact query
+results (rows.PriceRows) are handed to it through the `default` hook.
+
+Endpoints that return a plain dict still go through FastAPI's jsonable_encoder
+first. Cached endpoints (api/cache.py) render their payload once and return
+it as bytes, which ProfiledJSONResponse sends unchanged.
+"""
+import time
+
+import orjson
+from fastapi.responses import JSONResponse
+
+from profiling import record
+from rows import PriceRows
+
+OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj):
+    if isinstance(obj, PriceRows):
+        return obj.to_dicts()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content) -> bytes:
+    """Encode `content` as compact UTF-8 JSON."""
+    return orjson.dumps(content, default=_default, option=OPTIONS)
+
+
+loads = orjson.loads
+
+
+class ProfiledJSONResponse(JSONResponse):
+    """orjson-encoded JSONResponse that reports its encoding time to the request profile.
+
+    `bytes` content is taken to be JSON rendered earlier (a cache hit) and is sent as is.
+    """
+
+    def render(self, content) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        started = time.perf_counter()
+        body = dumps(content)
+        record("render", time.perf_counter() - started)
+        return body
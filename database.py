@@ -3,30 +3,461 @@ SQLite database for storing parsed price data.
 Handles schema creation, upserts, and queries.
 """
 import os
+import re
+import sys
+import shutil
+import hashlib
 import sqlite3
 import json
-from typing import List, Dict, Optional
-from datetime import datetime
+import time
+import threading
+from typing import List, Dict, Optional, Sequence, Tuple, Union
+from datetime import datetime, date as date_cls
+from urllib.request import pathname2url
 
-DB_PATH = os.path.join(os.path.dirname(__file__), "data", "prices.db")
+from metrics import timed_query
+from profiling import record
+from rows import PriceRows
 
+DB_PATH = os.environ.get("PH_DB_PATH") or os.path.join(os.path.dirname(__file__), "data", "prices.db")
 
-def get_db(db_path: str = None) -> sqlite3.Connection:
-    """Get a database connection with row factory."""
+# Connection mode used when callers don't ask for one explicitly:
+#   "rw"        — read-write (scraper, scripts, single-process API)
+#   "ro"        — read-only URI (mode=ro), safe for many API workers
+#   "immutable" — read-only and assumes the file never changes while open
+DB_MODE = os.environ.get("PH_DB_MODE", "rw")
+
+# Read-only (serving) connections are tuned for lookups: pages are read through a
+# memory map, so every worker process shares the OS page cache instead of copying
+# pages into its own heap, and each connection is reused per thread.
+DB_POOL = os.environ.get("PH_DB_POOL", "1") != "0"
+SERVING_PRAGMAS = {
+    "query_only": "ON",
+    "temp_store": "MEMORY",
+    "mmap_size": int(os.environ.get("PH_DB_MMAP_MB", "256")) * 1024 * 1024,
+    "cache_size": -int(os.environ.get("PH_DB_CACHE_MB", "16")) * 1024,  # negative = KiB
+}
+
+_pool = threading.local()
+
+
+class _PooledConnection(sqlite3.Connection):
+    """Thread-local serving connection; close() leaves it open for the next query."""
+
+    def close(self):
+        pass
+
+
+def _file_uri(path: str, query: str = "") -> str:
+    uri = f"file:{pathname2url(os.path.abspath(path))}"
+    return f"{uri}?{query}" if query else uri
+
+
+def get_db(db_path: str = None, mode: str = None, pooled: bool = None) -> sqlite3.Connection:
+    """Get a database connection with row factory.
+    
+    Read-only modes get SERVING_PRAGMAS and, unless pooled=False, a connection
+    reused by the calling thread. pooled=False connections may be used from
+    any thread, in every mode.
+    """
     path = db_path or DB_PATH
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    conn = sqlite3.connect(path)
+    mode = mode or DB_MODE
+
+    # URI filenames are always enabled so archive partitions can be attached read-only
+    if mode == "rw":
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Unpooled connections may be handed to a generator that resumes on another thread
+        conn = sqlite3.connect(_file_uri(path), uri=True, check_same_thread=pooled is not False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    if mode not in ("ro", "immutable"):
+        raise ValueError(f"Unknown database mode: {mode}")
+
+    pooled = DB_POOL if pooled is None else pooled
+    key = (path, mode)
+    if pooled:
+        conns = getattr(_pool, "conns", None)
+        if conns is None:
+            conns = _pool.conns = {}
+        if key in conns:
+            return conns[key]
+
+    uri = _file_uri(path, "mode=ro&immutable=1" if mode == "immutable" else "mode=ro")
+    if pooled:
+        conn = sqlite3.connect(uri, uri=True, factory=_PooledConnection)
+    else:
+        # Unpooled connections may be handed to a generator that resumes on another thread
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
     conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA journal_mode=WAL")
-    conn.execute("PRAGMA foreign_keys=ON")
+    for pragma, value in SERVING_PRAGMAS.items():
+        conn.execute(f"PRAGMA {pragma}={value}")
+    if pooled:
+        conns[key] = conn
     return conn
 
 
+# ============================================================
+# Day numbers
+# ============================================================
+# prices.day is the date as a day number (date.toordinal(): 0001-01-01 is 1),
+# a virtual column computed from the ISO `date` string. Range filters, sorting,
+# MAX() and the date indexes all work on it, so index entries are small
+# integers instead of 10-byte strings; `date` is still what gets returned.
+# Query bounds are converted by SQLite from the ISO strings callers pass in.
+
+_ORDINAL_EPOCH = 1721424.5  # julianday() of day number 0
+
+def _day_sql(expr: str) -> str:
+    return f"CAST(julianday({expr}) - {_ORDINAL_EPOCH} AS INTEGER)"
+
+
+DAY_SQL = _day_sql("date")
+DAY_PARAM = _day_sql("?")  # placeholder for an ISO date bound
+
+
+def _date_sql(expr: str) -> str:
+    """SQL for the ISO date of a day number expression."""
+    return f"date({expr} + {_ORDINAL_EPOCH})"
+
+
+def day_to_date(day: int) -> str:
+    """ISO date string of a prices.day number."""
+    return date_cls.fromordinal(day).isoformat()
+
+
+# ============================================================
+# Commodity natural key
+# ============================================================
+# A commodity is identified by (name, specification), with a missing
+# specification the same as an empty one. UNIQUE(name, specification) can't
+# enforce that (NULLs never collide), so commodities.natural_key folds both
+# into one string, generated by SQLite, with a unique index on it.
+
+NATURAL_KEY_SQL = "name || char(31) || COALESCE(specification, '')"
+
+
+def natural_key(name: str, specification: Optional[str] = None) -> str:
+    """Python twin of NATURAL_KEY_SQL."""
+    return f"{name}\x1f{specification or ''}"
+
+
+# ============================================================
+# Year partitions
+# ============================================================
+# Closed years can be moved out of the live `prices` table into per-year archive
+# databases (data/archive/prices-YYYY.db). Archives are immutable: they are
+# attached read-only with immutable=1, so SQLite skips locking and change
+# detection for them, and they never need to be VACUUMed again. Queries go
+# through _prices_from(), which only attaches the archives a date range needs.
+# The live table always holds the latest year, so "latest date" lookups never
+# need an archive.
+
+ARCHIVE_DIR = "archive"  # relative to the main database's directory
+
+# Stored columns copied between the live table and archives. Archives keep
+# `day` as a plain column filled on copy; in the live table it's generated.
+PARTITION_COLUMNS = [
+    "id", "commodity_id", "date", "price", "source_type", "source_file",
+    "created_at", "change_seq", "updated_at",
+]
+
+ARCHIVE_INDEXES = """
+    CREATE UNIQUE INDEX IF NOT EXISTS {schema}.idx_prices_unique ON prices(commodity_id, date, source_type);
+    CREATE INDEX IF NOT EXISTS {schema}.idx_prices_day ON prices(day, source_type);
+    CREATE INDEX IF NOT EXISTS {schema}.idx_prices_commodity_day ON prices(commodity_id, source_type, day);
+    CREATE INDEX IF NOT EXISTS {schema}.idx_prices_change_seq ON prices(change_seq);
+"""
+
+
+def _db_file(conn: sqlite3.Connection) -> str:
+    for row in conn.execute("PRAGMA database_list"):
+        if row[1] == "main":
+            return row[2]
+    return DB_PATH
+
+
+def _db_dir(conn: sqlite3.Connection) -> str:
+    return os.path.dirname(_db_file(conn))
+
+
+def _archived_partitions(conn: sqlite3.Connection) -> List[Dict]:
+    try:
+        return [dict(row) for row in conn.execute(
+            "SELECT year, path, row_count, first_date, last_date, archived_at FROM main.partitions ORDER BY year"
+        )]
+    except sqlite3.OperationalError:
+        # No partitions table (old database opened read-only)
+        return []
+
+
+# Archive schemas are named p<year>_<archived_at digits>; archives that don't
+# fit under SQLite's attach limit are copied into archive_copy_* temp tables
+_ARCHIVE_SCHEMA = re.compile(r"^p\d{4}_\d+$")
+_ARCHIVE_COPY_PREFIX = "archive_copy_"
+_missing_archives = set()  # archive files already reported missing
+
+
+def _partition_schema(partition: Dict) -> str:
+    # The archive time is part of the name so a pooled connection never keeps
+    # reading an earlier archive of a year that was restored and archived again
+    digits = "".join(ch for ch in str(partition["archived_at"]) if ch.isdigit())
+    return f"p{partition['year']}_{digits}"
+
+
+def _attached(conn: sqlite3.Connection) -> List[str]:
+    """Attached schemas other than main and temp."""
+    return [row[1] for row in conn.execute("PRAGMA database_list") if row[1] not in ("main", "temp")]
+
+
+def _attach_room(conn: sqlite3.Connection) -> int:
+    """How many archives can be attached at once (SQLITE_MAX_ATTACHED, 10 by default)."""
+    others = [name for name in _attached(conn) if not _ARCHIVE_SCHEMA.match(name)]
+    return conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED) - len(others)
+
+
+def _attach_partitions(conn: sqlite3.Connection, partitions: List[Dict], current: List[Dict]) -> List[str]:
+    """Attach archives read-only (once per connection) and return their schema names.
+    
+    Archives stay attached for later queries on the same connection. Those of
+    years no longer archived as `current` lists are detached, and so are ones
+    this query doesn't need when there is no room left for the ones it does.
+    """
+    wanted = [_partition_schema(p) for p in partitions]
+    valid = {_partition_schema(p) for p in current}
+    attached = _attached(conn)
+    missing = [schema for schema in wanted if schema not in attached]
+    limit = conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+    for name in list(attached):
+        if _ARCHIVE_SCHEMA.match(name) and name not in wanted and \
+                (name not in valid or len(attached) + len(missing) > limit):
+            conn.execute(f"DETACH DATABASE {name}")
+            attached.remove(name)
+    for partition, schema in zip(partitions, wanted):
+        if schema in missing:
+            path = os.path.join(_db_dir(conn), partition["path"])
+            conn.execute(f"ATTACH DATABASE ? AS {schema}", (_file_uri(path, "mode=ro&immutable=1"),))
+    return wanted
+
+
+def _archive_copy_tables(conn: sqlite3.Connection) -> List[str]:
+    return [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_temp_master WHERE type = 'table' AND name LIKE ? ORDER BY name",
+        (_ARCHIVE_COPY_PREFIX + "%",)
+    )]
+
+
+def _copy_archives(conn: sqlite3.Connection, partitions: List[Dict], current: List[Dict]) -> List[str]:
+    """Temp tables holding the rows of more archives than can be attached at once.
+    
+    Archives are attached a batch at a time and each batch is copied into one
+    temp table. The copies are kept for the connection's next query over the
+    same archives and dropped by the next one that doesn't need them.
+    """
+    key = hashlib.sha1(",".join(_partition_schema(p) for p in partitions).encode()).hexdigest()[:12]
+    prefix = f"{_ARCHIVE_COPY_PREFIX}{key}_"
+    tables = _archive_copy_tables(conn)
+    if any(name.startswith(prefix) for name in tables):
+        return [f"temp.{name}" for name in tables if name.startswith(prefix)]
+    
+    columns = ", ".join(PARTITION_COLUMNS + ["day"])
+    room = _attach_room(conn)
+    created = []
+    query_only = conn.execute("PRAGMA query_only").fetchone()[0]
+    conn.execute("PRAGMA query_only=OFF")  # serving connections; temp tables only
+    try:
+        for name in tables:
+            conn.execute(f"DROP TABLE temp.{name}")
+        for i in range(0, len(partitions), room):
+            schemas = _attach_partitions(conn, partitions[i:i + room], current)
+            name = f"{prefix}{i // room:03d}"
+            conn.execute(f"CREATE TEMP TABLE {name} AS " + " UNION ALL ".join(
+                f"SELECT {columns} FROM {schema}.prices" for schema in schemas
+            ))
+            created.append(name)
+    except Exception:
+        for name in created:
+            conn.execute(f"DROP TABLE temp.{name}")
+        raise
+    finally:
+        conn.execute(f"PRAGMA query_only={query_only}")
+    print(f"[db] Copied {len(partitions)} archives into {len(created)} temp tables "
+          f"(more than the {room} SQLite can attach at once)")
+    return [f"temp.{name}" for name in created]
+
+
+def _drop_archive_copies(conn: sqlite3.Connection):
+    tables = _archive_copy_tables(conn)
+    if not tables:
+        return
+    query_only = conn.execute("PRAGMA query_only").fetchone()[0]
+    conn.execute("PRAGMA query_only=OFF")
+    try:
+        for name in tables:
+            conn.execute(f"DROP TABLE temp.{name}")
+    finally:
+        conn.execute(f"PRAGMA query_only={query_only}")
+
+
+def _present_partitions(conn: sqlite3.Connection, partitions: List[Dict]) -> List[Dict]:
+    """The partitions whose archive file exists; missing ones are skipped and reported once."""
+    present = []
+    for partition in partitions:
+        path = os.path.join(_db_dir(conn), partition["path"])
+        if os.path.exists(path):
+            present.append(partition)
+        elif path not in _missing_archives:
+            _missing_archives.add(path)
+            print(f"[db] Archive {partition['path']} for {partition['year']} is missing; "
+                  f"its prices are left out of query results")
+    return present
+
+
+def _prices_from(conn: sqlite3.Connection, date_from: str = None, date_to: str = None) -> str:
+    """Query router: SQL source for price rows in [date_from, date_to].
+    
+    Returns plain `prices` when no archive overlaps the range, a single archive
+    table when the range lies inside one archived year, and otherwise a UNION ALL
+    over the live table and just the archives the range needs. When the range
+    needs more archives than SQLite can attach, they are read from temp copies
+    (see _copy_archives).
+    """
+    partitions = _archived_partitions(conn)
+    if not partitions:
+        return "prices"
+    
+    first_year = int(date_from[:4]) if date_from else None
+    last_year = int(date_to[:4]) if date_to else None
+    archived = {p["year"] for p in partitions}
+    
+    needed = _present_partitions(conn, [
+        p for p in partitions
+        if (first_year is None or p["year"] >= first_year)
+        and (last_year is None or p["year"] <= last_year)
+    ])
+    
+    sources = []
+    if first_year is None or last_year is None or \
+            any(y not in archived for y in range(first_year, last_year + 1)):
+        sources.append("main.prices")
+    if len(needed) > _attach_room(conn):
+        sources += _copy_archives(conn, needed, partitions)
+    else:
+        _drop_archive_copies(conn)
+        sources += [f"{schema}.prices" for schema in _attach_partitions(conn, needed, partitions)]
+    
+    if not sources or sources == ["main.prices"]:
+        return "prices"
+    if len(sources) == 1:
+        return sources[0]
+    columns = ", ".join(PARTITION_COLUMNS + ["day"])
+    return "(" + " UNION ALL ".join(f"SELECT {columns} FROM {src}" for src in sources) + ")"
+
+
+def archived_years(db_path: str = None) -> List[int]:
+    conn = get_db(db_path)
+    years = [p["year"] for p in _archived_partitions(conn)]
+    conn.close()
+    return years
+
+
+def archive_year(year: int, db_path: str = None) -> Dict:
+    """Move one closed year of prices into its own immutable archive database."""
+    conn = get_db(db_path, mode="rw")
+    last_date = conn.execute("SELECT date FROM prices ORDER BY day DESC LIMIT 1").fetchone()
+    last_date = last_date[0] if last_date else None
+    if not last_date or year >= int(last_date[:4]):
+        conn.close()
+        raise ValueError(f"Only years before the latest data year ({last_date}) can be archived")
+    if year in {p["year"] for p in _archived_partitions(conn)}:
+        conn.close()
+        raise ValueError(f"{year} is already archived")
+    
+    rel_path = os.path.join(ARCHIVE_DIR, f"prices-{year}.db")
+    path = os.path.join(_db_dir(conn), rel_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if os.path.exists(path):
+        # Left over from an interrupted run — it was never registered
+        os.chmod(path, 0o644)
+        os.remove(path)
+    
+    bounds = (date_cls(year, 1, 1).toordinal(), date_cls(year + 1, 1, 1).toordinal())
+    columns = ", ".join(PARTITION_COLUMNS + ["day"])
+    
+    # 1. Copy the year into the archive and commit it before touching the live table
+    conn.execute("ATTACH DATABASE ? AS archive", (_file_uri(path),))
+    conn.execute(f"CREATE TABLE archive.prices AS SELECT {columns} FROM main.prices WHERE 0")
+    conn.execute(f"""
+        INSERT INTO archive.prices
+        SELECT {columns} FROM main.prices WHERE day >= ? AND day < ? ORDER BY day, commodity_id
+    """, bounds)
+    conn.executescript(ARCHIVE_INDEXES.format(schema="archive"))
+    conn.commit()
+    info = dict(conn.execute(
+        "SELECT COUNT(*) as row_count, MIN(date) as first_date, MAX(date) as last_date FROM archive.prices"
+    ).fetchone())
+    
+    # 2. Remove it from the live table and register the partition in one transaction
+    conn.execute("DELETE FROM main.prices WHERE day >= ? AND day < ?", bounds)
+    conn.execute("""
+        INSERT INTO partitions (year, path, row_count, first_date, last_date)
+        VALUES (?, ?, ?, ?, ?)
+    """, (year, rel_path, info["row_count"], info["first_date"], info["last_date"]))
+    conn.commit()
+    conn.execute("DETACH DATABASE archive")
+    
+    # Stats triggers only see the live table; recompute across all partitions
+    _write_stats(conn, _compute_stats(conn))
+    conn.commit()
+    conn.close()
+    
+    # 3. Compact the archive and make it read-only on disk
+    archive = sqlite3.connect(path)
+    archive.execute("PRAGMA journal_mode=DELETE")
+    archive.execute("VACUUM")
+    archive.close()
+    os.chmod(path, 0o444)
+    
+    print(f"[db] Archived {year}: {info['row_count']} prices → {rel_path}")
+    return {"year": year, "path": rel_path, **info}
+
+
+def restore_year(year: int, db_path: str = None) -> int:
+    """Move an archived year back into the live table (e.g. to re-scrape or clean it)."""
+    conn = get_db(db_path, mode="rw")
+    partition = next((p for p in _archived_partitions(conn) if p["year"] == year), None)
+    if not partition:
+        conn.close()
+        raise ValueError(f"{year} is not archived")
+    
+    path = os.path.join(_db_dir(conn), partition["path"])
+    columns = ", ".join(PARTITION_COLUMNS)
+    conn.execute("ATTACH DATABASE ? AS archive", (_file_uri(path, "mode=ro"),))
+    count = conn.execute(f"INSERT INTO main.prices ({columns}) SELECT {columns} FROM archive.prices").rowcount
+    conn.execute("DELETE FROM partitions WHERE year = ?", (year,))
+    conn.commit()
+    conn.execute("DETACH DATABASE archive")
+    _write_stats(conn, _compute_stats(conn))
+    conn.commit()
+    conn.close()
+    
+    os.chmod(path, 0o644)
+    os.remove(path)
+    print(f"[db] Restored {year}: {count} prices back into the live table")
+    return count
+
+
 def init_db(db_path: str = None):
     """Initialize database schema."""
-    conn = get_db(db_path)
+    conn = get_db(db_path, mode="rw")
     
-    conn.executescript("""
+    has_stats = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'stats'"
+    ).fetchone() is not None
+    
+    conn.executescript(f"""
         CREATE TABLE IF NOT EXISTS commodities (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             name TEXT NOT NULL,
@@ -34,7 +465,7 @@ def init_db(db_path: str = None):
             specification TEXT,
             unit TEXT DEFAULT 'PHP/kg',
             created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-            UNIQUE(name, specification)
+            natural_key TEXT GENERATED ALWAYS AS ({NATURAL_KEY_SQL}) VIRTUAL  -- unique, see _migrate_natural_key
         );
         
         CREATE TABLE IF NOT EXISTS prices (
@@ -45,6 +476,9 @@ def init_db(db_path: str = None):
             source_type TEXT DEFAULT 'daily',
             source_file TEXT,
             created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            change_seq INTEGER,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            day INTEGER GENERATED ALWAYS AS ({DAY_SQL}) VIRTUAL,
             FOREIGN KEY (commodity_id) REFERENCES commodities(id),
             UNIQUE(commodity_id, date, source_type)
         );
@@ -62,50 +496,522 @@ def init_db(db_path: str = None):
             UNIQUE(date, source_type)
         );
         
-        CREATE INDEX IF NOT EXISTS idx_prices_date ON prices(date);
-        CREATE INDEX IF NOT EXISTS idx_prices_commodity ON prices(commodity_id);
-        CREATE INDEX IF NOT EXISTS idx_prices_date_type ON prices(date, source_type);
+        CREATE TABLE IF NOT EXISTS scrape_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            status TEXT NOT NULL DEFAULT 'running',  -- running, completed, interrupted
+            total INTEGER DEFAULT 0,
+            started_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            finished_at TEXT
+        );
+        
+        CREATE TABLE IF NOT EXISTS scrape_jobs (
+            run_id INTEGER NOT NULL REFERENCES scrape_runs(id),
+            url TEXT NOT NULL,
+            link TEXT NOT NULL,  -- crawler link dict (JSON), so a resume needs no re-crawl
+            status TEXT NOT NULL DEFAULT 'pending',
+            error TEXT,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (run_id, url)
+        );
+        
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+        
+        INSERT OR IGNORE INTO meta (key, value) VALUES ('data_version', '0');
+        -- Random per-database id; data versions restart at 0 in every database
+        INSERT OR IGNORE INTO meta (key, value) VALUES ('instance_id', lower(hex(randomblob(8))));
+        
+        -- Tombstones of deleted price rows, reported by the changes feed (see delete_prices)
+        CREATE TABLE IF NOT EXISTS price_deletions (
+            change_seq INTEGER PRIMARY KEY,
+            price_id INTEGER NOT NULL,
+            commodity_id INTEGER,
+            date TEXT,
+            source_type TEXT,
+            deleted_at TEXT DEFAULT CURRENT_TIMESTAMP
+        );
+        
+        CREATE TABLE IF NOT EXISTS partitions (
+            year INTEGER PRIMARY KEY,
+            path TEXT NOT NULL,
+            row_count INTEGER,
+            first_date TEXT,
+            last_date TEXT,
+            archived_at TEXT DEFAULT CURRENT_TIMESTAMP
+        );
+        
         CREATE INDEX IF NOT EXISTS idx_commodities_category ON commodities(category);
         CREATE INDEX IF NOT EXISTS idx_commodities_name ON commodities(name);
     """)
+    _migrate_change_tracking(conn)
+    _migrate_day_column(conn)
+    conn.executescript(STATS_SCHEMA)
+    _migrate_archive_days(conn)
+    _migrate_natural_key(conn)
+    
+    if not has_stats:
+        _write_stats(conn, _compute_stats(conn))
     
     conn.commit()
     conn.close()
     print(f"[db] Database initialized at {db_path or DB_PATH}")
 
 
-def upsert_commodity(conn: sqlite3.Connection, name: str, category: str = None,
-                     specification: str = None, unit: str = "PHP/kg") -> int:
-    """Insert or get existing commodity, return its ID."""
-    cursor = conn.execute(
-        "SELECT id FROM commodities WHERE name = ? AND (specification = ? OR (specification IS NULL AND ? IS NULL))",
-        (name, specification, specification)
-    )
-    row = cursor.fetchone()
-    if row:
-        if category:
-            conn.execute(
-                "UPDATE commodities SET category = ? WHERE id = ? AND category IS NULL",
-                (category, row["id"])
+def _table_columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    # table_xinfo also lists generated columns
+    return [row[1] for row in conn.execute(f"PRAGMA table_xinfo({table})")]
+
+
+def _migrate_change_tracking(conn: sqlite3.Connection):
+    """Add change_seq/updated_at to databases created before the changes feed."""
+    columns = _table_columns(conn, "prices")
+    if "change_seq" not in columns:
+        conn.execute("ALTER TABLE prices ADD COLUMN change_seq INTEGER")
+        conn.execute("UPDATE prices SET change_seq = id")
+    if "updated_at" not in columns:
+        # ALTER TABLE can't add a CURRENT_TIMESTAMP default; upsert_price always sets it
+        conn.execute("ALTER TABLE prices ADD COLUMN updated_at TEXT")
+        conn.execute("UPDATE prices SET updated_at = created_at")
+    conn.execute("""
+        INSERT OR IGNORE INTO meta (key, value)
+        SELECT 'change_seq', COALESCE(MAX(change_seq), 0) FROM prices
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_prices_change_seq ON prices(change_seq)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_prices_updated_at ON prices(updated_at)")
+
+
+def _migrate_day_column(conn: sqlite3.Connection):
+    """Add the generated day column and move the date indexes onto it.
+    
+    The stats triggers that looked dates up through the old indexes are
+    dropped too; init_db recreates them from STATS_SCHEMA.
+    """
+    if "day" not in _table_columns(conn, "prices"):
+        conn.execute(f"ALTER TABLE prices ADD COLUMN day INTEGER GENERATED ALWAYS AS ({DAY_SQL}) VIRTUAL")
+        for trigger in ("trg_stats_price_insert", "trg_stats_price_delete", "trg_stats_price_update"):
+            conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        print("[db] Added prices.day; rebuilding date indexes")
+    # idx_prices_commodity is covered by idx_prices_commodity_day (and the unique index)
+    for index in ("idx_prices_date", "idx_prices_date_type", "idx_prices_commodity"):
+        conn.execute(f"DROP INDEX IF EXISTS {index}")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_prices_day ON prices(day, source_type)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_prices_commodity_day ON prices(commodity_id, source_type, day)")
+
+
+def _open_archive(conn: sqlite3.Connection, partition: Dict) -> sqlite3.Connection:
+    """Plain read-only connection to an archive file, for migrations to inspect it."""
+    path = os.path.join(_db_dir(conn), partition["path"])
+    return sqlite3.connect(_file_uri(path, "mode=ro"), uri=True)
+
+
+def _rewrite_archive(conn: sqlite3.Connection, partition: Dict, apply):
+    """Change an archive with apply(archive_conn) and return what apply returns.
+    
+    The change is made on a copy that then replaces the original file, so
+    workers that have the old one attached (immutable) keep reading a file
+    that doesn't change. Bumping archived_at makes them attach the new one.
+    """
+    path = os.path.join(_db_dir(conn), partition["path"])
+    tmp_path = path + ".tmp"
+    shutil.copyfile(path, tmp_path)
+    os.chmod(tmp_path, 0o644)
+    archive = sqlite3.connect(tmp_path)
+    result = apply(archive)
+    row_count = archive.execute("SELECT COUNT(*) FROM prices").fetchone()[0]
+    archive.commit()
+    archive.execute("VACUUM")
+    archive.close()
+    os.chmod(tmp_path, 0o444)
+    os.replace(tmp_path, path)
+    
+    conn.execute("UPDATE partitions SET archived_at = CURRENT_TIMESTAMP, row_count = ? WHERE year = ?",
+                 (row_count, partition["year"]))
+    conn.commit()
+    return result
+
+
+def _migrate_archive_days(conn: sqlite3.Connection):
+    """Rewrite archives created before prices.day with the column and its indexes."""
+    for partition in _archived_partitions(conn):
+        archive = _open_archive(conn, partition)
+        migrated = "day" in _table_columns(archive, "prices")
+        archive.close()
+        if migrated:
+            continue
+        _rewrite_archive(conn, partition, lambda archive: archive.executescript(f"""
+            ALTER TABLE prices ADD COLUMN day INTEGER;
+            UPDATE prices SET day = {DAY_SQL};
+            DROP INDEX IF EXISTS idx_prices_date;
+            {ARCHIVE_INDEXES.format(schema="main")}
+        """))
+        print(f"[db] Added day column to archive {partition['year']} ({partition['path']})")
+
+
+def _migrate_natural_key(conn: sqlite3.Connection):
+    """Merge commodities with the same natural key, then add the column and its unique index."""
+    if "natural_key" not in _table_columns(conn, "commodities"):
+        merge_duplicate_commodities(conn)
+        conn.execute(f"ALTER TABLE commodities ADD COLUMN natural_key TEXT GENERATED ALWAYS AS ({NATURAL_KEY_SQL}) VIRTUAL")
+        print("[db] Added commodities.natural_key")
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_commodities_natural_key ON commodities(natural_key)")
+
+
+def _merge_prices(db: sqlite3.Connection, merges: List[Tuple[int, int]], next_seq,
+                  log: sqlite3.Connection = None) -> Tuple[int, int]:
+    """Move the prices of each (duplicate id, kept id) pair onto the kept commodity.
+    
+    Where both have a price for the same date and series, the kept commodity's
+    price stays and the duplicate's is dropped (with a tombstone in `log`, see
+    delete_prices). Moved rows get a new change_seq from next_seq() so the
+    changes feed reports them under the kept id. Returns (moved, dropped).
+    """
+    moved = dropped = 0
+    for dup_id, keep_id in merges:
+        dropped += delete_prices(db, """
+            commodity_id = ? AND EXISTS (
+                SELECT 1 FROM prices k
+                WHERE k.commodity_id = ? AND k.date = prices.date AND k.source_type = prices.source_type
+            )
+        """, (dup_id, keep_id), log)
+        for row in db.execute("SELECT id FROM prices WHERE commodity_id = ?", (dup_id,)).fetchall():
+            db.execute(
+                "UPDATE prices SET commodity_id = ?, change_seq = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                (keep_id, next_seq(), row[0])
             )
-        return row["id"]
+            moved += 1
+    return moved, dropped
+
+
+def merge_duplicate_commodities(conn: sqlite3.Connection) -> int:
+    """Merge commodities with the same natural key into the oldest one. Returns how many were merged.
+    
+    Their prices are moved in the live table and in every archive that has
+    any (see _rewrite_archive); a missing category is taken from a duplicate.
+    """
+    groups = conn.execute(f"""
+        SELECT MIN(id), GROUP_CONCAT(id) FROM commodities
+        GROUP BY {NATURAL_KEY_SQL} HAVING COUNT(*) > 1
+    """).fetchall()
+    merges = [(int(dup_id), keep_id) for keep_id, ids in groups
+              for dup_id in ids.split(",") if int(dup_id) != keep_id]
+    if not merges:
+        return 0
+    
+    dup_ids = [dup_id for dup_id, _ in merges]
+    in_dups = f"commodity_id IN ({','.join('?' * len(dup_ids))})"
+    next_seq = lambda: next_change_seq(conn)
+    moved = dropped = 0
+    for partition in _archived_partitions(conn):
+        archive = _open_archive(conn, partition)
+        affected = archive.execute(f"SELECT 1 FROM prices WHERE {in_dups} LIMIT 1", dup_ids).fetchone()
+        archive.close()
+        if affected:
+            counts = _rewrite_archive(conn, partition, lambda archive: _merge_prices(archive, merges, next_seq, conn))
+            moved, dropped = moved + counts[0], dropped + counts[1]
+    
+    counts = _merge_prices(conn, merges, next_seq)
+    moved, dropped = moved + counts[0], dropped + counts[1]
+    for dup_id, keep_id in merges:
+        conn.execute("""
+            UPDATE commodities SET category = (SELECT category FROM commodities WHERE id = ?)
+            WHERE id = ? AND category IS NULL
+        """, (dup_id, keep_id))
+    conn.execute(f"DELETE FROM commodities WHERE id IN ({','.join('?' * len(dup_ids))})", dup_ids)
+    
+    # Archived prices aren't seen by the stats triggers
+    _write_stats(conn, _compute_stats(conn))
+    bump_data_version(conn)
+    print(f"[db] Merged {len(merges)} duplicate commodities: {moved} prices moved, "
+          f"{dropped} duplicate prices dropped")
+    return len(merges)
+
+
+# Single-row table of counters kept current by triggers, so get_stats() is one
+# lookup. Every trigger only probes an index (EXISTS / MIN / MAX on an indexed
+# column), so ingest cost doesn't grow with the size of the database.
+STATS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS stats (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        total_commodities INTEGER NOT NULL DEFAULT 0,
+        total_prices INTEGER NOT NULL DEFAULT 0,
+        total_dates INTEGER NOT NULL DEFAULT 0,
+        first_date TEXT,
+        last_date TEXT,
+        total_categories INTEGER NOT NULL DEFAULT 0
+    );
+    
+    INSERT OR IGNORE INTO stats (id) VALUES (1);
+    
+    CREATE TRIGGER IF NOT EXISTS trg_stats_price_insert AFTER INSERT ON prices
+    BEGIN
+        UPDATE stats SET
+            total_prices = total_prices + 1,
+            total_dates = total_dates
+                + NOT EXISTS (SELECT 1 FROM prices WHERE day = NEW.day AND id != NEW.id),
+            first_date = CASE WHEN first_date IS NULL OR NEW.date < first_date
+                              THEN NEW.date ELSE first_date END,
+            last_date = CASE WHEN last_date IS NULL OR NEW.date > last_date
+                             THEN NEW.date ELSE last_date END
+        WHERE id = 1;
+    END;
+    
+    CREATE TRIGGER IF NOT EXISTS trg_stats_price_delete AFTER DELETE ON prices
+    BEGIN
+        UPDATE stats SET
+            total_prices = total_prices - 1,
+            total_dates = total_dates
+                - NOT EXISTS (SELECT 1 FROM prices WHERE day = OLD.day),
+            first_date = CASE WHEN OLD.date = first_date
+                              THEN (SELECT date FROM prices ORDER BY day LIMIT 1) ELSE first_date END,
+            last_date = CASE WHEN OLD.date = last_date
+                             THEN (SELECT date FROM prices ORDER BY day DESC LIMIT 1) ELSE last_date END
+        WHERE id = 1;
+    END;
+    
+    CREATE TRIGGER IF NOT EXISTS trg_stats_price_update AFTER UPDATE OF date ON prices
+    WHEN OLD.date != NEW.date
+    BEGIN
+        UPDATE stats SET
+            total_dates = total_dates
+                + NOT EXISTS (SELECT 1 FROM prices WHERE day = NEW.day AND id != NEW.id)
+                - NOT EXISTS (SELECT 1 FROM prices WHERE day = OLD.day),
+            first_date = (SELECT date FROM prices ORDER BY day LIMIT 1),
+            last_date = (SELECT date FROM prices ORDER BY day DESC LIMIT 1)
+        WHERE id = 1;
+    END;
+    
+    CREATE TRIGGER IF NOT EXISTS trg_stats_commodity_insert AFTER INSERT ON commodities
+    BEGIN
+        UPDATE stats SET
+            total_commodities = total_commodities + 1,
+            total_categories = total_categories
+                + (NEW.category IS NOT NULL AND NOT EXISTS (
+                    SELECT 1 FROM commodities WHERE category = NEW.category AND id != NEW.id))
+        WHERE id = 1;
+    END;
+    
+    CREATE TRIGGER IF NOT EXISTS trg_stats_commodity_delete AFTER DELETE ON commodities
+    BEGIN
+        UPDATE stats SET
+            total_commodities = total_commodities - 1,
+            total_categories = total_categories
+                - (OLD.category IS NOT NULL AND NOT EXISTS (
+                    SELECT 1 FROM commodities WHERE category = OLD.category))
+        WHERE id = 1;
+    END;
     
-    cursor = conn.execute(
-        "INSERT INTO commodities (name, category, specification, unit) VALUES (?, ?, ?, ?)",
-        (name, category, specification, unit)
+    CREATE TRIGGER IF NOT EXISTS trg_stats_commodity_update AFTER UPDATE OF category ON commodities
+    WHEN OLD.category IS NOT NEW.category
+    BEGIN
+        UPDATE stats SET
+            total_categories = total_categories
+                + (NEW.category IS NOT NULL AND NOT EXISTS (
+                    SELECT 1 FROM commodities WHERE category = NEW.category AND id != NEW.id))
+                - (OLD.category IS NOT NULL AND NOT EXISTS (
+                    SELECT 1 FROM commodities WHERE category = OLD.category))
+        WHERE id = 1;
+    END;
+"""
+
+STATS_KEYS = [
+    "total_commodities", "total_prices", "total_dates",
+    "first_date", "last_date", "total_categories",
+]
+
+
+def _fetch_dicts(cursor: sqlite3.Cursor) -> List[Dict]:
+    """Fetch all rows as dicts, timing the conversion separately for the slow-request log."""
+    rows = cursor.fetchall()
+    started = time.perf_counter()
+    results = [dict(row) for row in rows]
+    record("to_dict", time.perf_counter() - started)
+    return results
+
+
+def _rows_to_dicts(rows: PriceRows) -> List[Dict]:
+    """PriceRows as a list of dicts, timing the conversion for the slow-request log."""
+    started = time.perf_counter()
+    results = rows.to_dicts()
+    record("to_dict", time.perf_counter() - started)
+    return results
+
+
+# === Commodity dimension cache ===
+# Price rows only carry a commodity_id; the commodity's name, category,
+# specification and unit are the same few hundred strings repeated on every
+# row. Range, history, export and changes queries therefore read just
+# (commodity_id, date, price) and assemble rows from one process-wide table of
+# interned strings, reloaded when the data version changes. Every row of a
+# result shares the same string objects instead of holding its own copies.
+
+_DIMENSIONS: Dict[str, Tuple[int, Dict[int, Tuple], Dict[int, int]]] = {}
+_DIMENSIONS_LOCK = threading.Lock()
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if value is not None else None
+
+
+def _read_data_version(conn: sqlite3.Connection) -> int:
+    try:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'data_version'").fetchone()
+    except sqlite3.OperationalError:
+        # Database predates the meta table
+        row = None
+    return int(row[0]) if row else 0
+
+
+def _commodity_dims(conn: sqlite3.Connection, refresh: bool = False) -> Tuple[Dict[int, Tuple], Dict[int, int]]:
+    """Commodity dimensions for the connection's database: (id → (name, category, specification, unit), id → rank).
+
+    The rank reproduces `ORDER BY category, name` (NULL category first), so
+    rows can be put in the SQL order without joining commodities.
+    """
+    path = _db_file(conn)
+    version = _read_data_version(conn)
+    cached = _DIMENSIONS.get(path)
+    if cached and cached[0] == version and not refresh:
+        return cached[1], cached[2]
+    
+    with _DIMENSIONS_LOCK:
+        cached = _DIMENSIONS.get(path)
+        if cached and cached[0] == version and not refresh:
+            return cached[1], cached[2]
+        rows = conn.execute(
+            "SELECT id, name, category, specification, unit FROM commodities ORDER BY category, name, id"
+        ).fetchall()
+        dims = {row[0]: (_intern(row[1]), _intern(row[2]), _intern(row[3]), _intern(row[4])) for row in rows}
+        rank = {row[0]: i for i, row in enumerate(rows)}
+        _DIMENSIONS[path] = (version, dims, rank)
+    return dims, rank
+
+
+def _dims_for(conn: sqlite3.Connection, points: list, id_index: int = 0) -> Tuple[Dict[int, Tuple], Dict[int, int]]:
+    """Dimensions covering every commodity_id in `points`, reloading once if one is missing.
+
+    A commodity inserted without a data-version bump (e.g. an open ingest
+    transaction on this connection) is the only way to miss the cache.
+    """
+    dims, rank = _commodity_dims(conn)
+    if any(point[id_index] not in dims for point in points):
+        dims, rank = _commodity_dims(conn, refresh=True)
+    return dims, rank
+
+
+def get_commodity_keys(conn: sqlite3.Connection) -> Dict[str, list]:
+    """natural_key → [id, category] for every commodity, for batch ingest."""
+    return {row[1]: [row[0], row[2]] for row in conn.execute(
+        "SELECT id, natural_key, category FROM commodities"
+    )}
+
+
+def upsert_commodity(conn: sqlite3.Connection, name: str, category: str = None,
+                     specification: str = None, unit: str = "PHP/kg", known: Dict = None) -> int:
+    """Insert or get existing commodity, return its ID.
+    
+    Existing commodities are found on the natural_key index; only new ones are
+    inserted (a conflicting INSERT would still use up an AUTOINCREMENT id), and
+    a missing category is filled in. `known` is an optional map from
+    get_commodity_keys(); hits skip the lookup, and new or looked-up
+    commodities are added to it, so a batch of PDFs looks each commodity up
+    once instead of once per row.
+    """
+    key = natural_key(name, specification)
+    entry = known.get(key) if known is not None else None
+    if entry is None:
+        row = conn.execute(
+            "SELECT id, category FROM commodities WHERE natural_key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            row = conn.execute("""
+                INSERT INTO commodities (name, category, specification, unit) VALUES (?, ?, ?, ?)
+                RETURNING id, category
+            """, (name, category, specification, unit)).fetchone()
+        entry = [row[0], row[1]]
+        if known is not None:
+            known[key] = entry
+    
+    if category and entry[1] is None:
+        conn.execute(
+            "UPDATE commodities SET category = ? WHERE id = ? AND category IS NULL",
+            (category, entry[0])
+        )
+        entry[1] = category
+    return entry[0]
+
+
+def next_change_seq(conn: sqlite3.Connection) -> int:
+    """Allocate the next value of the monotonically increasing change sequence."""
+    conn.execute("""
+        INSERT INTO meta (key, value) VALUES ('change_seq', '1')
+        ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1
+    """)
+    return int(conn.execute("SELECT value FROM meta WHERE key = 'change_seq'").fetchone()[0])
+
+
+def _last_change_seq(conn: sqlite3.Connection) -> int:
+    row = conn.execute("SELECT value FROM meta WHERE key = 'change_seq'").fetchone()
+    return int(row[0]) if row else 0
+
+
+def _save_change_seq(conn: sqlite3.Connection, seq: int):
+    conn.execute("""
+        INSERT INTO meta (key, value) VALUES ('change_seq', ?)
+        ON CONFLICT(key) DO UPDATE SET value = excluded.value
+    """, (str(seq),))
+
+
+def delete_prices(conn: sqlite3.Connection, where: str, params: Sequence = (),
+                  log: sqlite3.Connection = None) -> int:
+    """Delete the price rows matching `where`, leaving a tombstone for each. Returns how many.
+    
+    Tombstones go into price_deletions with a fresh change_seq and the row's
+    id, so the changes feed tells mirrors to drop the row. `log` is the main
+    database's connection when `conn` is an archive's.
+    """
+    log = log or conn
+    rows = conn.execute(
+        f"SELECT id, commodity_id, date, source_type FROM prices WHERE {where}", params
+    ).fetchall()
+    if not rows:
+        return 0
+    seq = _last_change_seq(log)
+    log.executemany(
+        "INSERT INTO price_deletions (change_seq, price_id, commodity_id, date, source_type) VALUES (?, ?, ?, ?, ?)",
+        [(seq + i, *row) for i, row in enumerate(rows, 1)]
     )
-    return cursor.lastrowid
+    _save_change_seq(log, seq + len(rows))
+    conn.execute(f"DELETE FROM prices WHERE {where}", params)
+    return len(rows)
 
 
 def upsert_price(conn: sqlite3.Connection, commodity_id: int, date: str,
-                 price: float, source_type: str = "daily", source_file: str = None):
-    """Insert or update a price record."""
-    conn.execute("""
-        INSERT INTO prices (commodity_id, date, price, source_type, source_file)
-        VALUES (?, ?, ?, ?, ?)
+                 price: float, source_type: str = "daily", source_file: str = None,
+                 change_seq: int = None) -> bool:
+    """Insert or update a price record. Returns whether a row was written.
+    
+    New rows and rows whose price changed get change_seq and a fresh updated_at;
+    re-storing an identical price leaves the row untouched so it doesn't show up
+    in the changes feed again. A batch passes the value after its last one as
+    `change_seq`, moves on only when a row was written, and saves the counter
+    once (see store_parsed_result). Without it the next value is taken here and
+    saved only if the row was written, so unchanged rows never use one up.
+    """
+    seq = change_seq if change_seq is not None else _last_change_seq(conn) + 1
+    written = conn.execute("""
+        INSERT INTO prices (commodity_id, date, price, source_type, source_file, change_seq, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
         ON CONFLICT(commodity_id, date, source_type)
-        DO UPDATE SET price = excluded.price, source_file = excluded.source_file
-    """, (commodity_id, date, price, source_type, source_file))
+        DO UPDATE SET price = excluded.price, source_file = excluded.source_file,
+                      change_seq = excluded.change_seq, updated_at = excluded.updated_at
+        WHERE prices.price IS NOT excluded.price
+        RETURNING id
+    """, (commodity_id, date, price, source_type, source_file, seq)).fetchone() is not None
+    if written and change_seq is None:
+        _save_change_seq(conn, seq)
+    return written
 
 
 def log_scrape(conn: sqlite3.Connection, date: str, source_type: str,
@@ -125,78 +1031,224 @@ def log_scrape(conn: sqlite3.Connection, date: str, source_type: str,
           json.dumps(errors) if errors else None))
 
 
-def store_parsed_data(parsed_results: List[Dict], db_path: str = None):
-    """Store parsed PDF data into the database."""
+@timed_query
+def get_data_version(db_path: str = None) -> int:
+    """Get the data version counter, bumped every time new data is stored."""
     conn = get_db(db_path)
+    try:
+        return _read_data_version(conn)
+    finally:
+        conn.close()
+
+
+def _read_instance_id(conn: sqlite3.Connection) -> str:
+    try:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'instance_id'").fetchone()
+    except sqlite3.OperationalError:
+        row = None
+    if row:
+        return row[0]
+    # Database not yet migrated by init_db(); the file's inode tells databases apart
+    return f"{os.stat(_db_file(conn)).st_ino:016x}"
+
+
+def get_data_key(db_path: str = None) -> str:
+    """The data version qualified by the database's instance id, e.g. "3f09c1d2a4b5e6f7-v12".
+    
+    Two databases (a fresh one, another PH_DB_PATH) can be at the same data
+    version, so anything cached outside the process is keyed on this instead.
+    """
+    conn = get_db(db_path)
+    try:
+        return f"{_read_instance_id(conn)}-v{_read_data_version(conn)}"
+    finally:
+        conn.close()
+
+
+def bump_data_version(conn: sqlite3.Connection) -> int:
+    """Increment the data version so API caches keyed on it are invalidated."""
+    conn.execute("""
+        INSERT INTO meta (key, value) VALUES ('data_version', '1')
+        ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1
+    """)
+    return int(conn.execute("SELECT value FROM meta WHERE key = 'data_version'").fetchone()["value"])
+
+
+def store_parsed_result(conn: sqlite3.Connection, result: Dict, archived: set = frozenset(),
+                        known: Dict = None) -> Tuple[int, int]:
+    """Store one parsed PDF on an open connection (no commit). Returns (prices, commodity records).
+    
+    Pass the same `known` map (from get_commodity_keys()) for every PDF of a batch.
+    """
+    date = result.get("date")
+    if not date:
+        return 0, 0
+    if int(date[:4]) in archived:
+        print(f"[db] Skipping {date}: {date[:4]} is archived (restore it first to re-ingest)")
+        return 0, 0
     
+    source_type = result.get("source_type", "daily")
+    source_file = result.get("source_file", "")
     total_prices = 0
     total_commodities = 0
+    first_seq = seq = _last_change_seq(conn)
     
-    for result in parsed_results:
-        date = result.get("date")
-        if not date:
-            continue
-        
-        source_file = result.get("source_file", "")
-        
-        for commodity in result.get("commodities", []):
-            commodity_id = upsert_commodity(
-                conn,
-                name=commodity["name"],
-                category=commodity.get("category"),
-                specification=commodity.get("specification"),
-                unit=commodity.get("unit", "PHP/kg"),
-            )
-            total_commodities += 1
-            
-            if commodity.get("price") is not None:
-                upsert_price(
-                    conn,
-                    commodity_id=commodity_id,
-                    date=date,
-                    price=commodity["price"],
-                    source_type="daily",
-                    source_file=source_file,
-                )
-                total_prices += 1
-        
-        log_scrape(
+    for commodity in result.get("commodities", []):
+        commodity_id = upsert_commodity(
             conn,
-            date=date,
-            source_type="daily",
-            source_file=source_file,
-            parse_method=result.get("parse_method"),
-            commodity_count=len(result.get("commodities", [])),
-            errors=result.get("errors"),
+            name=commodity["name"],
+            category=commodity.get("category"),
+            specification=commodity.get("specification"),
+            unit=commodity.get("unit", "PHP/kg"),
+            known=known,
         )
+        total_commodities += 1
+        
+        if commodity.get("price") is not None:
+            if upsert_price(
+                conn,
+                commodity_id=commodity_id,
+                date=date,
+                price=commodity["price"],
+                source_type=source_type,
+                source_file=source_file,
+                change_seq=seq + 1,
+            ):
+                seq += 1
+            total_prices += 1
+    
+    if seq != first_seq:
+        _save_change_seq(conn, seq)
+    log_scrape(
+        conn,
+        date=date,
+        source_type=source_type,
+        source_file=source_file,
+        parse_method=result.get("parse_method"),
+        commodity_count=len(result.get("commodities", [])),
+        errors=result.get("errors"),
+    )
+    return total_prices, total_commodities
+
+
+def store_parsed_data(parsed_results: List[Dict], db_path: str = None):
+    """Store parsed PDF data into the database."""
+    conn = get_db(db_path, mode="rw")
+    
+    total_prices = 0
+    total_commodities = 0
+    archived = {p["year"] for p in _archived_partitions(conn)}
+    known = get_commodity_keys(conn)
+    
+    for result in parsed_results:
+        prices, commodities = store_parsed_result(conn, result, archived, known)
+        total_prices += prices
+        total_commodities += commodities
     
+    version = bump_data_version(conn)
     conn.commit()
     conn.close()
     
-    print(f"[db] Stored: {total_prices} prices, {total_commodities} commodity records")
+    print(f"[db] Stored: {total_prices} prices, {total_commodities} commodity records (data version {version})")
+
+
+# === Scrape runs (checkpoints for resumable backfills) ===
+# Job status moves pending → downloaded → parsed → stored, or ends in
+# download_failed / parse_failed. Statuses are written by the pipeline's writer
+# on its own connection, so they are committed together with the stored data.
+
+JOB_DONE_STATUSES = ("stored", "parse_failed")
+
+
+def start_scrape_run(links: List[Dict], db_path: str = None) -> int:
+    """Record a new run and one pending job per link. Returns the run id."""
+    conn = get_db(db_path, mode="rw")
+    run_id = conn.execute("INSERT INTO scrape_runs (total) VALUES (?)", (len(links),)).lastrowid
+    conn.executemany(
+        "INSERT OR IGNORE INTO scrape_jobs (run_id, url, link) VALUES (?, ?, ?)",
+        [(run_id, link["url"], json.dumps(link)) for link in links],
+    )
+    conn.commit()
+    conn.close()
+    return run_id
+
+
+def get_resumable_run(db_path: str = None) -> Optional[Dict]:
+    """The most recent run that did not complete, with its job counts by status."""
+    conn = get_db(db_path, mode="rw")
+    row = conn.execute(
+        "SELECT id, status, total, started_at FROM scrape_runs WHERE status != 'completed' ORDER BY id DESC LIMIT 1"
+    ).fetchone()
+    run = None
+    if row:
+        run = dict(row)
+        run["jobs"] = {r["status"]: r["n"] for r in conn.execute(
+            "SELECT status, COUNT(*) as n FROM scrape_jobs WHERE run_id = ? GROUP BY status", (run["id"],)
+        )}
+    conn.close()
+    return run
+
+
+def get_unfinished_jobs(run_id: int, db_path: str = None) -> List[Dict]:
+    """Links of a run that still need work (anything not stored or deterministically unparseable)."""
+    conn = get_db(db_path, mode="rw")
+    placeholders = ",".join("?" for _ in JOB_DONE_STATUSES)
+    links = [json.loads(row["link"]) for row in conn.execute(f"""
+        SELECT link FROM scrape_jobs
+        WHERE run_id = ? AND status NOT IN ({placeholders})
+        ORDER BY rowid
+    """, (run_id, *JOB_DONE_STATUSES))]
+    conn.close()
+    return links
+
+
+def set_job_status(conn: sqlite3.Connection, run_id: int, url: str, status: str, error: str = None):
+    """Update one job on an open connection (no commit)."""
+    conn.execute("""
+        UPDATE scrape_jobs SET status = ?, error = ?, updated_at = CURRENT_TIMESTAMP
+        WHERE run_id = ? AND url = ?
+    """, (status, error, run_id, url))
+
+
+def finish_scrape_run(run_id: int, status: str = "completed", db_path: str = None):
+    conn = get_db(db_path, mode="rw")
+    conn.execute(
+        "UPDATE scrape_runs SET status = ?, finished_at = CURRENT_TIMESTAMP WHERE id = ?",
+        (status, run_id),
+    )
+    conn.commit()
+    conn.close()
 
 
 # === Query functions ===
 
-def get_prices_by_date(date: str, page: int = 1, limit: int = 50, db_path: str = None) -> Dict:
-    """Get all prices for a specific date with pagination."""
+# Row layouts of the range and history queries (dict keys, or PriceRows fields with compact=True)
+RANGE_FIELDS = ("name", "category", "specification", "unit", "price", "date")
+HISTORY_FIELDS = ("name", "category", "specification", "price", "date")
+
+@timed_query
+def get_prices_by_date(date: str, page: int = 1, limit: int = 50, source_type: str = "daily",
+                       db_path: str = None) -> Dict:
+    """Get all prices of one series (daily, weekly, cigarette) for a specific date with pagination."""
     conn = get_db(db_path)
+    source = _prices_from(conn, date, date)
     
     total = conn.execute(
-        "SELECT COUNT(*) FROM prices p JOIN commodities c ON p.commodity_id = c.id WHERE p.date = ?",
-        (date,)
+        f"SELECT COUNT(*) FROM {source} p JOIN commodities c ON p.commodity_id = c.id "
+        f"WHERE p.day = {DAY_PARAM} AND p.source_type = ?",
+        (date, source_type)
     ).fetchone()[0]
     
     offset = (page - 1) * limit
-    cursor = conn.execute("""
+    cursor = conn.execute(f"""
         SELECT c.name, c.category, c.specification, c.unit, p.price, p.date
-        FROM prices p
+        FROM {source} p
         JOIN commodities c ON p.commodity_id = c.id
-        WHERE p.date = ?
+        WHERE p.day = {DAY_PARAM} AND p.source_type = ?
         ORDER BY c.category, c.name
         LIMIT ? OFFSET ?
-    """, (date, limit, offset))
-    results = [dict(row) for row in cursor.fetchall()]
+    """, (date, source_type, limit, offset))
+    results = _fetch_dicts(cursor)
     conn.close()
     
     return {
@@ -210,51 +1262,164 @@ def get_prices_by_date(date: str, page: int = 1, limit: int = 50, db_path: str =
     }
 
 
-def get_latest_prices(db_path: str = None) -> Dict:
-    """Get the most recent prices."""
+@timed_query
+def get_latest_prices(source_type: str = "daily", db_path: str = None) -> Dict:
+    """Get the most recent prices of a series."""
     conn = get_db(db_path)
-    cursor = conn.execute("SELECT MAX(date) as latest FROM prices")
+    cursor = conn.execute("SELECT MAX(day) as latest FROM prices WHERE source_type = ?", (source_type,))
     row = cursor.fetchone()
-    latest_date = row["latest"] if row else None
+    latest_date = day_to_date(row["latest"]) if row and row["latest"] else None
     conn.close()
     
     if latest_date:
-        data = get_prices_by_date(latest_date, page=1, limit=1000, db_path=db_path)
+        data = get_prices_by_date(latest_date, page=1, limit=1000, source_type=source_type, db_path=db_path)
         return {"date": latest_date, "count": data["meta"]["total"], "prices": data["prices"]}
     return {"date": None, "count": 0, "prices": []}
 
 
+@timed_query
 def get_commodity_history(commodity_name: str, days: int = None,
                           date_from: str = None, date_to: str = None,
-                          db_path: str = None) -> List[Dict]:
-    """Get price history for a commodity. Supports date range or days limit."""
+                          source_type: str = "daily", compact: bool = False,
+                          db_path: str = None) -> Union[List[Dict], PriceRows]:
+    """Get price history for a commodity. Supports date range or days limit.
+    
+    With `compact`, returns PriceRows (HISTORY_FIELDS) instead of a list of dicts.
+    """
     conn = get_db(db_path)
+    cursor = conn.cursor()
+    cursor.row_factory = None
     
     if date_from and date_to:
-        cursor = conn.execute("""
-            SELECT c.name, c.category, c.specification, p.price, p.date
-            FROM prices p
-            JOIN commodities c ON p.commodity_id = c.id
-            WHERE c.name LIKE ?
-            AND p.date >= ? AND p.date <= ?
-            ORDER BY p.date DESC
-        """, (f"%{commodity_name}%", date_from, date_to))
+        cursor.execute(f"""
+            SELECT commodity_id, date, price
+            FROM {_prices_from(conn, date_from, date_to)}
+            WHERE commodity_id IN (SELECT id FROM commodities WHERE name LIKE ?)
+            AND source_type = ? AND day >= {DAY_PARAM} AND day <= {DAY_PARAM}
+            ORDER BY day DESC
+        """, (f"%{commodity_name}%", source_type, date_from, date_to))
     else:
         limit = days or 30
-        cursor = conn.execute("""
-            SELECT c.name, c.category, c.specification, p.price, p.date
-            FROM prices p
-            JOIN commodities c ON p.commodity_id = c.id
-            WHERE c.name LIKE ?
-            ORDER BY p.date DESC
+        # Unary + keeps SQLite walking the day index until LIMIT rows match,
+        # instead of collecting the commodities' whole history and sorting it
+        cursor.execute(f"""
+            SELECT commodity_id, date, price
+            FROM {_prices_from(conn)}
+            WHERE +commodity_id IN (SELECT id FROM commodities WHERE name LIKE ?)
+            AND source_type = ?
+            ORDER BY day DESC
             LIMIT ?
-        """, (f"%{commodity_name}%", limit))
+        """, (f"%{commodity_name}%", source_type, limit))
     
-    results = [dict(row) for row in cursor.fetchall()]
+    points = cursor.fetchall()
+    dims, _ = _dims_for(conn, points)
     conn.close()
+    
+    rows = PriceRows(HISTORY_FIELDS, dims, points)
+    results = rows if compact else _rows_to_dicts(rows)
     return results
 
 
+@timed_query
+def get_history_batch(commodity_ids: List[int] = None, names: List[str] = None,
+                      date_from: str = None, date_to: str = None, days: int = 30,
+                      source_type: str = "daily", db_path: str = None) -> Dict:
+    """Get price history for many commodities at once as columnar series.
+
+    Commodities are matched by id or exact (case-insensitive) name. All series share
+    one date axis; prices are None on dates a commodity wasn't reported. Without
+    date_from, the last `days` trading days up to date_to are returned.
+    """
+    commodity_ids = list(commodity_ids or [])
+    names = list(names or [])
+    conn = get_db(db_path)
+    
+    conditions, params = [], []
+    if commodity_ids:
+        conditions.append(f"id IN ({','.join('?' * len(commodity_ids))})")
+        params += commodity_ids
+    if names:
+        conditions.append(f"name COLLATE NOCASE IN ({','.join('?' * len(names))})")
+        params += names
+    
+    commodities = []
+    if conditions:
+        commodities = [dict(row) for row in conn.execute(f"""
+            SELECT id, name, category, specification, unit
+            FROM commodities
+            WHERE {' OR '.join(conditions)}
+            ORDER BY category, name
+        """, params)]
+    
+    found_ids = {c["id"] for c in commodities}
+    found_names = {c["name"].lower() for c in commodities}
+    missing = [i for i in commodity_ids if i not in found_ids] + \
+              [n for n in names if n.lower() not in found_names]
+    
+    if not commodities:
+        conn.close()
+        return {"from": date_from, "to": date_to, "dates": [], "series": [], "missing": missing}
+    
+    if not date_to:
+        latest = conn.execute(
+            "SELECT MAX(day) FROM prices WHERE source_type = ?", (source_type,)
+        ).fetchone()[0]
+        date_to = day_to_date(latest) if latest else None
+    if not date_from:
+        row = conn.execute(f"""
+            SELECT MIN(day) FROM (
+                SELECT DISTINCT day FROM {_prices_from(conn, None, date_to)}
+                WHERE source_type = ? AND day <= {DAY_PARAM}
+                ORDER BY day DESC LIMIT ?
+            )
+        """, (source_type, date_to, days)).fetchone()
+        date_from = day_to_date(row[0]) if row[0] else None
+    
+    # One query over the (commodity_id, source_type, day) index
+    ids = [c["id"] for c in commodities]
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    points = cursor.execute(f"""
+        SELECT commodity_id, date, price
+        FROM {_prices_from(conn, date_from, date_to)}
+        WHERE commodity_id IN ({','.join('?' * len(ids))})
+        AND source_type = ?
+        AND day >= {DAY_PARAM} AND day <= {DAY_PARAM}
+        ORDER BY day
+    """, ids + [source_type, date_from, date_to]).fetchall()
+    conn.close()
+    
+    dates = sorted({p[1] for p in points})
+    date_index = {d: j for j, d in enumerate(dates)}
+    row_index = {cid: i for i, cid in enumerate(ids)}
+    columns = [[None] * len(dates) for _ in ids]
+    for commodity_id, date, price in points:
+        columns[row_index[commodity_id]][date_index[date]] = price
+    
+    return {
+        "from": date_from,
+        "to": date_to,
+        "dates": dates,
+        "series": [{**c, "prices": columns[i]} for i, c in enumerate(commodities)],
+        "missing": missing,
+    }
+
+
+def _price_counts_sql(conn: sqlite3.Connection) -> str:
+    """Per-commodity price count and date bounds, aggregated before joining to commodities.
+    
+    Reads only commodity_id and day, so the live table is scanned through the
+    (commodity_id, source_type, day) index without touching table rows.
+    """
+    return f"""
+        SELECT commodity_id, COUNT(*) as price_count,
+               {_date_sql("MIN(day)")} as first_date, {_date_sql("MAX(day)")} as last_date
+        FROM {_prices_from(conn)}
+        GROUP BY commodity_id
+    """
+
+
+@timed_query
 def get_all_commodities(page: int = 1, limit: int = 50, db_path: str = None) -> Dict:
     """Get all unique commodities with pagination."""
     conn = get_db(db_path)
@@ -262,18 +1427,17 @@ def get_all_commodities(page: int = 1, limit: int = 50, db_path: str = None) ->
     total = conn.execute("SELECT COUNT(*) FROM commodities").fetchone()[0]
     offset = (page - 1) * limit
     
-    cursor = conn.execute("""
+    cursor = conn.execute(f"""
         SELECT c.id, c.name, c.category, c.specification, c.unit,
-               COUNT(p.id) as price_count,
-               MIN(p.date) as first_date,
-               MAX(p.date) as last_date
+               COALESCE(p.price_count, 0) as price_count,
+               p.first_date,
+               p.last_date
         FROM commodities c
-        LEFT JOIN prices p ON c.id = p.commodity_id
-        GROUP BY c.id
+        LEFT JOIN ({_price_counts_sql(conn)}) p ON c.id = p.commodity_id
         ORDER BY c.category, c.name
         LIMIT ? OFFSET ?
     """, (limit, offset))
-    results = [dict(row) for row in cursor.fetchall()]
+    results = _fetch_dicts(cursor)
     conn.close()
     
     return {
@@ -287,120 +1451,293 @@ def get_all_commodities(page: int = 1, limit: int = 50, db_path: str = None) ->
     }
 
 
+@timed_query
 def get_categories(db_path: str = None) -> List[Dict]:
     """Get all unique categories with commodity counts."""
     conn = get_db(db_path)
-    cursor = conn.execute("""
-        SELECT c.category, COUNT(DISTINCT c.id) as commodity_count,
-               COUNT(p.id) as price_count,
-               MIN(p.date) as first_date, MAX(p.date) as last_date
+    cursor = conn.execute(f"""
+        SELECT c.category, COUNT(c.id) as commodity_count,
+               COALESCE(SUM(p.price_count), 0) as price_count,
+               MIN(p.first_date) as first_date, MAX(p.last_date) as last_date
         FROM commodities c
-        LEFT JOIN prices p ON c.id = p.commodity_id
+        LEFT JOIN ({_price_counts_sql(conn)}) p ON c.id = p.commodity_id
         WHERE c.category IS NOT NULL
         GROUP BY c.category
         ORDER BY c.category
     """)
-    results = [dict(row) for row in cursor.fetchall()]
+    results = _fetch_dicts(cursor)
     conn.close()
     return results
 
 
+@timed_query
 def get_prices_range(date_from: str, date_to: str, commodity: str = None,
-                     db_path: str = None) -> List[Dict]:
-    """Get prices for a date range, optionally filtered by commodity."""
+                     source_type: str = "daily", compact: bool = False,
+                     db_path: str = None) -> Union[List[Dict], PriceRows]:
+    """Get prices for a date range, optionally filtered by commodity.
+    
+    With `compact`, returns PriceRows (RANGE_FIELDS) instead of a list of dicts.
+    """
     conn = get_db(db_path)
+    cursor = conn.cursor()
+    cursor.row_factory = None
     
+    params = [date_from, date_to, source_type]
+    commodity_filter = ""
     if commodity:
-        cursor = conn.execute("""
-            SELECT c.name, c.category, c.specification, c.unit, p.price, p.date
-            FROM prices p
-            JOIN commodities c ON p.commodity_id = c.id
-            WHERE p.date >= ? AND p.date <= ?
-            AND c.name LIKE ?
-            ORDER BY p.date, c.category, c.name
-        """, (date_from, date_to, f"%{commodity}%"))
-    else:
-        cursor = conn.execute("""
-            SELECT c.name, c.category, c.specification, c.unit, p.price, p.date
-            FROM prices p
-            JOIN commodities c ON p.commodity_id = c.id
-            WHERE p.date >= ? AND p.date <= ?
-            ORDER BY p.date, c.category, c.name
-        """, (date_from, date_to))
-    
-    results = [dict(row) for row in cursor.fetchall()]
+        commodity_filter = "AND commodity_id IN (SELECT id FROM commodities WHERE name LIKE ?)"
+        params.append(f"%{commodity}%")
+    points = cursor.execute(f"""
+        SELECT commodity_id, date, price
+        FROM {_prices_from(conn, date_from, date_to)}
+        WHERE day >= {DAY_PARAM} AND day <= {DAY_PARAM} AND source_type = ?
+        {commodity_filter}
+    """, params).fetchall()
+    dims, rank = _dims_for(conn, points)
     conn.close()
+    
+    points.sort(key=lambda p: (p[1], rank[p[0]]))  # ORDER BY date, category, name
+    rows = PriceRows(RANGE_FIELDS, dims, points)
+    results = rows if compact else _rows_to_dicts(rows)
     return results
 
 
+EXPORT_COLUMNS = ["date", "source_type", "category", "commodity", "specification", "unit", "price"]
+
+
+def _export_groups(conn: sqlite3.Connection):
+    """All price points as (dims, group) pairs, in date, source_type, category, name order.
+    
+    A group is the (commodity_id, date, source_type, price) points of one
+    date and series. SQLite only sorts by (day, source_type); each group is a
+    few hundred rows, put in category/name order from the dimension ranks, so
+    the export still streams.
+    """
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    cursor.execute(f"""
+        SELECT commodity_id, date, source_type, price
+        FROM {_prices_from(conn)}
+        ORDER BY day, source_type
+    """)
+    dims, rank = _commodity_dims(conn)
+    group, group_key = [], None
+    while True:
+        points = cursor.fetchmany(1000)
+        if any(p[0] not in dims for p in points):
+            dims, rank = _commodity_dims(conn, refresh=True)
+        for point in points:
+            if point[1:3] != group_key:
+                if group:
+                    group.sort(key=lambda p: rank[p[0]])
+                    yield dims, group
+                group, group_key = [], point[1:3]
+            group.append(point)
+        if not points:
+            break
+    if group:
+        group.sort(key=lambda p: rank[p[0]])
+        yield dims, group
+
+
+def _export_rows(conn: sqlite3.Connection):
+    """Export rows as tuples in EXPORT_COLUMNS order."""
+    for dims, group in _export_groups(conn):
+        for commodity_id, date, source_type, price in group:
+            name, category, specification, unit = dims[commodity_id]
+            yield date, source_type, category, name, specification, unit, price
+
+
 def export_all(db_path: str = None):
     """Generator that yields all price records for streaming export."""
+    # Streamed responses resume the generator on whichever threadpool thread is free
+    conn = get_db(db_path, pooled=False)
+    try:
+        for date, source_type, category, name, specification, unit, price in _export_rows(conn):
+            yield {"date": date, "source_type": source_type, "category": category, "commodity": name,
+                   "specification": specification, "unit": unit, "price": price}
+    finally:
+        conn.close()
+
+
+def export_chunks(chunk_rows: int = 5000, db_path: str = None):
+    """Generator over all price records (same rows and order as export_all) as PriceRows of about `chunk_rows` rows."""
+    # Streamed responses resume the generator on whichever threadpool thread is free
+    conn = get_db(db_path, pooled=False)
+    try:
+        chunk = []
+        for dims, group in _export_groups(conn):
+            chunk += group
+            if len(chunk) >= chunk_rows:
+                yield PriceRows(EXPORT_COLUMNS, dims, chunk)
+                chunk = []
+        if chunk:
+            yield PriceRows(EXPORT_COLUMNS, dims, chunk)
+    finally:
+        conn.close()
+
+
+@timed_query
+def get_price_points(source_type: str = "daily", db_path: str = None) -> Dict:
+    """Get every (commodity_id, date, price) point plus the commodity and date axes.
+
+    Used to load the in-memory price matrix; rows are plain tuples to keep the
+    transfer out of SQLite as small as possible.
+    """
     conn = get_db(db_path)
-    cursor = conn.execute("""
-        SELECT p.date, c.category, c.name as commodity, c.specification, c.unit, p.price
-        FROM prices p
-        JOIN commodities c ON p.commodity_id = c.id
-        ORDER BY p.date, c.category, c.name
-    """)
+    source = _prices_from(conn)
+    commodities = [dict(row) for row in conn.execute(f"""
+        SELECT id, name, category, specification, unit
+        FROM commodities
+        WHERE id IN (SELECT commodity_id FROM {source} WHERE source_type = ?)
+        ORDER BY category, name
+    """, (source_type,))]
+    days = [row[0] for row in conn.execute(
+        f"SELECT DISTINCT day FROM {source} WHERE source_type = ? ORDER BY day", (source_type,)
+    )]
+    cursor = conn.cursor()
+    cursor.row_factory = None  # plain tuples
+    points = cursor.execute(
+        f"SELECT commodity_id, date, price FROM {source} WHERE source_type = ? AND price IS NOT NULL",
+        (source_type,)
+    ).fetchall()
+    conn.close()
+    return {"commodities": commodities, "dates": [day_to_date(d) for d in days], "days": days, "points": points}
+
+
+@timed_query
+def export_columns(db_path: str = None) -> Dict[str, list]:
+    """All price records (same rows and order as export_all) as a dict of column lists."""
+    conn = get_db(db_path)
+    rows = list(_export_rows(conn))
+    conn.close()
     
-    while True:
-        rows = cursor.fetchmany(1000)
-        if not rows:
-            break
-        for row in rows:
-            yield dict(row)
+    columns = list(zip(*rows)) if rows else [()] * len(EXPORT_COLUMNS)
+    return {name: list(col) for name, col in zip(EXPORT_COLUMNS, columns)}
+
+
+def iter_changes(since_seq: int = None, since_time: str = None, limit: int = None,
+                 db_path: str = None):
+    """Generator over price rows inserted, updated or deleted after a change sequence or timestamp.
     
+    Rows come in change_seq order, so a consumer can resume from the last seq it
+    saw. Every row carries the price row's `id`; deleted rows come as tombstones
+    ({"seq", "id", "deleted": True, ...}) from price_deletions.
+    """
+    # Streamed responses resume the generator on whichever threadpool thread is free
+    conn = get_db(db_path, pooled=False)
+    try:
+        if since_time is not None:
+            column, param = "{time} > ?", since_time
+        else:
+            column, param = "change_seq > ?", since_seq or 0
+        sql = f"""
+            SELECT change_seq, id, date, commodity_id, price, source_type, updated_at, 0
+            FROM {_prices_from(conn)}
+            WHERE {column.format(time="updated_at")}
+        """
+        params = [param]
+        if "change_seq" in _table_columns(conn, "price_deletions"):
+            sql += f"""
+            UNION ALL
+            SELECT change_seq, price_id, date, commodity_id, NULL, source_type, deleted_at, 1
+            FROM price_deletions
+            WHERE {column.format(time="deleted_at")}
+            """
+            params.append(param)
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        cursor.execute(sql + "ORDER BY 1 LIMIT ?", params + [limit if limit else -1])
+        
+        while True:
+            rows = cursor.fetchmany(1000)
+            if not rows:
+                break
+            dims, _ = _dims_for(conn, [row for row in rows if not row[7]], id_index=3)
+            for seq, price_id, date, commodity_id, price, source_type, updated_at, deleted in rows:
+                if deleted:
+                    yield {"seq": seq, "id": price_id, "deleted": True, "date": date,
+                           "commodity_id": commodity_id, "source_type": source_type, "updated_at": updated_at}
+                    continue
+                name, category, specification, unit = dims[commodity_id]
+                yield {"seq": seq, "id": price_id, "date": date, "commodity_id": commodity_id, "commodity": name,
+                       "category": category, "specification": specification, "unit": unit,
+                       "price": price, "source_type": source_type, "updated_at": updated_at}
+    finally:
+        conn.close()
+
+
+@timed_query
+def get_change_seq(db_path: str = None) -> int:
+    """Get the latest allocated change sequence number."""
+    conn = get_db(db_path)
+    try:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'change_seq'").fetchone()
+    except sqlite3.OperationalError:
+        row = None
+    finally:
+        conn.close()
+    return int(row[0]) if row else 0
+
+
+def warm_db(db_path: str = None) -> int:
+    """Read every index of the live database once so its pages are cached. Returns the index count."""
+    conn = get_db(db_path)
+    indexes = conn.execute(
+        "SELECT name, tbl_name FROM sqlite_master WHERE type = 'index'"
+    ).fetchall()
+    for index in indexes:
+        # A forced COUNT(*) walks the whole index b-tree without touching the table
+        conn.execute(f'SELECT COUNT(*) FROM "{index["tbl_name"]}" INDEXED BY "{index["name"]}"').fetchone()
     conn.close()
+    return len(indexes)
 
 
 def get_date_range(db_path: str = None) -> Dict:
     """Get available date range."""
-    conn = get_db(db_path)
-    cursor = conn.execute("""
-        SELECT MIN(date) as first_date, MAX(date) as last_date, COUNT(DISTINCT date) as total_dates
-        FROM prices
-    """)
-    row = cursor.fetchone()
-    conn.close()
-    return dict(row) if row else {}
+    stats = get_stats(db_path)
+    return {k: stats[k] for k in ("first_date", "last_date", "total_dates")}
 
 
+@timed_query
 def search_prices(query: str, date: str = None, limit: int = 50, offset: int = 0,
-                  db_path: str = None) -> Dict:
-    """Search commodities by name with pagination."""
+                  source_type: str = "daily", db_path: str = None) -> Dict:
+    """Search commodities of one series by name with pagination."""
     conn = get_db(db_path)
     
     if date:
+        source = _prices_from(conn, date, date)
         total = conn.execute(
-            "SELECT COUNT(*) FROM prices p JOIN commodities c ON p.commodity_id = c.id WHERE (c.name LIKE ? OR c.category LIKE ?) AND p.date = ?",
-            (f"%{query}%", f"%{query}%", date)
+            f"SELECT COUNT(*) FROM {source} p JOIN commodities c ON p.commodity_id = c.id WHERE (c.name LIKE ? OR c.category LIKE ?) AND p.day = {DAY_PARAM} AND p.source_type = ?",
+            (f"%{query}%", f"%{query}%", date, source_type)
         ).fetchone()[0]
         
-        cursor = conn.execute("""
+        cursor = conn.execute(f"""
             SELECT c.name, c.category, c.specification, c.unit, p.price, p.date
-            FROM prices p
+            FROM {source} p
             JOIN commodities c ON p.commodity_id = c.id
-            WHERE (c.name LIKE ? OR c.category LIKE ?) AND p.date = ?
+            WHERE (c.name LIKE ? OR c.category LIKE ?) AND p.day = {DAY_PARAM} AND p.source_type = ?
             ORDER BY c.category, c.name
             LIMIT ? OFFSET ?
-        """, (f"%{query}%", f"%{query}%", date, limit, offset))
+        """, (f"%{query}%", f"%{query}%", date, source_type, limit, offset))
     else:
         total = conn.execute(
-            "SELECT COUNT(*) FROM prices p JOIN commodities c ON p.commodity_id = c.id WHERE (c.name LIKE ? OR c.category LIKE ?) AND p.date = (SELECT MAX(date) FROM prices)",
-            (f"%{query}%", f"%{query}%")
+            "SELECT COUNT(*) FROM prices p JOIN commodities c ON p.commodity_id = c.id WHERE (c.name LIKE ? OR c.category LIKE ?) AND p.source_type = ? "
+            "AND p.day = (SELECT MAX(day) FROM prices WHERE source_type = ?)",
+            (f"%{query}%", f"%{query}%", source_type, source_type)
         ).fetchone()[0]
         
         cursor = conn.execute("""
             SELECT c.name, c.category, c.specification, c.unit, p.price, p.date
             FROM prices p
             JOIN commodities c ON p.commodity_id = c.id
-            WHERE (c.name LIKE ? OR c.category LIKE ?)
-            AND p.date = (SELECT MAX(date) FROM prices)
+            WHERE (c.name LIKE ? OR c.category LIKE ?) AND p.source_type = ?
+            AND p.day = (SELECT MAX(day) FROM prices WHERE source_type = ?)
             ORDER BY c.category, c.name
             LIMIT ? OFFSET ?
-        """, (f"%{query}%", f"%{query}%", limit, offset))
+        """, (f"%{query}%", f"%{query}%", source_type, source_type, limit, offset))
     
-    results = [dict(row) for row in cursor.fetchall()]
+    results = _fetch_dicts(cursor)
     conn.close()
     
     return {
@@ -414,27 +1751,99 @@ def search_prices(query: str, date: str = None, limit: int = 50, offset: int = 0
     }
 
 
+def _compute_stats(conn: sqlite3.Connection) -> Dict:
+    """Recompute statistics from scratch with full-table queries across all partitions.
+    
+    Archives are read one at a time on their own connection, however many there
+    are. A year is only ever in one partition, so counts simply add up.
+    """
+    stats = {
+        "total_commodities": conn.execute("SELECT COUNT(*) FROM commodities").fetchone()[0],
+        "total_prices": 0, "total_dates": 0, "first_date": None, "last_date": None,
+        "total_categories": conn.execute(
+            "SELECT COUNT(DISTINCT category) FROM commodities WHERE category IS NOT NULL"
+        ).fetchone()[0],
+    }
+    partitions = _present_partitions(conn, _archived_partitions(conn))
+    for partition in [None] + partitions:
+        db = conn if partition is None else _open_archive(conn, partition)
+        count, dates, first, last = db.execute("""
+            SELECT COUNT(*),
+                   (SELECT COUNT(*) FROM (SELECT DISTINCT day FROM prices)),
+                   (SELECT date FROM prices ORDER BY day LIMIT 1),
+                   (SELECT date FROM prices ORDER BY day DESC LIMIT 1)
+            FROM prices
+        """).fetchone()
+        if partition is not None:
+            db.close()
+        stats["total_prices"] += count
+        stats["total_dates"] += dates
+        if first and (stats["first_date"] is None or first < stats["first_date"]):
+            stats["first_date"] = first
+        if last and (stats["last_date"] is None or last > stats["last_date"]):
+            stats["last_date"] = last
+    return stats
+
+
+def _write_stats(conn: sqlite3.Connection, stats: Dict):
+    conn.execute(
+        f"UPDATE stats SET {', '.join(f'{k} = ?' for k in STATS_KEYS)} WHERE id = 1",
+        [stats[k] for k in STATS_KEYS]
+    )
+
+
+@timed_query
 def get_stats(db_path: str = None) -> Dict:
-    """Get database statistics."""
+    """Get database statistics from the trigger-maintained stats row."""
     conn = get_db(db_path)
-    
-    stats = {}
-    for query, key in [
-        ("SELECT COUNT(*) as n FROM commodities", "total_commodities"),
-        ("SELECT COUNT(*) as n FROM prices", "total_prices"),
-        ("SELECT COUNT(DISTINCT date) as n FROM prices", "total_dates"),
-        ("SELECT MIN(date) as n FROM prices", "first_date"),
-        ("SELECT MAX(date) as n FROM prices", "last_date"),
-        ("SELECT COUNT(DISTINCT category) as n FROM commodities WHERE category IS NOT NULL", "total_categories"),
-    ]:
-        row = conn.execute(query).fetchone()
-        stats[key] = row["n"] if row else 0
-    
+    try:
+        row = conn.execute(f"SELECT {', '.join(STATS_KEYS)} FROM stats WHERE id = 1").fetchone()
+        stats = dict(row) if row else _compute_stats(conn)
+    except sqlite3.OperationalError:
+        # Database predates the stats table (e.g. opened read-only before migrating)
+        stats = _compute_stats(conn)
     conn.close()
     return stats
 
 
+def reconcile_stats(db_path: str = None) -> Dict:
+    """Recompute the stats row from the data, fixing any drift. Returns the fields that changed."""
+    conn = get_db(db_path, mode="rw")
+    stored = dict(conn.execute(f"SELECT {', '.join(STATS_KEYS)} FROM stats WHERE id = 1").fetchone())
+    actual = _compute_stats(conn)
+    drift = {k: {"stored": stored[k], "actual": actual[k]} for k in STATS_KEYS if stored[k] != actual[k]}
+    if drift:
+        _write_stats(conn, actual)
+        conn.commit()
+    conn.close()
+    return drift
+
+
 if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="PH Price Index database")
+    parser.add_argument("--reconcile-stats", action="store_true",
+                        help="Recompute the maintained stats row from the data")
+    parser.add_argument("--archive-year", type=int, metavar="YEAR",
+                        help="Move a closed year of prices into its own archive database")
+    parser.add_argument("--restore-year", type=int, metavar="YEAR",
+                        help="Move an archived year back into the live table")
+    parser.add_argument("--list-partitions", action="store_true",
+                        help="List archived year partitions")
+    args = parser.parse_args()
+    
     init_db()
+    if args.archive_year:
+        archive_year(args.archive_year)
+    if args.restore_year:
+        restore_year(args.restore_year)
+    if args.list_partitions:
+        conn = get_db()
+        for p in _archived_partitions(conn):
+            print(f"[db] {p['year']}: {p['row_count']} prices, {p['first_date']} → {p['last_date']} ({p['path']})")
+        conn.close()
+    if args.reconcile_stats:
+        drift = reconcile_stats()
+        print(f"[db] Stats reconciled: {json.dumps(drift) if drift else 'no drift'}")
     stats = get_stats()
     print(json.dumps(stats, indent=2))
@@ -0,0 +1,106 @@
+"""
+Columnar (Parquet / Arrow IPC) exports of the full dataset.
+
+Exports are built once per data version — right after the scraper stores new
+data, or lazily by the first API request that needs them — and served as
+static files. Files are named by the data key (database instance id + data
+version), so another database at the same version never reuses them. Series (source_type), category, commodity, specification and unit are
+dictionary-encoded; dates and prices are stored as typed columns, so files
+are a fraction of the CSV's size and load straight into pandas/polars.
+"""
+import os
+import tempfile
+from typing import Dict
+
+try:
+    import fcntl
+except ImportError:  # Windows — fall back to unlocked builds
+    fcntl = None
+
+from database import export_columns, get_data_key
+
+EXPORT_DIR = os.environ.get("PH_EXPORT_DIR") or os.path.join(os.path.dirname(__file__), "data", "exports")
+
+FORMATS = {
+    "parquet": ".parquet",
+    "arrow": ".arrow",
+}
+
+DICTIONARY_COLUMNS = ["source_type", "category", "commodity", "specification", "unit"]
+
+
+def export_path(fmt: str, data_key: str, export_dir: str = None) -> str:
+    return os.path.join(export_dir or EXPORT_DIR, f"ph-price-index-{data_key}{FORMATS[fmt]}")
+
+
+def _build_table(db_path: str = None):
+    import pyarrow as pa
+
+    columns = export_columns(db_path)
+    arrays = {
+        "date": pa.array(columns["date"], type=pa.string()).cast(pa.date32()),
+        **{name: pa.array(columns[name], type=pa.string()).dictionary_encode() for name in DICTIONARY_COLUMNS},
+        "price": pa.array(columns["price"], type=pa.float64()),
+    }
+    names = ["date", "source_type", "category", "commodity", "specification", "unit", "price"]
+    return pa.table([arrays[n] for n in names], names=names)
+
+
+def build_columnar_exports(db_path: str = None, export_dir: str = None, data_key: str = None) -> Dict[str, str]:
+    """Write Parquet and Arrow IPC exports for the current data key. Returns format -> path."""
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+
+    export_dir = export_dir or EXPORT_DIR
+    data_key = get_data_key(db_path) if data_key is None else data_key
+    os.makedirs(export_dir, exist_ok=True)
+
+    table = _build_table(db_path)
+    paths = {}
+    for fmt in FORMATS:
+        path = export_path(fmt, data_key, export_dir)
+        fd, tmp_path = tempfile.mkstemp(dir=export_dir, prefix=".export-", suffix=".tmp")
+        os.close(fd)
+        if fmt == "parquet":
+            pq.write_table(table, tmp_path, compression="zstd")
+        else:
+            feather.write_feather(table, tmp_path, compression="zstd")
+        os.replace(tmp_path, path)
+        paths[fmt] = path
+
+    # Remove exports from older data versions and other databases
+    current = {os.path.basename(p) for p in paths.values()}
+    for filename in os.listdir(export_dir):
+        if filename.startswith("ph-price-index-") and filename not in current:
+            try:
+                os.remove(os.path.join(export_dir, filename))
+            except OSError:
+                pass
+
+    sizes = ", ".join(f"{fmt} {os.path.getsize(p) / 1024:.0f} KB" for fmt, p in paths.items())
+    print(f"[export] Built columnar exports for {data_key}: {table.num_rows} rows ({sizes})")
+    return paths
+
+
+def get_columnar_export(fmt: str, data_key: str, db_path: str = None, export_dir: str = None) -> str:
+    """Path to the export for this data key, building it (once across processes) if missing."""
+    path = export_path(fmt, data_key, export_dir)
+    if os.path.exists(path):
+        return path
+
+    export_dir = export_dir or EXPORT_DIR
+    os.makedirs(export_dir, exist_ok=True)
+    with open(os.path.join(export_dir, "export.lock"), "w") as lock:
+        if fcntl:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            if not os.path.exists(path):
+                build_columnar_exports(db_path, export_dir, data_key)
+        finally:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+    return path
+
+
+if __name__ == "__main__":
+    build_columnar_exports()
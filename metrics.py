@@ -0,0 +1,341 @@
+"""
+Prometheus-style metrics without external dependencies.
+
+Counters and histograms live in process memory and are rendered in the
+Prometheus text exposition format by the API's /metrics endpoint:
+
+- request latency per route (MetricsMiddleware)
+- time and rows per database query function (@timed_query)
+- cache hit/miss counters, read from the caches at scrape time (collectors)
+- scraper stage durations, written by run_scraper.py to a textfile
+  (data/metrics/scraper.prom) that /metrics appends
+
+API workers are separate processes, so each one periodically writes a
+snapshot of its metrics to the metrics directory and /metrics sums the
+snapshots of all live workers.
+"""
+import os
+import json
+import time
+import tempfile
+import functools
+import threading
+from bisect import bisect_left
+from collections.abc import Sized
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from profiling import record_query
+
+METRICS_DIR = os.environ.get("PH_METRICS_DIR") or os.path.join(
+    os.path.dirname(__file__), "data", "metrics"
+)
+
+# Seconds between snapshots written by each API worker
+SNAPSHOT_INTERVAL = 5
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ROW_BUCKETS = (1, 10, 50, 100, 500, 1000, 5000, 10000, 50000, 100000)
+
+# (name, labels) -> value; labels are a tuple of (key, value) pairs
+Samples = Dict[Tuple[str, Tuple], float]
+
+
+class Counter:
+    """Monotonic counter with labels."""
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> Samples:
+        with self._lock:
+            return {(self.name, key): value for key, value in self._values.items()}
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels."""
+
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: Iterable[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self._values = {}  # labels -> [per-bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [0] * (len(self.buckets) + 2)
+            counts[index] += 1
+            counts[-1] += value
+
+    def samples(self) -> Samples:
+        out = {}
+        with self._lock:
+            items = [(key, list(counts)) for key, counts in self._values.items()]
+        for key, counts in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                out[(f"{self.name}_bucket", key + (("le", le),))] = cumulative
+            out[(f"{self.name}_count", key)] = cumulative
+            out[(f"{self.name}_sum", key)] = counts[-1]
+        return out
+
+
+_metrics: List = []
+_collectors: List[Callable[[], Iterable[Tuple[str, str, str, Dict, float]]]] = []
+
+
+def counter(name: str, help: str) -> Counter:
+    metric = Counter(name, help)
+    _metrics.append(metric)
+    return metric
+
+
+def histogram(name: str, help: str, buckets: Iterable[float] = LATENCY_BUCKETS) -> Histogram:
+    metric = Histogram(name, help, buckets)
+    _metrics.append(metric)
+    return metric
+
+
+def register_collector(collector: Callable):
+    """Register a callable yielding (name, type, help, labels, value) counters at scrape time."""
+    _collectors.append(collector)
+
+
+# ============================================================
+# Built-in metrics
+# ============================================================
+
+http_request_seconds = histogram("ph_http_request_duration_seconds", "HTTP request latency by route")
+db_query_seconds = histogram("ph_db_query_duration_seconds", "Time spent in each database query function")
+db_query_rows = histogram("ph_db_query_rows", "Rows returned by each database query function", ROW_BUCKETS)
+
+
+def _count_rows(result) -> int:
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, dict):
+        # Paginated results: {"prices": [...], "meta": {...}}
+        return max((len(v) for v in result.values() if isinstance(v, list)), default=1)
+    if isinstance(result, Sized) and not isinstance(result, str):
+        # Compact results (rows.PriceRows)
+        return len(result)
+    return 1
+
+
+def timed_query(func):
+    """Record the duration and row count of a database query function (and in the request's profile)."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        result = func(*args, **kwargs)
+        elapsed = time.perf_counter() - started
+        rows = _count_rows(result)
+        db_query_seconds.observe(elapsed, query=func.__name__)
+        db_query_rows.observe(rows, query=func.__name__)
+        record_query(func.__name__, elapsed, rows)
+        return result
+    return wrapper
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing each HTTP request by its route template (e.g. /api/prices/{date})."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            http_request_seconds.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=str(status),
+            )
+            maybe_snapshot()
+
+
+# ============================================================
+# Cross-process snapshots and rendering
+# ============================================================
+
+_last_snapshot = 0.0
+
+
+def _local_samples() -> Tuple[Samples, Dict[str, Tuple[str, str]]]:
+    samples, meta = {}, {}
+    for metric in _metrics:
+        samples.update(metric.samples())
+        meta[metric.name] = (metric.type, metric.help)
+    for collector in _collectors:
+        for name, type_, help, labels, value in collector():
+            samples[(name, tuple(sorted(labels.items())))] = value
+            meta[name] = (type_, help)
+    return samples, meta
+
+
+def _snapshot_path(pid: int) -> str:
+    return os.path.join(METRICS_DIR, f"api-{pid}.json")
+
+
+def write_snapshot():
+    """Write this process's samples where other workers' /metrics can read them."""
+    global _last_snapshot
+    _last_snapshot = time.time()
+    samples, meta = _local_samples()
+    payload = {
+        "meta": meta,
+        "samples": [[name, list(labels), value] for (name, labels), value in samples.items()],
+    }
+    try:
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=METRICS_DIR, prefix=".api-", suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(payload, f, separators=(",", ":"))
+        os.replace(tmp_path, _snapshot_path(os.getpid()))
+    except OSError:
+        pass
+
+
+def maybe_snapshot():
+    if time.time() - _last_snapshot > SNAPSHOT_INTERVAL:
+        write_snapshot()
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _worker_snapshots() -> Iterable[Dict]:
+    """Snapshots of the other live workers; files of exited workers are removed."""
+    try:
+        filenames = os.listdir(METRICS_DIR)
+    except OSError:
+        return
+    for filename in filenames:
+        if not (filename.startswith("api-") and filename.endswith(".json")):
+            continue
+        pid = int(filename[4:-5])
+        path = os.path.join(METRICS_DIR, filename)
+        if pid == os.getpid():
+            continue
+        if not _pid_alive(pid):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            continue
+        try:
+            with open(path) as f:
+                yield json.load(f)
+        except (OSError, ValueError):
+            continue
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Tuple) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+def _family(name: str, meta: Dict) -> str:
+    for suffix in ("_bucket", "_count", "_sum"):
+        if name.endswith(suffix) and name[: -len(suffix)] in meta:
+            return name[: -len(suffix)]
+    return name
+
+
+def render() -> str:
+    """All metrics, summed across live API workers, plus textfiles in METRICS_DIR."""
+    samples, meta = _local_samples()
+    write_snapshot()
+    for snapshot in _worker_snapshots():
+        meta.update({name: tuple(m) for name, m in snapshot["meta"].items()})
+        for name, labels, value in snapshot["samples"]:
+            key = (name, tuple(tuple(pair) for pair in labels))
+            samples[key] = samples.get(key, 0) + value
+
+    families: Dict[str, List[str]] = {}
+    for (name, labels), value in sorted(samples.items()):
+        families.setdefault(_family(name, meta), []).append(f"{name}{_format_labels(labels)} {value:g}")
+
+    lines = []
+    for family, family_lines in families.items():
+        type_, help = meta.get(family, ("untyped", ""))
+        lines.append(f"# HELP {family} {help}")
+        lines.append(f"# TYPE {family} {type_}")
+        lines.extend(family_lines)
+
+    # Textfiles from batch jobs (the scraper) are appended verbatim
+    try:
+        for filename in sorted(os.listdir(METRICS_DIR)):
+            if filename.endswith(".prom"):
+                with open(os.path.join(METRICS_DIR, filename)) as f:
+                    lines.append(f.read().rstrip("\n"))
+    except OSError:
+        pass
+
+    return "\n".join(lines) + "\n"
+
+
+def write_textfile(name: str, gauges: Dict[str, Tuple[str, Dict[str, float]]]):
+    """Write gauges for a batch job as METRICS_DIR/{name}.prom.
+
+    `gauges` maps metric name -> (help, {label value or "": value}); a non-empty
+    key becomes a `stage` label.
+    """
+    lines = []
+    for metric, (help, values) in gauges.items():
+        lines.append(f"# HELP {metric} {help}")
+        lines.append(f"# TYPE {metric} gauge")
+        for stage, value in values.items():
+            labels = _format_labels((("stage", stage),)) if stage else ""
+            lines.append(f"{metric}{labels} {value:g}")
+
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=METRICS_DIR, prefix=f".{name}-", suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(tmp_path, os.path.join(METRICS_DIR, f"{name}.prom"))
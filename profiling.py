@@ -0,0 +1,195 @@
+"""
+Opt-in request profiling: slow-request log and sampling profiler.
+
+With PH_PROFILE=1, every request carries a breakdown of where its time went:
+
+- db:        time inside database.py query functions, minus row conversion
+- to_dict:   fetched row → dict conversion
+- render:    JSON encoding of the response body
+- other:     everything else (validation, framework, middleware)
+
+plus rows returned and bytes sent. Requests slower than PH_SLOW_MS are written
+as JSON lines to a rotating log (data/logs/slow.log).
+
+The Sampler snapshots every thread's stack with sys._current_frames() at a
+fixed interval and aggregates them in the collapsed format that flamegraph.pl
+and speedscope read. It is toggled at runtime through the /debug/profiler
+endpoints, which only exist when PH_DEBUG_ENDPOINTS=1.
+"""
+import os
+import sys
+import json
+import time
+import logging
+import threading
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from typing import Dict, Optional
+
+PROFILE = os.environ.get("PH_PROFILE", "0") == "1"
+SLOW_MS = float(os.environ.get("PH_SLOW_MS", "500"))
+SLOW_LOG = os.environ.get("PH_SLOW_LOG") or os.path.join(
+    os.path.dirname(__file__), "data", "logs", "slow.log"
+)
+
+# Breakdown of the request being handled; None when profiling is off
+_current: ContextVar[Optional[Dict]] = ContextVar("ph_request_profile", default=None)
+
+
+def record(part: str, seconds: float):
+    """Add time to one part of the current request's breakdown, if one is being recorded."""
+    profile = _current.get()
+    if profile is not None:
+        profile[part] += seconds
+
+
+def record_query(name: str, seconds: float, rows: int):
+    profile = _current.get()
+    if profile is not None:
+        profile["query"] += seconds
+        profile["rows"] += rows
+        profile["queries"].append([name, round(seconds * 1000, 2), rows])
+
+
+_slow_logger = None
+
+
+def _get_slow_logger() -> logging.Logger:
+    global _slow_logger
+    if _slow_logger is None:
+        os.makedirs(os.path.dirname(SLOW_LOG), exist_ok=True)
+        handler = RotatingFileHandler(SLOW_LOG, maxBytes=5 * 1024 * 1024, backupCount=3, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        _slow_logger = logging.getLogger("ph.slow")
+        _slow_logger.addHandler(handler)
+        _slow_logger.setLevel(logging.INFO)
+        _slow_logger.propagate = False
+    return _slow_logger
+
+
+class SlowLogMiddleware:
+    """ASGI middleware recording a per-request breakdown and logging slow requests."""
+
+    def __init__(self, app, threshold_ms: float = None):
+        self.app = app
+        self.threshold = (SLOW_MS if threshold_ms is None else threshold_ms) / 1000
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not PROFILE:
+            return await self.app(scope, receive, send)
+
+        profile = {"query": 0.0, "to_dict": 0.0, "render": 0.0, "rows": 0, "queries": []}
+        token = _current.set(profile)
+        started = time.perf_counter()
+        status = 500
+        sent = 0
+
+        async def send_wrapper(message):
+            nonlocal status, sent
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                sent += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            total = time.perf_counter() - started
+            if total >= self.threshold:
+                self._log(scope, status, total, sent, profile)
+
+    def _log(self, scope, status: int, total: float, sent: int, profile: Dict):
+        db = profile["query"] - profile["to_dict"]
+        entry = {
+            "ts": datetime.utcnow().isoformat() + "Z",
+            "method": scope["method"],
+            "path": scope["path"],
+            "query": scope.get("query_string", b"").decode("latin-1"),
+            "route": getattr(scope.get("route"), "path", None),
+            "status": status,
+            "total_ms": round(total * 1000, 2),
+            "db_ms": round(db * 1000, 2),
+            "to_dict_ms": round(profile["to_dict"] * 1000, 2),
+            "render_ms": round(profile["render"] * 1000, 2),
+            "other_ms": round((total - profile["query"] - profile["render"]) * 1000, 2),
+            "rows": profile["rows"],
+            "bytes": sent,
+            "queries": profile["queries"],
+        }
+        try:
+            _get_slow_logger().info(json.dumps(entry))
+        except OSError:
+            pass
+
+
+# ============================================================
+# Sampling profiler
+# ============================================================
+
+class Sampler:
+    """Periodically sample all thread stacks into collapsed (flame-graph) stack counts."""
+
+    def __init__(self):
+        self.interval = 0.005
+        self.samples = Counter()
+        self.started_at = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self, interval: float = 0.005):
+        with self._lock:
+            if self.running:
+                return
+            self.interval = interval
+            self.samples = Counter()
+            self.started_at = time.time()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="ph-sampler", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> str:
+        """Stop sampling and return the collapsed stacks."""
+        with self._lock:
+            if self._thread is not None:
+                self._stop.set()
+                self._thread.join()
+                self._thread = None
+        return self.collapsed()
+
+    def status(self) -> Dict:
+        return {
+            "running": self.running,
+            "interval_ms": self.interval * 1000,
+            "samples": sum(self.samples.values()),
+            "stacks": len(self.samples),
+            "started_at": self.started_at,
+        }
+
+    def collapsed(self) -> str:
+        """`frame;frame;frame count` lines, root first — input for flamegraph.pl / speedscope."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                self.samples[";".join(reversed(stack))] += 1
+
+
+sampler = Sampler()
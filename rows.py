@@ -0,0 +1,79 @@
+"""
+Compact result type for large price queries.
+
+A year-long range is tens of thousands of prices. As a list of dicts every
+row carries its own dict, keys and float object. PriceRows stores the same
+rows as parallel columns: commodity ids and prices in arrays, dates as a list
+of shared strings. Name, category, specification and unit are looked up in
+database.py's commodity dimension table when needed. Rows are materialized
+only on demand: as namedtuples when iterated (CSV export), or as dicts from
+to_dicts() for the JSON encoder, which drops them once they are encoded.
+"""
+import math
+import functools
+from array import array
+from collections import namedtuple
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+# Output fields filled from the dimension tuple (name, category, specification, unit)
+DIMENSION_FIELDS = {"name": 0, "commodity": 0, "category": 1, "specification": 2, "unit": 3}
+# Output fields stored per row
+ROW_FIELDS = ("date", "price", "source_type")
+
+
+@functools.lru_cache(maxsize=None)
+def record_type(fields: Tuple[str, ...]):
+    """namedtuple class for rows with these fields (one class per field layout)."""
+    return namedtuple("PriceRecord", fields)
+
+
+class PriceRows:
+    """Price rows held as columns: one commodity id, date and price per row.
+
+    `points` are (commodity_id, date, price) tuples, or (commodity_id, date,
+    source_type, price) when "source_type" is one of the fields. A NULL price
+    is stored as NaN and comes back out as None.
+    """
+
+    __slots__ = ("fields", "_dims", "_ids", "_dates", "_prices", "_sources")
+
+    def __init__(self, fields: Sequence[str], dims: Dict[int, Tuple], points: List[tuple] = ()):
+        unknown = [f for f in fields if f not in DIMENSION_FIELDS and f not in ROW_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown PriceRows fields: {unknown}")
+        self.fields = tuple(fields)
+        self._dims = dims
+        self._ids = array("q", [p[0] for p in points])
+        shared = {}  # one str object per distinct date / source type
+        self._dates = [shared.setdefault(p[1], p[1]) for p in points]
+        nan = math.nan
+        self._prices = array("d", [nan if p[-1] is None else p[-1] for p in points])
+        self._sources = None
+        if "source_type" in self.fields:
+            self._sources = [shared.setdefault(p[2], p[2]) for p in points]
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __repr__(self) -> str:
+        return f"PriceRows({len(self)} rows: {', '.join(self.fields)})"
+
+    def column(self, field: str) -> list:
+        """All values of one field, in row order."""
+        if field in DIMENSION_FIELDS:
+            index, dims = DIMENSION_FIELDS[field], self._dims
+            return [dims[cid][index] for cid in self._ids]
+        if field == "price":
+            return [None if p != p else p for p in self._prices]
+        if field == "date":
+            return list(self._dates)
+        return list(self._sources)
+
+    def __iter__(self) -> Iterator[tuple]:
+        """Rows as namedtuples with `fields` as attributes."""
+        return map(record_type(self.fields)._make, zip(*(self.column(f) for f in self.fields)))
+
+    def to_dicts(self) -> List[Dict]:
+        """Rows as dicts, as the query functions return without compact=True."""
+        fields = self.fields
+        return [dict(zip(fields, values)) for values in zip(*(self.column(f) for f in fields))]
@@ -2,59 +2,107 @@
 """
 Main scraper script. Run this to:
 1. Crawl DA website for PDF links
-2. Download all PDFs
-3. Parse them into structured data
-4. Store in SQLite database
+2. Download, parse and store the PDFs as a streaming pipeline
+   (parsing starts with the first download; progress is committed as it goes)
+
+Daily price indexes, Weekly Average Prices and cigarette price monitoring
+reports all go through the same pipeline, each stored under its own
+source_type.
 """
 import sys
 import os
 import json
+import time
 
 # Add project root to path
 sys.path.insert(0, os.path.dirname(__file__))
 
 from scraper.crawler import crawl_pdf_links
-from scraper.downloader import download_pdfs
-from scraper.parser import parse_pdf_batch
-from database import init_db, store_parsed_data, get_stats
+from scraper.pipeline import run_pipeline
+from database import (
+    init_db, get_stats, start_scrape_run, get_resumable_run, get_unfinished_jobs, finish_scrape_run
+)
+from exports import build_columnar_exports
+from metrics import write_textfile
+
+
+SERIES = ["daily", "weekly", "cigarette"]
 
 
-def main(max_pdfs: int = None, daily_only: bool = True):
-    """Run the full scrape pipeline."""
+def main(max_pdfs: int = None, daily_only: bool = False, workers: int = None, commit_every: int = 25,
+         resume: bool = False, parse_method: str = None):
+    """Run the full scrape pipeline, or resume the last interrupted run."""
     print("=" * 60)
     print("🇵🇭 PH Price Index — Scraper")
     print("=" * 60)
     
-    # 1. Initialize database
-    print("\n[1/4] Initializing database...")
-    init_db()
+    timings = {}  # stage -> seconds, exported to data/metrics/scraper.prom
+    mark = time.perf_counter()
     
-    # 2. Crawl for PDF links
-    print("\n[2/4] Crawling DA website...")
-    links = crawl_pdf_links()
+    def stage(name):
+        nonlocal mark
+        now = time.perf_counter()
+        timings[name] = round(now - mark, 3)
+        mark = now
     
-    # 3. Download PDFs
-    print("\n[3/4] Downloading PDFs...")
-    daily_links = links["daily"]
-    
-    if max_pdfs:
-        daily_links = daily_links[:max_pdfs]
+    # 1. Initialize database
+    print("\n[1/3] Initializing database...")
+    init_db()
+    stage("init")
     
-    downloaded = download_pdfs(daily_links, pdf_type="daily", delay=0.3)
+    # 2. Crawl for PDF links — or pick up the checkpointed list of an unfinished run
+    run = get_resumable_run() if resume else None
+    if run:
+        print(f"\n[2/3] Resuming run #{run['id']} from {run['started_at']} ({run['jobs']})...")
+        run_id = run["id"]
+        pdf_links = get_unfinished_jobs(run_id)
+    else:
+        if resume:
+            print("\n[2/3] No unfinished run to resume — starting a new one")
+        print("\n[2/3] Crawling DA website...")
+        links = crawl_pdf_links()
+        
+        pdf_links = []
+        for series in (["daily"] if daily_only else SERIES):
+            # max_pdfs applies per series, so --test still covers all of them
+            series_links = links[series][:max_pdfs] if max_pdfs else links[series]
+            print(f"  {series}: {len(series_links)} PDFs")
+            pdf_links += series_links
+        run_id = start_scrape_run(pdf_links)
+    stage("crawl")
     
-    # 4. Parse and store
-    print("\n[4/4] Parsing PDFs and storing data...")
-    parsed = parse_pdf_batch(downloaded)
-    store_parsed_data(parsed)
+    # 3. Download, parse and store (overlapped)
+    print(f"\n[3/3] Downloading, parsing and storing {len(pdf_links)} PDFs (run #{run_id})...")
+    try:
+        pipeline = run_pipeline(pdf_links, pdf_type="daily", delay=0.3,
+                                workers=workers, commit_every=commit_every, run_id=run_id,
+                                parse_method=parse_method)
+    except BaseException:
+        finish_scrape_run(run_id, "interrupted")
+        print(f"\n[scraper] Run #{run_id} interrupted — continue it with: python run_scraper.py --resume")
+        raise
+    finish_scrape_run(run_id, "completed")
+    stage("pipeline")
+    build_columnar_exports()
+    stage("export")
     
     # Summary
     stats = get_stats()
+    write_textfile("scraper", {
+        "ph_scraper_stage_duration_seconds": ("Duration of each stage of the last scraper run", timings),
+        "ph_scraper_duration_seconds": ("Total duration of the last scraper run", {"": sum(timings.values())}),
+        "ph_scraper_pdfs": ("PDFs handled by each pipeline stage in the last scraper run",
+                            {k: pipeline[k] for k in ("downloaded", "cached", "failed", "parsed", "parse_failed")}),
+        "ph_scraper_last_success_timestamp_seconds": ("Unix time the last scraper run finished", {"": time.time()}),
+    })
+    
     print("\n" + "=" * 60)
     print("✅ Scrape complete!")
     print(f"   Commodities: {stats.get('total_commodities', 0)}")
     print(f"   Prices:      {stats.get('total_prices', 0)}")
     print(f"   Dates:       {stats.get('total_dates', 0)}")
     print(f"   Range:       {stats.get('first_date', 'N/A')} → {stats.get('last_date', 'N/A')}")
+    print(f"   Stages:      {', '.join(f'{k} {v:.1f}s' for k, v in timings.items())}")
     print("=" * 60)
     
     return stats
@@ -63,9 +111,17 @@ def main(max_pdfs: int = None, daily_only: bool = True):
 if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser(description="PH Price Index Scraper")
-    parser.add_argument("--max", type=int, help="Max PDFs to download", default=None)
-    parser.add_argument("--test", action="store_true", help="Test mode (5 PDFs)")
+    parser.add_argument("--max", type=int, help="Max PDFs to download per series", default=None)
+    parser.add_argument("--test", action="store_true", help="Test mode (5 PDFs per series)")
+    parser.add_argument("--daily-only", action="store_true", help="Skip the weekly and cigarette series")
+    parser.add_argument("--workers", type=int, default=None, help="Parser processes (default: CPU count)")
+    parser.add_argument("--commit-every", type=int, default=25, help="Commit after this many PDFs")
+    parser.add_argument("--parse-method", choices=["text", "layout"], default=None,
+                        help="PDF parse engine (default: PH_PARSE_METHOD or text)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue the last unfinished run from its checkpoint (no re-crawl)")
     args = parser.parse_args()
     
     max_pdfs = 5 if args.test else args.max
-    main(max_pdfs=max_pdfs)
+    main(max_pdfs=max_pdfs, daily_only=args.daily_only, workers=args.workers,
+         commit_every=args.commit_every, resume=args.resume, parse_method=args.parse_method)
@@ -1,35 +1,131 @@
 """
 Crawl da.gov.ph/price-monitoring to extract all PDF links.
-Handles both Daily Price Index and Weekly Average Prices.
+Handles Daily Price Index, Weekly Average Prices and cigarette price monitoring.
+
+Archive and pagination pages linked from the start page are followed
+breadth-first, a level at a time, with a small pool of fetch threads. Links
+are pulled out with a regex rather than a full HTML parse (we only need
+<a href> and its text), and every page is cached on disk with its ETag /
+Last-Modified so re-crawls send conditional requests and unchanged pages
+come back as 304s.
 """
+import os
 import re
+import json
+import html
+import hashlib
+import threading
 import requests
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Tuple
+from urllib.parse import urljoin, urldefrag, urlparse
+
+from scraper.dates import parse_date, parse_url_date, parse_weekly_date
 
-BASE_URL = "https://www.da.gov.ph/price-monitoring/"
+BASE_URL = os.environ.get("PH_CRAWL_URL", "https://www.da.gov.ph/price-monitoring/")
+
+PAGE_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "cache", "pages")
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) PH-Price-Index-Bot/1.0"
 }
 
+ANCHOR_RE = re.compile(r'<a\s[^>]*?href\s*=\s*["\']([^"\']+)["\'][^>]*>(.*?)</a>', re.IGNORECASE | re.DOTALL)
+TAG_RE = re.compile(r"<[^>]+>")
+# Pagination and archive pages worth following: /page/2/, ?paged=2, ?page=2, /2025/, .../archive...
+PAGE_LINK_RE = re.compile(r"(/page/\d+/?$|[?&]paged?=\d+|/(19|20)\d{2}/?$|archive)", re.IGNORECASE)
 
-def crawl_pdf_links() -> Dict[str, List[Dict]]:
-    """Crawl the DA price monitoring page and extract all PDF links."""
-    print("[crawler] Fetching DA price monitoring page...")
-    resp = requests.get(BASE_URL, headers=HEADERS, timeout=30)
-    resp.raise_for_status()
+
+def crawl_pdf_links(base_url: str = BASE_URL, max_pages: int = 50, workers: int = 4,
+                    cache_dir: str = PAGE_CACHE_DIR) -> Dict[str, List[Dict]]:
+    """Crawl the DA price monitoring pages and extract all PDF links."""
+    print(f"[crawler] Crawling {base_url} (up to {max_pages} pages, {workers} threads)...")
+    sessions = threading.local()
     
-    soup = BeautifulSoup(resp.text, "html.parser")
+    def fetch(url: str) -> Tuple[str, str, bool]:
+        if not hasattr(sessions, "session"):
+            sessions.session = requests.Session()
+        body, cached = _fetch_page(sessions.session, url, cache_dir)
+        return url, body, cached
     
+    seen_pages = {base_url}
+    seen_pdfs = set()
     all_links = []
-    for a in soup.find_all("a", href=True):
-        href = a["href"]
-        if href.endswith(".pdf"):
-            text = a.get_text(strip=True)
-            all_links.append({"url": href, "text": text})
+    frontier = [base_url]
+    fetched = not_modified = 0
+    
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while frontier:
+            next_frontier = []
+            # map() keeps page order, so link order doesn't depend on which fetch finished first
+            for page_url, body, cached in pool.map(fetch, frontier):
+                fetched += 1
+                not_modified += cached
+                pdfs, pages = _extract_links(body, page_url, base_url)
+                for link in pdfs:
+                    if link["url"] not in seen_pdfs:
+                        seen_pdfs.add(link["url"])
+                        all_links.append(link)
+                for url in pages:
+                    if url not in seen_pages and len(seen_pages) < max_pages:
+                        seen_pages.add(url)
+                        next_frontier.append(url)
+            frontier = next_frontier
     
+    print(f"[crawler] Fetched {fetched} pages ({not_modified} unchanged), {len(all_links)} unique PDFs")
+    return _classify(all_links)
+
+
+def _fetch_page(session: requests.Session, url: str, cache_dir: str = PAGE_CACHE_DIR) -> Tuple[str, bool]:
+    """GET a page, revalidating the cached copy. Returns (html, served from cache)."""
+    key = hashlib.sha1(url.encode()).hexdigest()
+    body_path = os.path.join(cache_dir, f"{key}.html")
+    meta_path = os.path.join(cache_dir, f"{key}.json")
+    
+    headers = dict(HEADERS)
+    meta = {}
+    if os.path.exists(body_path) and os.path.exists(meta_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+    
+    resp = session.get(url, headers=headers, timeout=30)
+    if resp.status_code == 304 and meta:
+        with open(body_path, encoding="utf-8") as f:
+            return f.read(), True
+    resp.raise_for_status()
+    
+    if resp.headers.get("ETag") or resp.headers.get("Last-Modified"):
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(body_path, "w", encoding="utf-8") as f:
+            f.write(resp.text)
+        with open(meta_path, "w") as f:
+            json.dump({"url": url, "etag": resp.headers.get("ETag"),
+                       "last_modified": resp.headers.get("Last-Modified")}, f)
+    return resp.text, False
+
+
+def _extract_links(body: str, page_url: str, base_url: str) -> Tuple[List[Dict], List[str]]:
+    """Return (PDF links, archive/pagination page URLs) found on a page."""
+    pdfs, pages = [], []
+    base = urlparse(base_url)
+    for href, inner in ANCHOR_RE.findall(body):
+        url, _ = urldefrag(urljoin(page_url, html.unescape(href.strip())))
+        parsed = urlparse(url)
+        if parsed.path.lower().endswith(".pdf"):
+            text = " ".join(html.unescape(TAG_RE.sub(" ", inner)).split())
+            pdfs.append({"url": url, "text": text})
+        elif parsed.netloc == base.netloc and parsed.path.startswith(base.path) and PAGE_LINK_RE.search(url):
+            pages.append(url)
+    return pdfs, pages
+
+
+def _classify(all_links: List[Dict]) -> Dict[str, List[Dict]]:
+    """Sort PDF links into daily, weekly, cigarette and other reports, with their dates."""
     daily = []
     weekly = []
     cigarette = []
@@ -42,9 +138,12 @@ def crawl_pdf_links() -> Dict[str, List[Dict]]:
         if "weekly" in url_lower or "weekly" in text_lower:
             link["type"] = "weekly"
             link["date_range"] = parse_weekly_date(link["text"])
+            # Weekly averages are stored under the last day of the week
+            link["date"] = link["date_range"].get("end")
             weekly.append(link)
         elif "cigarette" in url_lower or "cigarette" in text_lower:
             link["type"] = "cigarette"
+            link["date"] = parse_daily_date(link["text"], link["url"])
             cigarette.append(link)
         elif "daily" in url_lower or "dpi" in url_lower or "price-monitoring" in url_lower:
             link["type"] = "daily"
@@ -72,51 +171,19 @@ def crawl_pdf_links() -> Dict[str, List[Dict]]:
 
 
 def parse_daily_date(text: str, url: str) -> str:
-    """Try to extract a date from the link text or URL."""
-    # Common formats in text: "February 8, 2026", "January 31, 2026"
-    months = {
-        "january": "01", "february": "02", "march": "03", "april": "04",
-        "may": "05", "june": "06", "july": "07", "august": "08",
-        "september": "09", "october": "10", "november": "11", "december": "12",
-        "marhc": "03",  # they have typos!
-    }
-    
-    # Try text first
-    for month_name, month_num in months.items():
-        pattern = rf'{month_name}\s+(\d{{1,2}}),?\s*(\d{{4}})'
-        match = re.search(pattern, text.lower())
-        if match:
-            day = int(match.group(1))
-            year = int(match.group(2))
-            return f"{year}-{month_num}-{day:02d}"
-    
-    # Try URL patterns like MMDDYYYY
-    match = re.search(r'(\d{2})(\d{2})(\d{4})-PRICE', url, re.IGNORECASE)
-    if match:
-        month, day, year = match.group(1), match.group(2), match.group(3)
-        return f"{year}-{month}-{day}"
-    
-    # Try URL patterns like Month-Day-Year
-    for month_name, month_num in months.items():
-        pattern = rf'{month_name}-(\d{{1,2}})-(\d{{4}})'
-        match = re.search(pattern, url.lower())
-        if match:
-            day = int(match.group(1))
-            year = int(match.group(2))
-            return f"{year}-{month_num}-{day:02d}"
-    
-    return None
-
-
-def parse_weekly_date(text: str) -> Dict:
-    """Parse weekly date range from text like 'January 26-31, 2026'."""
-    # This is complex due to cross-month ranges
-    # Return raw text for now, can be refined
-    return {"raw": text}
+    """Try to extract a date from the link text, then the URL."""
+    return parse_date(text) or parse_url_date(url)
 
 
 if __name__ == "__main__":
-    results = crawl_pdf_links()
+    import argparse
+    parser = argparse.ArgumentParser(description="List the DA's price monitoring PDFs")
+    parser.add_argument("--base-url", default=BASE_URL, help="Start page (e.g. a local mirror)")
+    parser.add_argument("--max-pages", type=int, default=50, help="Pages to crawl, including the start page")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent page fetches")
+    args = parser.parse_args()
+    
+    results = crawl_pdf_links(args.base_url, max_pages=args.max_pages, workers=args.workers)
     for dtype, links in results.items():
         print(f"\n=== {dtype.upper()} ({len(links)}) ===")
         for link in links[:3]:
@@ -0,0 +1,146 @@
+"""
+Date extraction shared by the crawler (link text, URLs) and the parser (PDF text).
+
+All month spellings — full names, abbreviations, the DA's known typos and
+names split by PDF text extraction ("Febr uary") — are folded into one
+precompiled pattern (a trie on the first letter), so each input is scanned
+once instead of once per month. PDF text is only searched in its header
+region, where the report date is printed.
+"""
+import re
+from datetime import date as date_cls
+from typing import Dict, Optional
+
+MONTHS = {
+    "january": "01", "february": "02", "march": "03", "april": "04",
+    "may": "05", "june": "06", "july": "07", "august": "08",
+    "september": "09", "october": "10", "november": "11", "december": "12",
+    "jan": "01", "feb": "02", "mar": "03", "apr": "04", "jun": "06", "jul": "07",
+    "aug": "08", "sep": "09", "sept": "09", "oct": "10", "nov": "11", "dec": "12",
+    "marhc": "03",  # they have typos!
+}
+
+# Characters of PDF text searched for the report date
+HEADER_CHARS = 2000
+
+
+def _month_alternation(split: bool) -> str:
+    """All month spellings as a trie keyed on the first letter (j(?:an(?:uary)?|u(?:ne?|ly?))|...).
+
+    Every alternative of a flat alternation is retried at each position of the
+    text; nesting by first letter lets most positions fail on one character.
+    With `split`, the letters after the third may be separated by one stray
+    space ("Febr uary", "Janu ary").
+    """
+    tree = {}
+    for name in sorted(MONTHS, key=len, reverse=True):
+        tree.setdefault(name[0], {}).setdefault(name[1:3], []).append(name[3:])
+
+    def rest(tail: str) -> str:
+        return "".join(rf"\s?{c}" for c in tail) if split else tail
+
+    branches = []
+    for first, prefixes in tree.items():
+        options = []
+        for prefix, tails in prefixes.items():
+            longer = [rest(tail) for tail in tails if tail]
+            if longer:
+                options.append(f"{prefix}(?:{'|'.join(longer)}){'?' if '' in tails else ''}")
+            else:
+                options.append(prefix)
+        branches.append(f"{first}(?:{'|'.join(options)})")
+    return "|".join(branches)
+
+
+# Patterns run on lowercased input; (?<![a-z]) stands in for \b before the month
+MONTH = rf"(?<![a-z])(?:{_month_alternation(split=True)})\.?"
+MONTH_PLAIN = rf"(?<![a-z])(?:{_month_alternation(split=False)})"
+
+# "February 8, 2026", "Febr uary 8 2026", "Feb. 8, 2026"
+DATE_RE = re.compile(rf"({MONTH})\s+(\d{{1,2}}),?\s*(\d{{4}})\b")
+# .../02082026-PRICE... (MMDDYYYY)
+URL_NUMERIC_RE = re.compile(r"(\d{2})(\d{2})(\d{4})-price")
+# .../February-8-2026...
+URL_MONTH_RE = re.compile(rf"({MONTH_PLAIN})-(\d{{1,2}})-(\d{{4}})\b")
+
+_DASH = r"\s*[-–—]\s*"
+def _start_year(start_month: str, end_month: str, year: str) -> str:
+    """Year of a range's start when only the end's year is printed."""
+    start, end = month_number(start_month), month_number(end_month)
+    if start and end and start > end:
+        return str(int(year) - 1)
+    return year
+
+
+WEEKLY_RES = [
+    # December 29, 2025 - January 3, 2026
+    (re.compile(rf"({MONTH})\s+(\d{{1,2}}),?\s*(\d{{4}}){_DASH}({MONTH})\s+(\d{{1,2}}),?\s*(\d{{4}})"),
+     lambda m: ((m[1], m[2], m[3]), (m[4], m[5], m[6]))),
+    # January 26 - February 1, 2026; December 29 - January 3, 2026 starts the year before
+    (re.compile(rf"({MONTH})\s+(\d{{1,2}}){_DASH}({MONTH})\s+(\d{{1,2}}),?\s*(\d{{4}})"),
+     lambda m: ((m[1], m[2], _start_year(m[1], m[3], m[5])), (m[3], m[4], m[5]))),
+    # January 26-31, 2026
+    (re.compile(rf"({MONTH})\s+(\d{{1,2}}){_DASH}(\d{{1,2}}),?\s*(\d{{4}})"),
+     lambda m: ((m[1], m[2], m[4]), (m[1], m[3], m[4]))),
+]
+
+
+def month_number(name: str) -> Optional[str]:
+    """"Febr uary" / "Feb." / "MARHC" → "02" / "02" / "03"."""
+    return MONTHS.get(re.sub(r"[\s.]", "", name).lower())
+
+
+def _iso(month: str, day: str, year: str) -> Optional[str]:
+    """YYYY-MM-DD for a month name or number, or None if there is no such day."""
+    number = month if month.isdigit() else month_number(month)
+    if not number:
+        return None
+    try:
+        return date_cls(int(year), int(number), int(day)).isoformat()
+    except ValueError:
+        return None
+
+
+def parse_date(text: str) -> Optional[str]:
+    """First "Month D, YYYY" date in `text`, as YYYY-MM-DD."""
+    for match in DATE_RE.finditer(text.lower()):
+        date = _iso(*match.groups())
+        if date:
+            return date
+    return None
+
+
+def parse_url_date(url: str) -> Optional[str]:
+    """Date encoded in a PDF URL: MMDDYYYY-PRICE... or Month-D-YYYY."""
+    url = url.lower()
+    match = URL_NUMERIC_RE.search(url)
+    if match:
+        return _iso(*match.groups())
+    match = URL_MONTH_RE.search(url)
+    if match:
+        return _iso(*match.groups())
+    return None
+
+
+def parse_header_date(text: str, header_chars: int = HEADER_CHARS) -> Optional[str]:
+    """Report date from the header region of a PDF's extracted text."""
+    return parse_date(text[:header_chars])
+
+
+def parse_weekly_date(text: str) -> Dict:
+    """Parse a weekly date range.
+
+    Handles same-month ("January 26-31, 2026"), cross-month ("January 26 - February 1, 2026")
+    and cross-year ("December 29, 2025 - January 3, 2026") ranges. Returns the raw text
+    plus ISO "start"/"end" dates (None if the text has no recognizable range).
+    """
+    lower = text.lower()
+    for pattern, parts in WEEKLY_RES:
+        match = pattern.search(lower)
+        if not match:
+            continue
+        start, end = parts((None,) + match.groups())  # 1-based like m.group(n)
+        start, end = _iso(*start), _iso(*end)
+        if start and end:
+            return {"raw": text, "start": start, "end": end}
+    return {"raw": text, "start": None, "end": None}
@@ -2,10 +2,9 @@
 Download PDFs from DA website with rate limiting and resume support.
 """
 import os
-import time
 import hashlib
 import requests
-from typing import List, Dict
+from typing import Dict
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) PH-Price-Index-Bot/1.0"
@@ -14,52 +13,40 @@ HEADERS = {
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "pdfs")
 
 
-def download_pdfs(links: List[Dict], pdf_type: str = "daily", delay: float = 0.5) -> List[Dict]:
-    """Download PDFs, skipping already downloaded ones."""
+def download_pdf(link: Dict, pdf_type: str = "daily", session: requests.Session = None) -> Dict:
+    """Download one PDF unless it is already on disk. Returns the link with filepath and status."""
     out_dir = os.path.join(DATA_DIR, pdf_type)
     os.makedirs(out_dir, exist_ok=True)
     
-    results = []
-    total = len(links)
+    url = link["url"]
+    filename = _url_to_filename(url, link)
+    filepath = os.path.join(out_dir, filename)
     
-    for i, link in enumerate(links):
-        url = link["url"]
-        filename = _url_to_filename(url, link)
-        filepath = os.path.join(out_dir, filename)
+    if os.path.exists(filepath) and os.path.getsize(filepath) > 0:
+        return {**link, "filepath": filepath, "status": "cached"}
+    
+    try:
+        resp = (session or requests).get(url, headers=HEADERS, timeout=60)
+        resp.raise_for_status()
         
-        if os.path.exists(filepath) and os.path.getsize(filepath) > 0:
-            results.append({**link, "filepath": filepath, "status": "cached"})
-            continue
+        # Write under a temporary name so an interrupted download never looks cached
+        tmp_path = filepath + ".part"
+        with open(tmp_path, "wb") as f:
+            f.write(resp.content)
+        os.replace(tmp_path, filepath)
         
-        print(f"[downloader] ({i+1}/{total}) Downloading {filename}...")
+        return {**link, "filepath": filepath, "status": "downloaded"}
         
-        try:
-            resp = requests.get(url, headers=HEADERS, timeout=60)
-            resp.raise_for_status()
-            
-            with open(filepath, "wb") as f:
-                f.write(resp.content)
-            
-            results.append({**link, "filepath": filepath, "status": "downloaded"})
-            time.sleep(delay)  # Be nice to the server
-            
-        except Exception as e:
-            print(f"[downloader] FAILED {filename}: {e}")
-            results.append({**link, "filepath": None, "status": "failed", "error": str(e)})
-    
-    downloaded = sum(1 for r in results if r["status"] == "downloaded")
-    cached = sum(1 for r in results if r["status"] == "cached")
-    failed = sum(1 for r in results if r["status"] == "failed")
-    print(f"[downloader] Done: {downloaded} new, {cached} cached, {failed} failed")
-    
-    return results
+    except Exception as e:
+        print(f"[downloader] FAILED {filename}: {e}")
+        return {**link, "filepath": None, "status": "failed", "error": str(e)}
 
 
 def _url_to_filename(url: str, link: Dict) -> str:
     """Generate a clean filename from the URL and metadata."""
-    # Use the date if available for daily
+    # Use the date if available (the week's last day for weekly reports)
     if link.get("date"):
-        return f"daily-{link['date']}.pdf"
+        return f"{link.get('type', 'daily')}-{link['date']}.pdf"
     
     # Use the last part of the URL
     basename = url.split("/")[-1]
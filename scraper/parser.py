@@ -6,6 +6,11 @@ Strategy:
 2. If text extraction yields garbage/empty → try tabula-py for table extraction
 3. If both fail → flag for OCR (handled separately)
 
+Two engines turn the text into rows (`method`, recorded as parse_method):
+- "text":   line heuristics over the flattened text (the default)
+- "layout": rebuilds the table from the x/y position of every text cell, using
+            the COMMODITY / SPECIFICATION / PRICE header to find the columns
+
 The parser handles inconsistencies in formatting across different dates.
 """
 import re
@@ -14,6 +19,15 @@ import json
 from typing import List, Dict, Optional, Tuple
 from PyPDF2 import PdfReader
 
+try:
+    # Private PyPDF2 API the layout engine decodes fonts with; without it PDFs
+    # are parsed with the text engine
+    from PyPDF2._cmap import build_char_map
+except ImportError:
+    build_char_map = None
+
+from scraper.dates import parse_header_date, parse_weekly_date, HEADER_CHARS
+
 # Categories and their expected commodities (flexible — new ones auto-detected)
 KNOWN_CATEGORIES = [
     "IMPORTED COMMERCIAL RICE",
@@ -39,11 +53,57 @@ KNOWN_CATEGORIES = [
     "FRUIT VEGETABLES",
 ]
 
+# Longest first, so "LOWLAND VEGETABLES" isn't taken for "VEGETABLES"
+_CATEGORIES_LONGEST_FIRST = sorted(KNOWN_CATEGORIES, key=len, reverse=True)
+
+# Words that show the extracted text is a real price sheet, per series
+FOOD_KEYWORDS = ["rice", "price", "commodity", "peso", "pork", "chicken", "fish", "beef"]
+CIGARETTE_KEYWORDS = ["cigarette", "price", "brand", "pack", "stick", "srp", "retail"]
+
 
-def parse_daily_pdf(filepath: str, date: str = None) -> Dict:
+# Default parse engine: "text" or "layout"
+PARSE_METHOD = os.environ.get("PH_PARSE_METHOD", "text")
+if PARSE_METHOD == "layout" and build_char_map is None:
+    print("[parser] This PyPDF2 has no _cmap.build_char_map; using the text engine")
+
+
+def parse_daily_pdf(filepath: str, date: str = None, method: str = None) -> Dict:
     """Parse a daily price index PDF into structured data."""
+    return _parse_pdf(filepath, date, source_type="daily", method=method)
+
+
+def parse_weekly_pdf(filepath: str, date: str = None, method: str = None) -> Dict:
+    """Parse a Weekly Average Prices PDF; prices are stored under the week's last day."""
+    return _parse_pdf(filepath, date, source_type="weekly", method=method)
+
+
+def parse_cigarette_pdf(filepath: str, date: str = None, method: str = None) -> Dict:
+    """Parse a cigarette price monitoring PDF (brands priced per pack)."""
+    return _parse_pdf(filepath, date, source_type="cigarette", keywords=CIGARETTE_KEYWORDS,
+                      default_category="CIGARETTES", unit="PHP/pack", method=method)
+
+
+PARSERS = {
+    "daily": parse_daily_pdf,
+    "weekly": parse_weekly_pdf,
+    "cigarette": parse_cigarette_pdf,
+}
+
+
+def parse_pdf(filepath: str, pdf_type: str = "daily", date: str = None, method: str = None) -> Dict:
+    """Parse a PDF with the parser for its series (daily, weekly or cigarette)."""
+    return PARSERS[pdf_type](filepath, date, method)
+
+
+def _parse_pdf(filepath: str, date: str = None, source_type: str = "daily",
+               keywords: List[str] = FOOD_KEYWORDS, default_category: str = None,
+               unit: str = "PHP/kg", method: str = None) -> Dict:
+    method = method or PARSE_METHOD
+    if build_char_map is None:
+        method = "text"
     result = {
         "date": date,
+        "source_type": source_type,
         "source_file": os.path.basename(filepath),
         "parse_method": None,
         "commodities": [],
@@ -53,8 +113,13 @@ def parse_daily_pdf(filepath: str, date: str = None) -> Dict:
     try:
         reader = PdfReader(filepath)
         all_text = ""
+        pages = []  # text cells per page, for the layout engine
         for page in reader.pages:
-            text = page.extract_text()
+            if method == "layout":
+                text, cells = _extract_cells(page)
+                pages.append(cells)
+            else:
+                text = page.extract_text()
             if text:
                 all_text += text + "\n"
         
@@ -64,20 +129,36 @@ def parse_daily_pdf(filepath: str, date: str = None) -> Dict:
             return result
         
         # Check if text looks like actual data vs garbage
-        if _is_garbage_text(all_text):
+        quality = garbage_score(all_text, keywords)
+        result["text_quality"] = quality
+        if quality["garbage"]:
             result["parse_method"] = "failed_garbage"
-            result["errors"].append("Extracted text appears to be garbage — likely image-based PDF")
+            result["errors"].append(
+                f"Extracted text appears to be garbage ({quality['reason']}, "
+                f"confidence {quality['confidence']:.2f}) — likely image-based PDF"
+            )
             return result
         
         # Extract date from PDF if not provided
         if not date:
-            date = _extract_date_from_text(all_text)
+            if source_type == "weekly":
+                date = parse_weekly_date(all_text[:HEADER_CHARS]).get("end")
+            else:
+                date = parse_header_date(all_text)
             result["date"] = date
         
         # Parse the structured price data
-        commodities = _parse_price_text(all_text)
+        commodities = _parse_layout(pages) if method == "layout" else None
+        if commodities is None:
+            # Text engine, or no table rows found by the layout engine
+            commodities = _parse_price_text(all_text)
+            result["parse_method"] = "text"
+        else:
+            result["parse_method"] = "layout"
+        for commodity in commodities:
+            commodity["category"] = commodity["category"] or default_category
+            commodity["unit"] = unit
         result["commodities"] = commodities
-        result["parse_method"] = "text"
         
     except Exception as e:
         result["parse_method"] = "failed_error"
@@ -86,46 +167,236 @@ def parse_daily_pdf(filepath: str, date: str = None) -> Dict:
     return result
 
 
-def _is_garbage_text(text: str) -> bool:
-    """Check if extracted text is garbage (image-based PDF artifact)."""
-    if len(text.strip()) < 50:
-        return True
-    
-    # Check ratio of readable vs non-readable characters
-    readable = sum(1 for c in text if c.isalnum() or c.isspace() or c in ".,/()-₱")
-    total = len(text)
-    if total > 0 and readable / total < 0.4:
-        return True
-    
-    # Check if we find at least some expected keywords
-    keywords = ["rice", "price", "commodity", "peso", "pork", "chicken", "fish", "beef"]
-    text_lower = text.lower()
-    found = sum(1 for k in keywords if k in text_lower)
-    if found < 2:
-        return True
+# Garbage checks only look at the start of the text; a real price sheet shows
+# its title, headers and first rows well within this
+GARBAGE_SAMPLE_CHARS = 4000
+
+# The sample is encoded to Latin-1 (anything outside becomes "?") and readable
+# bytes — letters and digits incl. ñ/é, whitespace, price punctuation — are
+# deleted with bytes.translate; whatever is left is unreadable. "₱" is outside
+# Latin-1 and counted separately.
+_READABLE_BYTES = bytes(b for b in range(256) if chr(b).isalnum() or chr(b).isspace() or chr(b) in ".,/()-")
+
+
+def garbage_score(text: str, keywords: List[str] = FOOD_KEYWORDS) -> Dict:
+    """Judge whether extracted text is garbage (image-based PDF artifact).
+
+    Looks at the first GARBAGE_SAMPLE_CHARS characters only, so the cost doesn't
+    grow with document length. Returns the verdict, a confidence in it (0.5–1.0)
+    and the signals behind it.
+    """
+    sample = text[:GARBAGE_SAMPLE_CHARS]
+    data = sample.encode("latin-1", "replace")
+    unreadable = len(data.translate(None, _READABLE_BYTES)) - sample.count("₱")
+    readable_ratio = 1 - unreadable / len(data) if data else 0.0
+    lowered = data.lower()
+    found = sum(1 for k in keywords if k.encode("latin-1", "replace") in lowered)
+    score = {"garbage": False, "confidence": 1.0, "reason": None,
+             "readable_ratio": round(readable_ratio, 3), "keywords": found}
     
-    return False
+    if len(sample.strip()) < 50:
+        score.update(garbage=True, reason="too_short")
+    elif readable_ratio < 0.4:
+        # Confidence grows as the ratio falls further below the threshold
+        score.update(garbage=True, reason="unreadable",
+                     confidence=round(0.5 + 0.5 * (0.4 - readable_ratio) / 0.4, 3))
+    elif found < 2:
+        score.update(garbage=True, reason="no_keywords", confidence=0.9 if found == 0 else 0.6)
+    else:
+        score["confidence"] = round(
+            0.5 + 0.25 * (readable_ratio - 0.4) / 0.6 + 0.25 * min(found, 4) / 4, 3
+        )
+    return score
 
 
-def _extract_date_from_text(text: str) -> Optional[str]:
-    """Extract date from PDF text content."""
-    months = {
-        "january": "01", "february": "02", "march": "03", "april": "04",
-        "may": "05", "june": "06", "july": "07", "august": "08",
-        "september": "09", "october": "10", "november": "11", "december": "12",
-    }
+def _is_garbage_text(text: str, keywords: List[str] = FOOD_KEYWORDS) -> bool:
+    """Check if extracted text is garbage (image-based PDF artifact)."""
+    return garbage_score(text, keywords)["garbage"]
+
+
+# ============================================================
+# Layout engine
+# ============================================================
+
+# Header words that mark the start of each table column
+_COLUMN_HEADERS = [
+    ("name", re.compile(r"^(COMMODITY|BRAND)", re.IGNORECASE)),
+    ("specification", re.compile(r"^(SPECIFICATION|DESCRIPTION)", re.IGNORECASE)),
+    ("price", re.compile(r"(PRICE|PREVAILING|SRP|RETAIL)", re.IGNORECASE)),
+]
+_PRICE_CELL = re.compile(r"^(?:₱\s*)?(\d{1,3}(?:,\d{3})*(?:\.\d{1,2})?|\d+(?:\.\d{1,2})?|n/a)$", re.IGNORECASE)
+
+
+def _mult(m: List[float], n: List[float]) -> List[float]:
+    return [
+        m[0] * n[0] + m[1] * n[2], m[0] * n[1] + m[1] * n[3],
+        m[2] * n[0] + m[3] * n[2], m[2] * n[1] + m[3] * n[3],
+        m[4] * n[0] + m[5] * n[2] + n[4], m[4] * n[1] + m[5] * n[3] + n[5],
+    ]
+
+
+def _decode(raw, cmap) -> str:
+    """Decode a string operand the way PyPDF2's own text extraction does."""
+    if isinstance(raw, str):
+        return raw
+    encoding, char_map = cmap
+    if isinstance(encoding, str):
+        try:
+            text = raw.decode(encoding, "surrogatepass")
+        except Exception:
+            text = raw.decode("utf-16-be" if encoding == "charmap" else "charmap", "surrogatepass")
+    else:
+        text = "".join(encoding.get(b, chr(b)) for b in raw)
+    return "".join(char_map.get(c, c) for c in text)
+
+
+def _extract_cells(page) -> Tuple[str, List[Tuple[float, float, float, str]]]:
+    """Extract a page's text plus every shown string as (x, y, font size, text).
+
+    PyPDF2's visitor_text merges everything on one line, so cells are read in
+    visitor_operand_before instead: the text matrix seen before a Tj/TJ is
+    where that string starts.
+    """
+    cmaps = {}
+    fonts = page.get("/Resources", {}).get("/Font", {})
+    for name in fonts:
+        _, _, encoding, char_map, _ = build_char_map(name, 200.0, page)
+        cmaps[name] = (encoding, char_map)
+
+    cells = []
+    state = {"cmap": ("charmap", {}), "size": 12.0}
+
+    def visit(operator, operands, cm, tm):
+        if operator == b"Tf":
+            state["cmap"] = cmaps.get(operands[0], ("charmap", {}))
+            state["size"] = float(operands[1])
+        elif operator in (b"Tj", b"TJ", b"'", b'"'):
+            m = _mult(tm, cm)
+            if operator == b"TJ":
+                # Kerning numbers below -200 (thousandths of an em) are visual word gaps
+                text = "".join(
+                    _decode(part, state["cmap"]) if not isinstance(part, (int, float))
+                    else (" " if part < -200 else "")
+                    for part in operands[0]
+                )
+            else:
+                text = _decode(operands[-1], state["cmap"])
+            text = text.strip()
+            if text:
+                cells.append((m[4], m[5], state["size"] * abs(m[3] or 1), text))
+
+    text = page.extract_text(visitor_operand_before=visit)
+    return text, cells
+
+
+def _rows(cells: List[Tuple[float, float, float, str]]) -> List[List[Tuple[float, str]]]:
+    """Group cells into rows (top to bottom) of (x, text), left to right."""
+    rows = []
+    last_y = None
+    for x, y, size, text in sorted(cells, key=lambda c: (-c[1], c[0])):
+        if last_y is None or abs(last_y - y) > size * 0.4:
+            rows.append([])
+            last_y = y
+        rows[-1].append((x, text))
+    return [sorted(row) for row in rows]
+
+
+def _find_columns(row: List[Tuple[float, str]]) -> Optional[Dict[str, float]]:
+    """x where each column starts, if this row is the table header."""
+    columns = {}
+    for x, text in row:
+        for column, pattern in _COLUMN_HEADERS:
+            if column not in columns and pattern.search(text):
+                columns[column] = x
+                break
+    if {"name", "price"} <= columns.keys():
+        columns.setdefault("specification", columns["price"])
+        return columns
+    return None
+
+
+def _split_row(row: List[Tuple[float, str]], columns: Dict[str, float]) -> Tuple[str, str, str]:
+    """Assign a row's cells to the name / specification / price columns."""
+    parts = {"name": [], "specification": [], "price": []}
+    # Numbers are often right-aligned or centered under a wide price header, so
+    # they may start a little left of it
+    price_from = (columns["specification"] + columns["price"]) / 2
+    for i, (x, text) in enumerate(row):
+        if i == len(row) - 1 and x >= price_from and _PRICE_CELL.match(text):
+            parts["price"].append(text)
+        elif x + 2 >= columns["price"]:
+            parts["price"].append(text)
+        elif x + 2 >= columns["specification"]:
+            parts["specification"].append(text)
+        else:
+            parts["name"].append(text)
+    return tuple(" ".join(parts[c]) for c in ("name", "specification", "price"))
+
+
+def _parse_layout(pages: List[List[Tuple[float, float, float, str]]]) -> Optional[List[Dict]]:
+    """Rebuild price rows from cell positions, one pass per page.
+
+    Rows without a price are cells wrapped over several lines: text before the
+    price row is carried into it, a lone specification line after it is
+    appended to the previous item. Returns None if no rows were found (e.g. no
+    page has a table header), so the caller can use the text engine instead.
+    """
+    commodities = []
+    category = None
+    columns = None
     
-    for month_name, month_num in months.items():
-        # Handle split text like "Febr uary" or "Janu ary"
-        month_pattern = month_name[:4] + r'\s*' + month_name[4:]
-        pattern = rf'{month_pattern}\s+(\d{{1,2}}),?\s*(\d{{4}})'
-        match = re.search(pattern, text.lower())
-        if match:
-            day = int(match.group(1))
-            year = int(match.group(2))
-            return f"{year}-{month_num}-{day:02d}"
+    for cells in pages:
+        pending_name, pending_spec = [], []
+        for row in _rows(cells):
+            line = " ".join(text for _, text in row)
+            header = _find_columns(row)
+            if header:
+                columns = header
+                continue
+            if columns is None or _is_header_line(line) or _is_skip_line(line):
+                continue
+            
+            name, spec, price_text = _split_row(row, columns)
+            if not spec and not price_text:
+                cat = _detect_category(name)
+                if cat:
+                    category = cat
+                    pending_name, pending_spec = [], []
+                    continue
+            
+            if not price_text and len(row) == 1 and not pending_name:
+                # Whole row in one string: fall back to the text engine's line parser
+                commodity = _parse_commodity_line(line, [], 0, category)
+                if commodity:
+                    commodities.append(commodity)
+                    continue
+            
+            match = _PRICE_CELL.match(price_text)
+            if not match:
+                if not name and spec and not pending_name and commodities:
+                    # Specification wrapped onto the line below its price
+                    last = commodities[-1]
+                    last["specification"] = f"{last['specification'] or ''} {spec}".strip()
+                else:
+                    pending_name += [name] if name else []
+                    pending_spec += [spec] if spec else []
+                continue
+            
+            full_name = " ".join(pending_name + [name]).strip()
+            full_spec = " ".join(pending_spec + [spec]).strip()
+            pending_name, pending_spec = [], []
+            if len(full_name) < 2:
+                continue
+            value = match.group(1)
+            commodities.append({
+                "category": category,
+                "name": full_name,
+                "specification": full_spec or None,
+                "price": None if value.lower() == "n/a" else float(value.replace(",", "")),
+                "unit": "PHP/kg",
+            })
     
-    return None
+    return commodities or None
 
 
 def _parse_price_text(text: str) -> List[Dict]:
@@ -178,6 +449,12 @@ def _is_header_line(line: str) -> bool:
         r'^RETAIL PRICE',
         r'^UNIT \(P/UNIT\)',
         r'^\(.*\d{4}\)',  # Date in parentheses
+        r'^WEEKLY AVERAGE',
+        r'^CIGARETTE PRICE',
+        r'^BRAND\s+SPECIFICATION',
+        r'^SRP',
+        # Report date or week on its own line: "February 5, 2026", "January 26 - February 1, 2026"
+        r'^[A-Za-z]+\.?\s+\d{1,2}(?:,?\s*\d{4})?\s*(?:[-–—]\s*(?:[A-Za-z]+\.?\s+)?\d{1,2})?,?\s*\d{4}$',
     ]
     for p in patterns:
         if re.match(p, line, re.IGNORECASE):
@@ -199,7 +476,7 @@ def _detect_category(line: str) -> Optional[str]:
     """Detect if a line is a category header."""
     upper = line.upper().strip()
     
-    for cat in KNOWN_CATEGORIES:
+    for cat in _CATEGORIES_LONGEST_FIRST:
         if cat in upper:
             return cat
     
@@ -328,39 +605,8 @@ def _split_name_spec(text: str) -> Tuple[str, str]:
     return text, None
 
 
-def parse_pdf_batch(pdf_results: List[Dict]) -> List[Dict]:
-    """Parse a batch of downloaded PDFs."""
-    parsed = []
-    total = len(pdf_results)
-    success = 0
-    failed = 0
-    
-    for i, pdf in enumerate(pdf_results):
-        if not pdf.get("filepath") or pdf.get("status") == "failed":
-            continue
-        
-        date = pdf.get("date")
-        filepath = pdf["filepath"]
-        
-        print(f"[parser] ({i+1}/{total}) Parsing {os.path.basename(filepath)}...")
-        
-        result = parse_daily_pdf(filepath, date)
-        
-        if result["commodities"]:
-            success += 1
-            print(f"  → {len(result['commodities'])} commodities extracted")
-        else:
-            failed += 1
-            print(f"  → FAILED: {result.get('errors', ['unknown'])}")
-        
-        parsed.append(result)
-    
-    print(f"\n[parser] Done: {success} success, {failed} failed out of {total}")
-    return parsed
-
-
 if __name__ == "__main__":
     import sys
     if len(sys.argv) > 1:
-        result = parse_daily_pdf(sys.argv[1])
+        result = parse_daily_pdf(sys.argv[1], method=sys.argv[2] if len(sys.argv) > 2 else None)
         print(json.dumps(result, indent=2))
@@ -0,0 +1,202 @@
+"""
+Streaming scrape pipeline: download → parse → store, with the stages overlapped.
+
+    downloader thread ──download_q──▶ parser processes ──store_q──▶ writer (caller's thread)
+
+- One downloader thread fetches PDFs in order, rate-limited as before.
+- Parsing runs in a process pool (PyPDF2 is pure Python and CPU-bound), and
+  starts as soon as the first PDF is on disk.
+- A single writer owns the SQLite connection and commits every
+  `commit_every` PDFs, bumping the data version so the API picks up partial
+  progress. If the run dies, everything up to the last commit is kept.
+
+Both queues are bounded and parsed results are dropped once stored, so memory
+stays flat no matter how many PDFs a backfill covers.
+
+With a run_id, every URL's progress is recorded in scrape_jobs. The downloader
+and parsers report stage changes as events; the writer applies them on its
+connection, so a job is marked "stored" in the same commit as its prices.
+"""
+import os
+import time
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, List
+
+import requests
+
+from scraper.downloader import download_pdf
+from scraper.parser import parse_pdf
+from database import (
+    get_db, store_parsed_result, bump_data_version, archived_years, set_job_status, get_commodity_keys,
+)
+
+_DONE = object()
+
+
+def _downloader(links: List[Dict], pdf_type: str, delay: float, out: queue.Queue,
+                events: queue.SimpleQueue, stats: Dict):
+    session = requests.Session()
+    try:
+        for i, link in enumerate(links):
+            result = download_pdf(link, link.get("type", pdf_type), session=session)
+            stats[result["status"]] += 1
+            if result["status"] == "failed":
+                events.put((link["url"], "download_failed", result.get("error")))
+                continue
+            events.put((link["url"], "downloaded", None))
+            if result["status"] == "downloaded":
+                print(f"[pipeline] ({i+1}/{len(links)}) Downloaded {os.path.basename(result['filepath'])}")
+                time.sleep(delay)  # Be nice to the server
+            out.put(result)  # blocks while the parsers are behind
+    except BaseException as e:
+        stats["error"] = e
+    finally:
+        out.put(_DONE)
+
+
+def _parse_failure(pdf: Dict, error: BaseException) -> Dict:
+    return {
+        "date": pdf.get("date"),
+        "source_type": pdf.get("type", "daily"),
+        "source_file": os.path.basename(pdf["filepath"]),
+        "parse_method": None,
+        "commodities": [],
+        "errors": [f"Parser crashed: {error}"],
+    }
+
+
+def _dispatcher(pool: ProcessPoolExecutor, max_in_flight: int, pdf_type: str, parse_method: str,
+                source: queue.Queue, out: queue.Queue, events: queue.SimpleQueue, stats: Dict):
+    """Feed downloaded PDFs to the parser pool and forward results as they complete."""
+    in_flight = {}
+
+    def drain(block: bool):
+        done, _ = wait(in_flight, timeout=None if block else 0, return_when=FIRST_COMPLETED)
+        for future in done:
+            pdf = in_flight.pop(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                result = _parse_failure(pdf, e)
+            result["url"] = pdf["url"]
+            if result["commodities"]:
+                events.put((pdf["url"], "parsed", None))
+            else:
+                events.put((pdf["url"], "parse_failed", "; ".join(result.get("errors") or []) or None))
+            out.put(result)  # blocks while the writer is behind
+
+    try:
+        while True:
+            pdf = source.get()
+            if pdf is _DONE:
+                break
+            while len(in_flight) >= max_in_flight:
+                drain(block=True)
+            pdf_kind = pdf.get("type", pdf_type)
+            in_flight[pool.submit(parse_pdf, pdf["filepath"], pdf_kind, pdf.get("date"), parse_method)] = pdf
+            drain(block=False)
+        while in_flight:
+            drain(block=True)
+    except BaseException as e:
+        stats["error"] = e
+    finally:
+        out.put(_DONE)
+
+
+def run_pipeline(links: List[Dict], pdf_type: str = "daily", delay: float = 0.3,
+                 workers: int = None, commit_every: int = 25, db_path: str = None,
+                 run_id: int = None, parse_method: str = None) -> Dict:
+    """Download, parse and store `links` with the three stages running concurrently.
+
+    Each link is parsed and stored as its own series (link["type"]: daily,
+    weekly or cigarette), falling back to `pdf_type`.
+
+    If `run_id` is given, per-URL progress is checkpointed in scrape_jobs.
+    `parse_method` picks the parse engine ("text" or "layout"; default PH_PARSE_METHOD).
+    Returns counts per stage.
+    """
+    workers = workers or os.cpu_count() or 1
+    download_q = queue.Queue(maxsize=workers * 2)
+    store_q = queue.Queue(maxsize=workers * 2)
+    events = queue.SimpleQueue()  # (url, status, error) from the other stages
+    stats = {"downloaded": 0, "cached": 0, "failed": 0, "parsed": 0, "parse_failed": 0,
+             "stored_prices": 0, "stored_commodities": 0, "commits": 0, "error": None}
+    started = time.perf_counter()
+
+    print(f"[pipeline] {len(links)} PDFs, {workers} parser processes, commit every {commit_every}")
+
+    conn = get_db(db_path, mode="rw")
+    archived = set(archived_years(db_path))
+    known = get_commodity_keys(conn)  # commodity ids looked up once for the whole run
+    pending = 0
+
+    def apply_events():
+        while True:
+            try:
+                url, status, error = events.get_nowait()
+            except queue.Empty:
+                return
+            if run_id is not None:
+                set_job_status(conn, run_id, url, status, error)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        downloader = threading.Thread(
+            target=_downloader, args=(links, pdf_type, delay, download_q, events, stats),
+            name="pipeline-downloader", daemon=True,
+        )
+        dispatcher = threading.Thread(
+            target=_dispatcher, args=(pool, workers * 2, pdf_type, parse_method, download_q, store_q, events, stats),
+            name="pipeline-dispatcher", daemon=True,
+        )
+        downloader.start()
+        dispatcher.start()
+
+        try:
+            while True:
+                result = store_q.get()
+                apply_events()
+                if result is _DONE:
+                    break
+
+                if result["commodities"]:
+                    stats["parsed"] += 1
+                else:
+                    stats["parse_failed"] += 1
+                    print(f"[pipeline] Parse FAILED {result['source_file']}: {result.get('errors', ['unknown'])}")
+
+                prices, commodities = store_parsed_result(conn, result, archived, known)
+                stats["stored_prices"] += prices
+                stats["stored_commodities"] += commodities
+                if run_id is not None and result["commodities"]:
+                    set_job_status(conn, run_id, result["url"], "stored")
+
+                pending += 1
+                if pending >= commit_every:
+                    bump_data_version(conn)
+                    conn.commit()
+                    stats["commits"] += 1
+                    pending = 0
+        finally:
+            # Keep whatever was stored, even if a stage failed or the run was interrupted
+            apply_events()
+            if pending:
+                bump_data_version(conn)
+                stats["commits"] += 1
+            conn.commit()
+            conn.close()
+
+        downloader.join()
+        dispatcher.join()
+
+    if stats["error"] is not None:
+        raise stats["error"]
+
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    del stats["error"]
+    print(f"[pipeline] Done in {stats['seconds']:.1f}s: {stats['downloaded']} downloaded, "
+          f"{stats['cached']} cached, {stats['failed']} failed downloads, {stats['parsed']} parsed, "
+          f"{stats['parse_failed']} parse failures, {stats['stored_prices']} prices stored "
+          f"in {stats['commits']} commits")
+    return stats
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+PH Price Index — date extraction benchmark
+Compares scraper/dates.py (one precompiled month alternation, header region
+only) with the previous per-month regex loops, on link texts, URLs and PDF
+text, and checks both return the same dates where the old code found one.
+Run: python scripts/bench_dates.py [--rounds 2000]
+"""
+import os
+import re
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraper.dates import parse_date, parse_url_date, parse_header_date
+
+OLD_MONTHS = {
+    "january": "01", "february": "02", "march": "03", "april": "04",
+    "may": "05", "june": "06", "july": "07", "august": "08",
+    "september": "09", "october": "10", "november": "11", "december": "12",
+    "marhc": "03",
+}
+
+
+def old_parse_daily_date(text: str, url: str):
+    """The crawler's previous implementation."""
+    for month_name, month_num in OLD_MONTHS.items():
+        match = re.search(rf'{month_name}\s+(\d{{1,2}}),?\s*(\d{{4}})', text.lower())
+        if match:
+            return f"{match.group(2)}-{month_num}-{int(match.group(1)):02d}"
+    match = re.search(r'(\d{2})(\d{2})(\d{4})-PRICE', url, re.IGNORECASE)
+    if match:
+        return f"{match.group(3)}-{match.group(1)}-{match.group(2)}"
+    for month_name, month_num in OLD_MONTHS.items():
+        match = re.search(rf'{month_name}-(\d{{1,2}})-(\d{{4}})', url.lower())
+        if match:
+            return f"{match.group(2)}-{month_num}-{int(match.group(1)):02d}"
+    return None
+
+
+def old_extract_date_from_text(text: str):
+    """The parser's previous implementation (whole text, one search per month)."""
+    for month_name, month_num in list(OLD_MONTHS.items())[:12]:
+        month_pattern = month_name[:4] + r'\s*' + month_name[4:]
+        match = re.search(rf'{month_pattern}\s+(\d{{1,2}}),?\s*(\d{{4}})', text.lower())
+        if match:
+            return f"{match.group(2)}-{month_num}-{int(match.group(1)):02d}"
+    return None
+
+
+LINKS = [
+    ("February 8, 2026", "https://www.da.gov.ph/wp-content/uploads/2026/02/Daily-Price-Index-February-8-2026.pdf"),
+    ("Marhc 3, 2025", "https://www.da.gov.ph/wp-content/uploads/2025/03/DPI-Marhc-3-2025.pdf"),
+    ("Daily Price Index", "https://www.da.gov.ph/wp-content/uploads/2025/12/12302025-PRICE-MONITORING.pdf"),
+    ("Download", "https://www.da.gov.ph/wp-content/uploads/2025/11/November-14-2025.pdf"),
+    ("Price Watch", "https://www.da.gov.ph/wp-content/uploads/2025/10/price-watch.pdf"),
+]
+
+
+def pdf_text(date_line: str, rows: int = 400) -> str:
+    header = f"Department of Agriculture\nDAILY PRICE INDEX\nNational Capital Region (NCR)\n{date_line}\n"
+    body = "".join(f"Commodity {i}  Specification {i}  {100 + i % 50}.00\n" for i in range(rows))
+    return header + body
+
+
+def bench(name: str, func, inputs, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for args in inputs:
+            func(*args)
+    elapsed = time.perf_counter() - started
+    per_call = elapsed / (rounds * len(inputs)) * 1e6
+    print(f"    {name:<6} {per_call:9.1f} µs/call")
+    return per_call
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark date extraction")
+    parser.add_argument("--rounds", type=int, default=2000, help="Repetitions of each input set")
+    args = parser.parse_args()
+
+    texts = [(pdf_text("February 8, 2026"),), (pdf_text("Febr uary 8, 2026"),),
+             (pdf_text("December 30, 2025"),), (pdf_text("(no date on this sheet)"),)]
+
+    mismatches = []
+    for text, url in LINKS:
+        old, new = old_parse_daily_date(text, url), parse_date(text) or parse_url_date(url)
+        if old and old != new:
+            mismatches.append((text, old, new))
+    for (text,) in texts:
+        old, new = old_extract_date_from_text(text), parse_header_date(text)
+        if old and old != new:
+            mismatches.append((text[:60], old, new))
+
+    print("=" * 60)
+    print("PH Price Index — date extraction")
+    print("=" * 60)
+    print("\n  Link text + URL (crawler):")
+    old = bench("old", old_parse_daily_date, LINKS, args.rounds)
+    new = bench("new", lambda t, u: parse_date(t) or parse_url_date(u), LINKS, args.rounds)
+    print(f"    {old / new:.1f}x faster")
+    print(f"\n  PDF text, {len(texts[0][0]):,} chars (parser):")
+    old = bench("old", old_extract_date_from_text, texts, args.rounds // 10)
+    new = bench("new", parse_header_date, texts, args.rounds // 10)
+    print(f"    {old / new:.1f}x faster")
+
+    if mismatches:
+        print("\nMISMATCHES:")
+        for text, old, new in mismatches:
+            print(f"  {text!r}: old {old}, new {new}")
+        sys.exit(1)
+    print("\nOK — same dates as the old code")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+PH Price Index — day-number column benchmark
+Compares the previous date-string indexes and queries (`date >= ?`, MAX(date),
+ORDER BY date) with database.py's integer `day` column and its indexes, on two
+copies of a migrated database's live table: index sizes, file size, time per
+query, and identical results.
+Run: python scripts/bench_days.py [--db data/prices.db] [--rounds 20]
+"""
+import os
+import sys
+import time
+import shutil
+import sqlite3
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from database import DAY_PARAM
+
+OLD_INDEXES = """
+    DROP INDEX IF EXISTS idx_prices_day;
+    DROP INDEX IF EXISTS idx_prices_commodity_day;
+    CREATE INDEX idx_prices_date ON prices(date);
+    CREATE INDEX idx_prices_commodity ON prices(commodity_id);
+    CREATE INDEX idx_prices_date_type ON prices(date, source_type);
+"""
+DATE_INDEXES = {
+    "old": ["idx_prices_date", "idx_prices_commodity", "idx_prices_date_type"],
+    "new": ["idx_prices_day", "idx_prices_commodity_day"],
+}
+
+# (label, old SQL, new SQL); both take the same parameters
+QUERIES = [
+    ("range, 1 year",
+     "SELECT commodity_id, date, price FROM prices WHERE date >= ? AND date <= ? AND source_type = 'daily'",
+     f"SELECT commodity_id, date, price FROM prices WHERE day >= {DAY_PARAM} AND day <= {DAY_PARAM} "
+     "AND source_type = 'daily'"),
+    ("history, 1 year",
+     "SELECT commodity_id, date, price FROM prices WHERE commodity_id IN "
+     "(SELECT id FROM commodities WHERE name LIKE ?) AND source_type = 'daily' "
+     "AND date >= ? AND date <= ? ORDER BY date DESC",
+     "SELECT commodity_id, date, price FROM prices WHERE commodity_id IN "
+     "(SELECT id FROM commodities WHERE name LIKE ?) AND source_type = 'daily' "
+     f"AND day >= {DAY_PARAM} AND day <= {DAY_PARAM} ORDER BY day DESC"),
+    ("history, last 30",
+     "SELECT commodity_id, date, price FROM prices WHERE +commodity_id IN "
+     "(SELECT id FROM commodities WHERE name LIKE ?) AND source_type = 'daily' ORDER BY date DESC LIMIT 30",
+     "SELECT commodity_id, date, price FROM prices WHERE +commodity_id IN "
+     "(SELECT id FROM commodities WHERE name LIKE ?) AND source_type = 'daily' ORDER BY day DESC LIMIT 30"),
+    ("latest date",
+     "SELECT MAX(date) FROM prices WHERE source_type = ?",
+     "SELECT date(MAX(day) + 1721424.5) FROM prices WHERE source_type = ?"),
+    ("prices of a date",
+     "SELECT commodity_id, price FROM prices WHERE date = ? AND source_type = 'daily'",
+     f"SELECT commodity_id, price FROM prices WHERE day = {DAY_PARAM} AND source_type = 'daily'"),
+    ("last 30 trading days",
+     "SELECT MIN(date) FROM (SELECT DISTINCT date FROM prices WHERE source_type = 'daily' "
+     "AND date <= ? ORDER BY date DESC LIMIT 30)",
+     "SELECT date(MIN(day) + 1721424.5) FROM (SELECT DISTINCT day FROM prices WHERE source_type = 'daily' "
+     f"AND day <= {DAY_PARAM} ORDER BY day DESC LIMIT 30)"),
+    ("count of dates",
+     "SELECT COUNT(DISTINCT date) FROM prices",
+     "SELECT COUNT(*) FROM (SELECT DISTINCT day FROM prices)"),
+]
+
+
+def index_bytes(conn: sqlite3.Connection, names) -> int:
+    placeholders = ",".join("?" * len(names))
+    return conn.execute(
+        f"SELECT COALESCE(SUM(pgsize), 0) FROM dbstat WHERE name IN ({placeholders})", names
+    ).fetchone()[0]
+
+
+def timed_ms(conn: sqlite3.Connection, sql: str, params, rounds: int):
+    rows = conn.execute(sql, params).fetchall()
+    started = time.perf_counter()
+    for _ in range(rounds):
+        conn.execute(sql, params).fetchall()
+    return rows, (time.perf_counter() - started) / rounds * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the integer day column")
+    parser.add_argument("--db", default=database.DB_PATH, help="SQLite database to benchmark (migrated by init_db)")
+    parser.add_argument("--rounds", type=int, default=20, help="Timed repetitions per query")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="ph-bench-days-")
+    paths = {"old": os.path.join(tmp, "old.db"), "new": os.path.join(tmp, "new.db")}
+    source = sqlite3.connect(args.db)
+    for label, path in paths.items():
+        copy = sqlite3.connect(path)
+        source.backup(copy)
+        if label == "old":
+            copy.executescript(OLD_INDEXES)
+        copy.execute("VACUUM")
+        copy.execute("ANALYZE")
+        copy.close()
+    source.close()
+    conns = {label: sqlite3.connect(path) for label, path in paths.items()}
+
+    new = conns["new"]
+    if "day" not in database._table_columns(new, "prices"):
+        sys.exit(f"{args.db} has no prices.day column yet; run `python database.py` to migrate it")
+    last = new.execute("SELECT date FROM prices WHERE source_type = 'daily' ORDER BY day DESC LIMIT 1").fetchone()[0]
+    name = new.execute("SELECT name FROM commodities ORDER BY id LIMIT 1").fetchone()[0]
+    year_ago = f"{int(last[:4]) - 1}{last[4:]}"
+    params = {
+        "range, 1 year": (year_ago, last),
+        "history, 1 year": (f"%{name}%", year_ago, last),
+        "history, last 30": (f"%{name}%",),
+        "latest date": ("daily",),
+        "prices of a date": (last,),
+        "last 30 trading days": (last,),
+        "count of dates": (),
+    }
+
+    print("=" * 60)
+    print("PH Price Index — day-number column")
+    print(f"{args.db}, range {year_ago} .. {last}")
+    print("=" * 60)
+
+    sizes = {label: index_bytes(conns[label], DATE_INDEXES[label]) for label in conns}
+    files = {label: os.path.getsize(path) for label, path in paths.items()}
+    print(f"\n  Date indexes: {sizes['old'] / 1e6:.2f} MB ({', '.join(DATE_INDEXES['old'])})")
+    print(f"           →  {sizes['new'] / 1e6:.2f} MB ({', '.join(DATE_INDEXES['new'])})")
+    print(f"  Database file: {files['old'] / 1e6:.2f} MB → {files['new'] / 1e6:.2f} MB")
+
+    print(f"\n  {'query':<22} {'rows':>7} {'old ms':>8} {'new ms':>8}")
+    mismatches = []
+    for label, old_sql, new_sql in QUERIES:
+        old_rows, old_ms = timed_ms(conns["old"], old_sql, params[label], args.rounds)
+        new_rows, new_ms = timed_ms(conns["new"], new_sql, params[label], args.rounds)
+        # Rows of the same date may come in either order
+        if sorted(old_rows) != sorted(new_rows):
+            mismatches.append(label)
+        print(f"  {label:<22} {len(new_rows):>7,} {old_ms:>8.2f} {new_ms:>8.2f}")
+
+    for conn in conns.values():
+        conn.close()
+    shutil.rmtree(tmp)
+
+    if mismatches:
+        print(f"\nMISMATCHES: {', '.join(mismatches)}")
+        sys.exit(1)
+    print("\nOK — same rows from both schemas")
+
+
+if __name__ == "__main__":
+    main()
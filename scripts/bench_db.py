@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+PH Price Index — SQLite connection mode benchmark
+Runs the API's read queries against the same database with the default
+read-write connections, plain read-only connections, and the tuned serving
+mode (read-only + mmap + query_only + per-thread pooled connections).
+Run: python scripts/bench_db.py [--rounds 200] [--threads 4]
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+
+CONFIGS = [
+    # name, mode, pooled, pragmas
+    ("rw (current)", "rw", False, {}),
+    ("ro", "ro", False, {}),
+    ("ro + mmap + pool", "ro", True, database.SERVING_PRAGMAS),
+]
+
+
+def _workload():
+    stats = database.get_stats()
+    last = stats["last_date"]
+    first = stats["first_date"]
+    commodities = database.get_all_commodities(limit=5)["commodities"]
+    names = [c["name"] for c in commodities]
+    return [
+        ("latest", lambda: database.get_latest_prices()),
+        ("by_date", lambda: database.get_prices_by_date(last)),
+        ("history", lambda: database.get_commodity_history(names[0])),
+        ("batch", lambda: database.get_history_batch([], names, first, last)),
+        ("search", lambda: database.search_prices(names[0][:4])),
+        ("stats", lambda: database.get_stats()),
+    ]
+
+
+def _run_round(workload):
+    timings = {}
+    for name, query in workload:
+        started = time.perf_counter()
+        query()
+        timings[name] = time.perf_counter() - started
+    return timings
+
+
+def run(config, workload, rounds: int, threads: int):
+    name, mode, pooled, pragmas = config
+    database.DB_MODE = mode
+    database.DB_POOL = pooled
+    database.SERVING_PRAGMAS = pragmas
+
+    _run_round(workload)  # warm the OS page cache
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(lambda _: _run_round(workload), range(rounds)))
+    elapsed = time.perf_counter() - started
+
+    queries = rounds * len(workload)
+    print(f"\n  {name:<18} {queries / elapsed:>9,.0f} queries/s")
+    for query, _ in workload:
+        samples = sorted(r[query] * 1000 for r in results)
+        p95 = samples[int(len(samples) * 0.95) - 1]
+        print(f"    {query:<10} median {statistics.median(samples):7.3f} ms   p95 {p95:7.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SQLite connection modes")
+    parser.add_argument("--rounds", type=int, default=200, help="Workload repetitions per mode")
+    parser.add_argument("--threads", type=int, default=4, help="Concurrent threads (like the API threadpool)")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"PH Price Index — SQLite modes ({database.DB_PATH})")
+    print(f"{args.rounds} rounds × {args.threads} threads")
+    print("=" * 60)
+
+    workload = _workload()
+    for config in CONFIGS:
+        run(config, workload, args.rounds, args.threads)
+
+
+if __name__ == "__main__":
+    main()
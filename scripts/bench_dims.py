@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+PH Price Index — commodity dimension cache benchmark
+Compares the range, history and export queries that JOIN commodities and turn
+every sqlite3.Row into a dict (the previous code) with database.py's
+(commodity_id, date, price) queries assembled from the interned dimension
+cache: time per call, memory held by the result, and identical rows. Also
+times ingest with and without the batch commodity lookup.
+Run: python scripts/bench_dims.py [--db data/prices.db] [--rounds 5]
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from database import get_db, get_prices_range, get_commodity_history, export_columns
+
+
+def old_query(db_path: str, sql: str, params=()):
+    conn = get_db(db_path)
+    rows = [dict(row) for row in conn.execute(sql, params)]
+    conn.close()
+    return rows
+
+
+def old_range(db_path, date_from, date_to):
+    return old_query(db_path, """
+        SELECT c.name, c.category, c.specification, c.unit, p.price, p.date
+        FROM prices p JOIN commodities c ON p.commodity_id = c.id
+        WHERE p.date >= ? AND p.date <= ? AND p.source_type = 'daily'
+        ORDER BY p.date, c.category, c.name
+    """, (date_from, date_to))
+
+
+def old_history(db_path, name, date_from, date_to):
+    return old_query(db_path, """
+        SELECT c.name, c.category, c.specification, p.price, p.date
+        FROM prices p JOIN commodities c ON p.commodity_id = c.id
+        WHERE c.name LIKE ? AND p.source_type = 'daily' AND p.date >= ? AND p.date <= ?
+        ORDER BY p.date DESC
+    """, (f"%{name}%", date_from, date_to))
+
+
+def old_export(db_path):
+    rows = old_query(db_path, """
+        SELECT p.date, p.source_type, c.category, c.name as commodity, c.specification, c.unit, p.price
+        FROM prices p JOIN commodities c ON p.commodity_id = c.id
+        ORDER BY p.date, p.source_type, c.category, c.name
+    """)
+    return {name: [row[name] for row in rows] for name in database.EXPORT_COLUMNS}
+
+
+def measure(func, rounds: int):
+    result = func()  # warm the page cache and the dimension cache
+    started = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    elapsed = (time.perf_counter() - started) / rounds * 1000
+    del result
+    tracemalloc.start()
+    result = func()
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, elapsed, held / 1e6
+
+
+def ingest(db_path: str, batch_lookup: bool) -> float:
+    """Re-store every daily sheet of the last 30 dates (unchanged prices) on a copy of the database."""
+    conn = get_db(db_path, mode="rw", pooled=False)
+    dates = [row[0] for row in conn.execute(
+        "SELECT DISTINCT date FROM prices WHERE source_type = 'daily' ORDER BY date DESC LIMIT 30")]
+    results = [{
+        "date": date, "source_type": "daily", "source_file": f"daily-{date}.pdf", "errors": [],
+        "commodities": [{"name": r[0], "category": r[1], "specification": r[2], "unit": r[3], "price": r[4]}
+                        for r in conn.execute("""
+                            SELECT c.name, c.category, c.specification, c.unit, p.price
+                            FROM prices p JOIN commodities c ON p.commodity_id = c.id
+                            WHERE p.date = ? AND p.source_type = 'daily'""", (date,))],
+    } for date in dates]
+    started = time.perf_counter()
+    known = database.get_commodity_keys(conn) if batch_lookup else None
+    for result in results:
+        database.store_parsed_result(conn, result, known=known)
+    elapsed = time.perf_counter() - started
+    conn.rollback()
+    conn.close()
+    return elapsed * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the commodity dimension cache")
+    parser.add_argument("--db", default=database.DB_PATH, help="SQLite database to benchmark")
+    parser.add_argument("--rounds", type=int, default=5, help="Timed repetitions per query")
+    args = parser.parse_args()
+
+    conn = get_db(args.db, pooled=False)
+    last = conn.execute("SELECT MAX(date) FROM prices WHERE source_type = 'daily'").fetchone()[0]
+    name = conn.execute("SELECT name FROM commodities ORDER BY id LIMIT 1").fetchone()[0]
+    conn.close()
+    year_ago = f"{int(last[:4]) - 1}{last[4:]}"
+
+    cases = [
+        ("range, 1 year", lambda: old_range(args.db, year_ago, last),
+         lambda: get_prices_range(year_ago, last, db_path=args.db)),
+        (f"history {name!r}", lambda: old_history(args.db, name, year_ago, last),
+         lambda: get_commodity_history(name, date_from=year_ago, date_to=last, db_path=args.db)),
+        ("export columns", lambda: old_export(args.db), lambda: export_columns(db_path=args.db)),
+    ]
+
+    print("=" * 60)
+    print("PH Price Index — commodity dimension cache")
+    print(f"{args.db}, range {year_ago} .. {last}")
+    print("=" * 60)
+    print(f"\n  {'query':<22} {'rows':>8} {'old ms':>8} {'new ms':>8} {'old MB':>8} {'new MB':>8}")
+    mismatches = []
+    for label, old, new in cases:
+        old_rows, old_ms, old_mb = measure(old, args.rounds)
+        new_rows, new_ms, new_mb = measure(new, args.rounds)
+        if label.startswith("history"):
+            # Rows of the same date may come in either order
+            old_rows, new_rows = sorted(map(repr, old_rows)), sorted(map(repr, new_rows))
+        if old_rows != new_rows:
+            mismatches.append(label)
+        count = len(new_rows["date"]) if isinstance(new_rows, dict) else len(new_rows)
+        print(f"  {label:<22} {count:>8,} {old_ms:>8.1f} {new_ms:>8.1f} {old_mb:>8.1f} {new_mb:>8.1f}")
+
+    tmp = tempfile.mkdtemp(prefix="ph-bench-dims-")
+    copy = os.path.join(tmp, "prices.db")
+    shutil.copy(args.db, copy)
+    per_row = ingest(copy, batch_lookup=False)
+    batched = ingest(copy, batch_lookup=True)
+    shutil.rmtree(tmp)
+    print(f"\n  Ingest of 30 daily sheets: {per_row:.0f} ms per-row lookups, {batched:.0f} ms batch lookup")
+
+    if mismatches:
+        print(f"\nMISMATCHES: {', '.join(mismatches)}")
+        sys.exit(1)
+    print("\nOK — same rows as the JOIN queries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+PH Price Index — garbage-text detector benchmark
+Compares scraper.parser.garbage_score (bounded sample, bytes.translate,
+keyword checks on the lowered bytes) with the previous per-character loop over
+the whole text, on price sheets of increasing length and on typical garbage,
+and checks both reach the same verdicts.
+Run: python scripts/bench_garbage.py [--rounds 200]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraper.parser import garbage_score, FOOD_KEYWORDS
+
+
+def old_is_garbage_text(text: str, keywords=FOOD_KEYWORDS) -> bool:
+    """The parser's previous implementation."""
+    if len(text.strip()) < 50:
+        return True
+    readable = sum(1 for c in text if c.isalnum() or c.isspace() or c in ".,/()-₱")
+    total = len(text)
+    if total > 0 and readable / total < 0.4:
+        return True
+    text_lower = text.lower()
+    found = sum(1 for k in keywords if k in text_lower)
+    if found < 2:
+        return True
+    return False
+
+
+def price_sheet(rows: int) -> str:
+    header = "DEPARTMENT OF AGRICULTURE\nDAILY PRICE INDEX\nFebruary 8, 2026\nCOMMODITY  SPECIFICATION  PRICE (₱/UNIT)\n"
+    rnd = random.Random(rows)
+    return header + "".join(
+        f"Commodity Ñame {i}  Medium (5-6 pcs/kg)  {rnd.uniform(20, 500):,.2f}\n" for i in range(rows)
+    )
+
+
+def garbage(chars: int) -> str:
+    rnd = random.Random(chars)
+    return "".join(chr(rnd.choice([rnd.randint(0x2500, 0x25FF), rnd.randint(0x20, 0x7E)])) for _ in range(chars))
+
+
+def bench(func, text: str, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        func(text)
+    return (time.perf_counter() - started) / rounds * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the garbage-text detector")
+    parser.add_argument("--rounds", type=int, default=200, help="Repetitions per document")
+    args = parser.parse_args()
+
+    documents = [
+        ("sheet, 1 page", price_sheet(40)),
+        ("sheet, 10 pages", price_sheet(400)),
+        ("sheet, 100 pages", price_sheet(4000)),
+        ("no keywords", "lorem ipsum dolor sit amet " * 400),
+        ("glyph soup", garbage(20000)),
+        ("near-empty", "  \n \x0c "),
+    ]
+
+    print("=" * 60)
+    print("PH Price Index — garbage-text detector")
+    print("=" * 60)
+    print(f"\n  {'document':<18} {'chars':>9} {'old µs':>10} {'new µs':>9}  verdict (confidence)")
+    mismatches = []
+    for name, text in documents:
+        old_verdict = old_is_garbage_text(text)
+        score = garbage_score(text)
+        if old_verdict != score["garbage"]:
+            mismatches.append(name)
+        old = bench(old_is_garbage_text, text, args.rounds)
+        new = bench(garbage_score, text, args.rounds)
+        verdict = f"{score['reason'] or 'ok'} ({score['confidence']:.2f})"
+        print(f"  {name:<18} {len(text):>9,} {old:>10.1f} {new:>9.1f}  {verdict}")
+
+    if mismatches:
+        print(f"\nMISMATCHES: {', '.join(mismatches)}")
+        sys.exit(1)
+    print("\nOK — same verdicts as the old check")
+
+
+if __name__ == "__main__":
+    main()
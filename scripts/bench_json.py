@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+PH Price Index — JSON encoding benchmark
+Encodes the payloads of the biggest endpoints three ways: the previous path
+(FastAPI's jsonable_encoder + stdlib json via JSONResponse), orjson via
+api/responses.py, and a cache hit that sends bytes rendered earlier. Reports
+time and throughput per payload and checks all encodings decode to the same
+JSON.
+Run: python scripts/bench_json.py [--db data/prices.db] [--rounds 10]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def timed(func, rounds: int):
+    body = func()
+    started = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return body, (time.perf_counter() - started) / rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON encoding of API payloads")
+    parser.add_argument("--db", help="SQLite database to benchmark (default: PH_DB_PATH / data/prices.db)")
+    parser.add_argument("--rounds", type=int, default=10, help="Timed repetitions per payload")
+    args = parser.parse_args()
+    if args.db:
+        os.environ["PH_DB_PATH"] = args.db
+
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    import database
+    from api.main import _build_dashboard
+    from api.responses import ProfiledJSONResponse
+
+    stats = database.get_stats()
+    last = stats["last_date"]
+    year_ago = f"{int(last[:4]) - 1}{last[4:]}"
+    ids = [c["id"] for c in database.get_all_commodities(limit=200)["commodities"]]
+
+    payloads = [
+        ("range, 1 year", {"from": year_ago, "to": last, "prices": database.get_prices_range(year_ago, last)}),
+        ("range, compact", {"from": year_ago, "to": last,
+                            "prices": database.get_prices_range(year_ago, last, compact=True)}),
+        (f"history, {len(ids)} ids", database.get_history_batch(ids, days=365)),
+        ("dashboard", _build_dashboard()),
+        ("export, all rows", {"prices": list(database.export_all())}),
+    ]
+
+    print("=" * 60)
+    print("PH Price Index — JSON encoding")
+    print(f"{stats['total_prices']:,} prices, {year_ago} .. {last}")
+    print("=" * 60)
+    print(f"\n  {'payload':<20} {'MB':>6} {'stdlib ms':>10} {'orjson ms':>10} {'cached ms':>10} {'orjson MB/s':>12}")
+    mismatches = []
+    for label, payload in payloads:
+        new, new_s = timed(lambda: ProfiledJSONResponse(payload).body, args.rounds)
+        _, hit_s = timed(lambda: ProfiledJSONResponse(new).body, args.rounds)
+        if label.endswith("compact"):
+            old, old_s = None, None  # jsonable_encoder can't walk PriceRows
+        else:
+            old, old_s = timed(lambda: JSONResponse(jsonable_encoder(payload)).body, args.rounds)
+            if json.loads(old) != json.loads(new):
+                mismatches.append(label)
+        old_ms = f"{old_s * 1000:.1f}" if old_s is not None else "—"
+        print(f"  {label:<20} {len(new) / 1e6:>6.2f} {old_ms:>10} {new_s * 1000:>10.1f} "
+              f"{hit_s * 1000:>10.3f} {len(new) / 1e6 / new_s:>12.0f}")
+
+    if mismatches:
+        print(f"\nMISMATCHES: {', '.join(mismatches)}")
+        sys.exit(1)
+    print("\nOK — orjson output decodes to the same JSON")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+PH Price Index — parse engine benchmark
+Parses the same PDFs with the "text" and "layout" engines and reports speed
+and accuracy. By default it writes synthetic price sheets whose contents are
+known (multi-word names, wrapped specifications, n/a prices, right-aligned
+prices, several pages), so accuracy is measured against ground truth. With
+--dir it runs on real downloaded PDFs and reports how often the engines agree.
+Run: python scripts/bench_parsers.py [--sheets 20] [--dir data/pdfs/daily]
+"""
+import os
+import sys
+import glob
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraper.parser import parse_daily_pdf
+
+ITEMS = {
+    "IMPORTED COMMERCIAL RICE": [("Special Rice", "White Rice"), ("Premium", "5% broken"),
+                                 ("Well Milled", "1-19% bran streak")],
+    "FISH PRODUCTS": [("Bangus", "Large"), ("Tilapia", "Medium (5-6 pcs/kg)"),
+                      ("Galunggong, Local", "Medium (12-14 pcs/kg)"), ("Pampano", "Imported, Frozen")],
+    "PORK MEAT PRODUCTS": [("Pork Ham", "Kasim"), ("Pork Belly", "Liempo"), ("Frozen Pork Ham", "Kasim")],
+    "LOWLAND VEGETABLES": [("Ampalaya", "4-5 pcs/kg"), ("Squash", "Suprema variety"),
+                           ("Broccoli, Local", "Medium (8-10 cm diameter/bunch hd)"),
+                           ("Tomato", "15-18 pcs/kg")],
+}
+
+
+def write_pdf(path: str, pages):
+    """Minimal PDF with one positioned string per cell; pages are lists of (x, y, text)."""
+    objects = [b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"]
+    pages_id = 2 + 2 * len(pages)
+    page_ids = []
+    for cells in pages:
+        ops = ["BT /F1 9 Tf"]
+        for x, y, text in cells:
+            escaped = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+            ops.append(f"1 0 0 1 {x:.1f} {y:.1f} Tm ({escaped}) Tj")
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        objects.append(b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 842] /Contents %d 0 R "
+                       b"/Resources << /Font << /F1 1 0 R >> >> >>" % (pages_id, len(objects)))
+        page_ids.append(len(objects))
+    kids = " ".join(f"{i} 0 R" for i in page_ids).encode()
+    objects.append(b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % len(page_ids))
+    objects.append(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for i, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + obj + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, len(objects), xref)
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def synthetic_sheet(seed: int):
+    """Cells for a DA-style daily sheet, plus the rows a perfect parser would return."""
+    rnd = random.Random(seed)
+    expected = []
+    pages, cells = [], []
+    y = 0
+
+    def new_page():
+        nonlocal cells, y
+        cells = []
+        pages.append(cells)
+        y = 800
+        for text in ("DEPARTMENT OF AGRICULTURE", "DAILY PRICE INDEX", "February 8, 2026"):
+            cells.append((50, y, text))
+            y -= 12
+        cells += [(50, y, "COMMODITY"), (200, y, "SPECIFICATION"), (420, y, "PREVAILING RETAIL PRICE PER UNIT (P/UNIT)")]
+        y -= 14
+
+    new_page()
+    for category, items in ITEMS.items():
+        if y < 120:
+            new_page()
+        cells.append((50, y, category))
+        y -= 12
+        for name, spec in items:
+            price = None if rnd.random() < 0.08 else round(rnd.uniform(20, 600), 2)
+            price_text = "n/a" if price is None else f"{price:,.2f}"
+            price_x = 520 - 4.5 * len(price_text)  # right-aligned
+            if len(spec) > 24:
+                # Wrapped specification, price on the first line
+                cut = spec.rfind(" ", 0, 24)
+                cells += [(50, y, name), (200, y, spec[:cut]), (price_x, y, price_text),
+                          (200, y - 10, spec[cut + 1:])]
+                y -= 22
+            else:
+                cells += [(50, y, name), (200, y, spec), (price_x, y, price_text)]
+                y -= 12
+            expected.append((category, name, spec, price))
+        if rnd.random() < 0.5:
+            new_page()
+    return pages, expected
+
+
+def _rows(result):
+    return [(c["category"], c["name"], c["specification"], c["price"]) for c in result["commodities"]]
+
+
+def run(paths, expected, method: str):
+    started = time.perf_counter()
+    results = [parse_daily_pdf(path, "2026-02-08", method=method) for path in paths]
+    elapsed = time.perf_counter() - started
+    exact = prices = total = 0
+    if expected:
+        for result, truth in zip(results, expected):
+            got = _rows(result)
+            total += len(truth)
+            exact += sum(1 for row in truth if row in got)
+            got_prices = {(name, price) for _, name, _, price in got}
+            prices += sum(1 for _, name, _, price in truth if (name, price) in got_prices)
+    return results, elapsed, exact, prices, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the text and layout parse engines")
+    parser.add_argument("--sheets", type=int, default=20, help="Synthetic sheets to generate")
+    parser.add_argument("--dir", help="Benchmark real PDFs in this directory instead (no ground truth)")
+    args = parser.parse_args()
+
+    expected = None
+    if args.dir:
+        paths = sorted(glob.glob(os.path.join(args.dir, "*.pdf")))
+        source = f"{len(paths)} PDFs from {args.dir}"
+    else:
+        tmp = tempfile.mkdtemp(prefix="ph-bench-parsers-")
+        paths, expected = [], []
+        for i in range(args.sheets):
+            pages, truth = synthetic_sheet(i)
+            path = os.path.join(tmp, f"sheet-{i:03d}.pdf")
+            write_pdf(path, pages)
+            paths.append(path)
+            expected.append(truth)
+        source = f"{len(paths)} synthetic sheets in {tmp}"
+
+    print("=" * 60)
+    print("PH Price Index — parse engines")
+    print(source)
+    print("=" * 60)
+
+    outputs = {}
+    for method in ("text", "layout"):
+        results, elapsed, exact, prices, total = run(paths, expected, method)
+        outputs[method] = results
+        used = sum(1 for r in results if r["parse_method"] == method)
+        rows = sum(len(r["commodities"]) for r in results)
+        print(f"\n  {method}: {elapsed / len(paths) * 1000:.1f} ms/PDF, {rows} rows "
+              f"({used}/{len(paths)} PDFs parsed by this engine)")
+        if expected:
+            print(f"    exact rows (category, name, spec, price): {exact}/{total} ({exact / total:.0%})")
+            print(f"    name + price correct:                      {prices}/{total} ({prices / total:.0%})")
+
+    same = sum(1 for a, b in zip(outputs["text"], outputs["layout"]) if _rows(a) == _rows(b))
+    print(f"\n  Engines agree on {same}/{len(paths)} PDFs")
+
+
+if __name__ == "__main__":
+    main()
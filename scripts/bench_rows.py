@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+PH Price Index — compact row benchmark
+Compares the dict path (a list of dicts per query, FastAPI's jsonable_encoder,
+then JSONResponse) with PriceRows (compact=True, encoded by
+ProfiledJSONResponse) for the range, history and export endpoints: query +
+encode time, memory held by the query result, and identical JSON.
+Run: python scripts/bench_rows.py [--db data/prices.db] [--rounds 5]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from database import get_db, get_prices_range, get_commodity_history, export_all, export_chunks
+
+
+def held_mb(func):
+    """Memory still allocated by func()'s result."""
+    tracemalloc.start()
+    result = func()
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return held / 1e6
+
+
+def timed_ms(func, rounds: int):
+    func()
+    started = time.perf_counter()
+    for _ in range(rounds):
+        body = func()
+    return body, (time.perf_counter() - started) / rounds * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark compact query results")
+    parser.add_argument("--db", default=database.DB_PATH, help="SQLite database to benchmark")
+    parser.add_argument("--rounds", type=int, default=5, help="Timed repetitions per case")
+    args = parser.parse_args()
+
+    # Imported here so PH_DB_PATH can point the API at --db
+    os.environ["PH_DB_PATH"] = args.db
+    from api.responses import ProfiledJSONResponse, dumps
+
+    conn = get_db(args.db, pooled=False)
+    last = conn.execute("SELECT MAX(date) FROM prices WHERE source_type = 'daily'").fetchone()[0]
+    name = conn.execute("SELECT name FROM commodities ORDER BY id LIMIT 1").fetchone()[0]
+    conn.close()
+    year_ago = f"{int(last[:4]) - 1}{last[4:]}"
+
+    def envelope(rows):
+        return {"from": year_ago, "to": last, "count": len(rows), "prices": rows}
+
+    def range_rows(compact):
+        return get_prices_range(year_ago, last, compact=compact, db_path=args.db)
+
+    def history_rows(compact):
+        return get_commodity_history(name, date_from=year_ago, date_to=last, compact=compact, db_path=args.db)
+
+    def export_dicts():
+        return '{"prices":[' + ",".join(json.dumps(row) for row in export_all(db_path=args.db)) + "]}"
+
+    def export_compact():
+        return b'{"prices":[' + b",".join(dumps(c)[1:-1] for c in export_chunks(db_path=args.db)) + b"]}"
+
+    cases = [
+        ("range, 1 year", lambda: range_rows(False), lambda: range_rows(True),
+         lambda: JSONResponse(jsonable_encoder(envelope(range_rows(False)))).body,
+         lambda: ProfiledJSONResponse(envelope(range_rows(True))).body),
+        (f"history {name!r}", lambda: history_rows(False), lambda: history_rows(True),
+         lambda: JSONResponse(jsonable_encoder(envelope(history_rows(False)))).body,
+         lambda: ProfiledJSONResponse(envelope(history_rows(True))).body),
+        ("export json", lambda: list(export_all(db_path=args.db)), lambda: list(export_chunks(db_path=args.db)),
+         export_dicts, export_compact),
+    ]
+
+    print("=" * 60)
+    print("PH Price Index — compact rows")
+    print(f"{args.db}, range {year_ago} .. {last}")
+    print("=" * 60)
+    print(f"\n  {'endpoint':<18} {'dicts ms':>9} {'compact ms':>11} {'dicts MB':>9} {'compact MB':>11}")
+    mismatches = []
+    for label, dict_rows, compact_rows, dict_body, compact_body in cases:
+        old_mb, new_mb = held_mb(dict_rows), held_mb(compact_rows)
+        old, old_ms = timed_ms(dict_body, args.rounds)
+        new, new_ms = timed_ms(compact_body, args.rounds)
+        if json.loads(old) != json.loads(new):
+            mismatches.append(label)
+        print(f"  {label:<18} {old_ms:>9.1f} {new_ms:>11.1f} {old_mb:>9.1f} {new_mb:>11.1f}")
+
+    if mismatches:
+        print(f"\nMISMATCHES: {', '.join(mismatches)}")
+        sys.exit(1)
+    print("\nOK — same JSON from both paths")
+
+
+if __name__ == "__main__":
+    main()
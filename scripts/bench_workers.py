@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+PH Price Index — Multi-worker throughput benchmark
+Starts the API with 1, 2, 4, ... workers (up to the core count) in read-only
+mode and measures requests/second against the cached read endpoints.
+Run: python scripts/bench_workers.py [--duration 10] [--clients 32]
+"""
+import os
+import sys
+import time
+import socket
+import argparse
+import subprocess
+import http.client
+import multiprocessing
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PATHS = ["/api/dashboard", "/api/prices/latest", "/api/stats", "/api/dates"]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(port: int, timeout: float = 30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", "/api/dashboard")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"API on port {port} did not become ready")
+
+
+def _client(port: int, duration: float, result):
+    """Issue keep-alive requests round-robin over PATHS until the deadline."""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    done = errors = 0
+    deadline = time.time() + duration
+    while time.time() < deadline:
+        try:
+            conn.request("GET", PATHS[done % len(PATHS)])
+            resp = conn.getresponse()
+            resp.read()
+            if resp.status != 200:
+                errors += 1
+            done += 1
+        except OSError:
+            errors += 1
+            conn.close()
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    result.put((done, errors))
+
+
+def run(workers: int, duration: float, clients: int) -> float:
+    port = _free_port()
+    env = {**os.environ, "PH_DB_MODE": os.environ.get("PH_DB_MODE", "ro")}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=ROOT, env=env,
+    )
+    try:
+        _wait_ready(port)
+        result = multiprocessing.Queue()
+        procs = [multiprocessing.Process(target=_client, args=(port, duration, result))
+                 for _ in range(clients)]
+        for p in procs:
+            p.start()
+        totals = [result.get() for _ in procs]
+        for p in procs:
+            p.join()
+    finally:
+        server.terminate()
+        server.wait()
+
+    requests = sum(t[0] for t in totals)
+    errors = sum(t[1] for t in totals)
+    rps = requests / duration
+    print(f"  workers={workers:<3} {rps:>10,.0f} req/s  ({requests:,} requests, {errors} errors)")
+    return rps
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark API throughput vs worker count")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per run")
+    parser.add_argument("--clients", type=int, default=32, help="Concurrent client processes")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    counts = []
+    n = 1
+    while n <= args.max_workers:
+        counts.append(n)
+        n *= 2
+    if counts[-1] != args.max_workers:
+        counts.append(args.max_workers)
+
+    print("=" * 60)
+    print(f"PH Price Index — Worker scaling ({os.cpu_count()} cores, {args.clients} clients)")
+    print("=" * 60)
+
+    baseline = None
+    for workers in counts:
+        rps = run(workers, args.duration, args.clients)
+        baseline = baseline or rps
+        print(f"             speedup vs 1 worker: {rps / baseline:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+PH Price Index — API import-time and cold-start check
+Imports api.main under `python -X importtime` in a fresh interpreter, fails if
+it exceeds the budget or pulls in scraper-only dependencies, and optionally
+measures how long a fresh server takes to answer its first request.
+Run: python scripts/check_import_time.py [--budget-ms 1500] [--serve]
+"""
+import os
+import re
+import sys
+import time
+import socket
+import argparse
+import subprocess
+import http.client
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Only the scraper / export builds need these; the API must not import them at startup
+FORBIDDEN = ["PyPDF2", "bs4", "requests", "pyarrow", "scraper"]
+
+LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def import_profile(module: str = "api.main"):
+    """Return (module, self_us, cumulative_us) for every module imported by `module`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+        env={**os.environ, "PH_WARMUP": "0"},
+    )
+    if result.returncode != 0:
+        sys.exit(f"Importing {module} failed:\n{result.stderr}")
+    profile = []
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            profile.append((match.group(4), int(match.group(1)), int(match.group(2))))
+    return profile
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def time_to_first_response(path: str = "/api/dashboard", timeout: float = 60):
+    """Start uvicorn and time process start → first 200, plus the latency of that request."""
+    port = _free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                request_started = time.perf_counter()
+                conn.request("GET", path)
+                resp = conn.getresponse()
+                resp.read()
+                if resp.status == 200:
+                    done = time.perf_counter()
+                    return done - started, done - request_started
+            except OSError:
+                time.sleep(0.05)
+        raise RuntimeError(f"API did not answer {path} within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check API import time and cold-start latency")
+    parser.add_argument("--budget-ms", type=float, default=1500, help="Maximum cumulative import time of api.main")
+    parser.add_argument("--top", type=int, default=10, help="Show the N slowest imports")
+    parser.add_argument("--serve", action="store_true", help="Also time a fresh server's first response")
+    args = parser.parse_args()
+
+    profile = import_profile()
+    total_ms = next(cum for name, _, cum in profile if name == "api.main") / 1000
+
+    print("=" * 60)
+    print("PH Price Index — API import time")
+    print("=" * 60)
+    print(f"\n  api.main: {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    print(f"\n  Slowest imports (self time):")
+    for name, self_us, cum_us in sorted(profile, key=lambda p: -p[1])[:args.top]:
+        print(f"    {self_us / 1000:8.1f} ms  {name}")
+
+    failures = []
+    if total_ms > args.budget_ms:
+        failures.append(f"import took {total_ms:.0f} ms, budget is {args.budget_ms:.0f} ms")
+    imported = {name.split(".")[0] for name, _, _ in profile}
+    for module in FORBIDDEN:
+        if module in imported:
+            failures.append(f"'{module}' is imported by api.main")
+
+    if args.serve:
+        first, latency = time_to_first_response()
+        print(f"\n  Time to first /api/dashboard response: {first:.2f}s (request itself {latency * 1000:.1f} ms)")
+
+    if failures:
+        print("\nFAILED:")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+    print("\nOK")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,10 @@ import re
 import os
 import sys
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import init_db, bump_data_version, archived_years, next_change_seq, delete_prices
+
 DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "prices.db")
 
 # === VALID CATEGORIES ===
@@ -208,6 +212,14 @@ def is_junk_category(cat):
 
 
 def main():
+    init_db(DB_PATH)
+    archived = archived_years(DB_PATH)
+    if archived:
+        # Cleanup merges and deletes commodities, which archived prices still reference
+        print(f"Archived years {archived} exist — restore archived years first "
+              f"(python database.py --restore-year YEAR)")
+        sys.exit(1)
+    
     conn = sqlite3.connect(DB_PATH)
     conn.row_factory = sqlite3.Row
     
@@ -319,15 +331,16 @@ def main():
         
         for p in prices:
             try:
+                # New change_seq so the changes feed reports the row under its new id
                 conn.execute(
-                    "UPDATE prices SET commodity_id = ? WHERE id = ?",
-                    (new_id, p['id'])
+                    "UPDATE prices SET commodity_id = ?, change_seq = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                    (new_id, next_change_seq(conn), p['id'])
                 )
                 remapped += 1
             except sqlite3.IntegrityError:
                 # Conflict - same date/source_type for this new commodity already exists
                 # Keep the existing one, delete this duplicate
-                conn.execute("DELETE FROM prices WHERE id = ?", (p['id'],))
+                delete_prices(conn, "id = ?", (p['id'],))
                 conflicts += 1
     
     print(f"  Remapped: {remapped:,} prices")
@@ -345,10 +358,8 @@ def main():
         list(new_ids)
     ).fetchone()[0]
     
-    conn.execute(
-        f"DELETE FROM prices WHERE commodity_id NOT IN ({','.join('?' * len(new_ids))})",
-        list(new_ids)
-    )
+    # Tombstones let /api/changes mirrors drop them too
+    delete_prices(conn, f"commodity_id NOT IN ({','.join('?' * len(new_ids))})", list(new_ids))
     print(f"  Deleted {orphan_prices:,} orphaned prices")
     
     # Delete old commodities (ones not in our new set)
@@ -374,6 +385,8 @@ def main():
     conn.execute("UPDATE commodities SET specification = TRIM(specification) WHERE specification IS NOT NULL")
     
     # === PHASE 6: VACUUM ===
+    # Invalidate API caches keyed on the data version
+    bump_data_version(conn)
     conn.commit()
     
     # Stats after
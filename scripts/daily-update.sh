@@ -22,6 +22,10 @@ fi
 # 3. Commit and push
 echo "[2/3] Committing updated data..."
 git add data/prices.db
+# Archived years live in their own files next to the DB; deploy them with it
+if [ -d data/archive ]; then
+  git add data/archive
+fi
 DATE=$(date +%Y-%m-%d)
 git commit -m "Auto-update price data ${DATE}"
 git push origin main
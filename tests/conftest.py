@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests import the flat root modules (database, rows, scraper.*) the same way the scripts do
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
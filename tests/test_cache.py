@@ -0,0 +1,69 @@
+"""Caches keyed on the database instance and data version (api/cache.py)."""
+import os
+
+import pytest
+
+import database
+from api import cache
+
+
+def _make_db(path, price):
+    database.init_db(path)
+    database.store_parsed_data([{"date": "2025-03-04", "source_type": "daily", "source_file": "a.pdf",
+                                 "commodities": [{"name": "Rice", "category": "RICE", "price": price}]}], path)
+
+
+@pytest.fixture
+def use_db(monkeypatch):
+    def use(path):
+        monkeypatch.setattr(database, "DB_PATH", path)
+        monkeypatch.setattr(cache, "_version_checked_at", 0.0)
+    return use
+
+
+def test_databases_at_the_same_version_have_different_keys(tmp_path):
+    first, second = str(tmp_path / "a.db"), str(tmp_path / "b.db")
+    _make_db(first, 50.0)
+    _make_db(second, 60.0)
+    assert database.get_data_version(first) == database.get_data_version(second) == 1
+    assert database.get_data_key(first) != database.get_data_key(second)
+    assert database.get_data_key(first).endswith("-v1")
+
+    # The id survives re-initializing the same database
+    key = database.get_data_key(first)
+    database.init_db(first)
+    assert database.get_data_key(first) == key
+
+
+def test_shared_cache_does_not_serve_another_databases_payload(tmp_path, use_db):
+    first, second = str(tmp_path / "a.db"), str(tmp_path / "b.db")
+    _make_db(first, 50.0)
+    _make_db(second, 60.0)
+    cache_dir = str(tmp_path / "cache")
+    latest = lambda: database.get_latest_prices()["prices"][0]["price"]
+
+    use_db(first)
+    assert cache.SharedCache(cache_dir).get("latest", latest) == 50.0
+
+    # A new worker (empty in-process cache) on the other database at the same version
+    use_db(second)
+    shared = cache.SharedCache(cache_dir)
+    assert shared.get("latest", latest) == 60.0
+    assert shared.builds == 1
+    # The first database's payload was cleaned up
+    assert sorted(os.listdir(cache_dir)) == [f"latest-{database.get_data_key(second)}.json", "latest.lock"]
+
+
+def test_response_cache_is_dropped_for_another_database(tmp_path, use_db):
+    first, second = str(tmp_path / "a.db"), str(tmp_path / "b.db")
+    _make_db(first, 50.0)
+    _make_db(second, 60.0)
+
+    @cache.cached_response(maxsize=4)
+    def latest_price():
+        return database.get_latest_prices()["prices"][0]["price"]
+
+    use_db(first)
+    assert latest_price().body == b"50.0"
+    use_db(second)
+    assert latest_price().body == b"60.0"
@@ -0,0 +1,75 @@
+"""Changes feed (database.iter_changes): row ids, deletion tombstones, connection cleanup."""
+import sqlite3
+
+import pytest
+
+import database
+
+COMMODITIES = [("Rice", "RICE", "Well milled"), ("Tilapia", "FISH PRODUCTS", None)]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "prices.db")
+    database.init_db(path)
+    database.store_parsed_data([
+        {"date": date, "source_type": "daily", "source_file": f"{date}.pdf",
+         "commodities": [{"name": name, "category": category, "specification": spec, "price": 40.0 + i}
+                         for i, (name, category, spec) in enumerate(COMMODITIES)]}
+        for date in ["2026-02-02", "2026-02-03"]
+    ], path)
+    return path
+
+
+def price_ids(path):
+    conn = sqlite3.connect(path)
+    ids = [row[0] for row in conn.execute("SELECT id FROM prices ORDER BY id")]
+    conn.close()
+    return ids
+
+
+def test_rows_carry_price_id(db_path):
+    changes = list(database.iter_changes(0, db_path=db_path))
+    assert sorted(change["id"] for change in changes) == price_ids(db_path)
+    assert not any(change.get("deleted") for change in changes)
+
+
+def test_deleted_rows_come_as_tombstones(db_path):
+    seq = database.get_change_seq(db_path)
+    conn = database.get_db(db_path)
+    deleted_id = conn.execute("SELECT id FROM prices WHERE date = '2026-02-03' ORDER BY id").fetchone()[0]
+    assert database.delete_prices(conn, "id = ?", (deleted_id,)) == 1
+    conn.commit()
+    conn.close()
+
+    changes = list(database.iter_changes(seq, db_path=db_path))
+    assert changes == [{
+        "seq": seq + 1, "id": deleted_id, "deleted": True, "date": "2026-02-03",
+        "commodity_id": changes[0]["commodity_id"], "source_type": "daily",
+        "updated_at": changes[0]["updated_at"],
+    }]
+    assert database.get_change_seq(db_path) == seq + 1
+    assert deleted_id not in price_ids(db_path)
+
+    # A timestamp cursor sees the tombstone too, in seq order with the live rows
+    changes = list(database.iter_changes(since_time="2000-01-01", db_path=db_path))
+    assert [change["seq"] for change in changes] == sorted(change["seq"] for change in changes)
+    assert [change["id"] for change in changes if change.get("deleted")] == [deleted_id]
+
+
+def test_closing_the_generator_closes_the_connection(db_path, monkeypatch):
+    opened = []
+    get_db = database.get_db
+
+    def recording_get_db(*args, **kwargs):
+        conn = get_db(*args, **kwargs)
+        opened.append(conn)
+        return conn
+
+    monkeypatch.setattr(database, "get_db", recording_get_db)
+    changes = database.iter_changes(0, db_path=db_path)
+    next(changes)
+    changes.close()  # a client disconnecting mid-stream
+
+    with pytest.raises(sqlite3.ProgrammingError):
+        opened[0].execute("SELECT 1")
@@ -0,0 +1,101 @@
+"""Multi-page crawl against a local mock of the price monitoring site (scraper.crawler)."""
+import functools
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from scraper.crawler import crawl_pdf_links
+
+PAGES = {
+    "price-monitoring/index.html": """
+        <a href="/price-monitoring/page/2/">Older</a>
+        <a href="/price-monitoring/2024/">2024 archive</a>
+        <a href="/uploads/02082026-PRICE-MONITORING.pdf">Daily Price Index February 8, 2026</a>
+        <a href='/uploads/weekly-1.pdf'><strong>Weekly Average Prices</strong> January 26 - February 1, 2026</a>
+        <a href="/about/">About</a>
+        <a href="https://elsewhere.example/price-monitoring/page/9/">Mirror</a>
+    """,
+    "price-monitoring/page/2/index.html": """
+        <a href="/price-monitoring/">Newer</a>
+        <a href="/uploads/02082026-PRICE-MONITORING.pdf#page=1">Daily Price Index February 8, 2026</a>
+        <a href="/uploads/Cigarette-Price-Monitoring.pdf">Cigarette Price Monitoring January 5, 2026</a>
+        <a href="/uploads/02072026-PRICE-MONITORING.pdf">Febr uary 7, 2026</a>
+    """,
+    "price-monitoring/2024/index.html": """
+        <a href="/uploads/Daily-Price-Index-December-2-2024.pdf">DPI &amp; more</a>
+        <a href="/price-monitoring/2024/page/2/">Next</a>
+    """,
+    "price-monitoring/2024/page/2/index.html": """
+        <a href="/uploads/report.pdf">Annual report</a>
+    """,
+}
+
+
+class _Handler(SimpleHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        self.requests.append((self.path, self.headers.get("If-Modified-Since")))
+        super().do_GET()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def site(tmp_path):
+    root = tmp_path / "site"
+    for path, body in PAGES.items():
+        (root / path).parent.mkdir(parents=True, exist_ok=True)
+        (root / path).write_text(body)
+    _Handler.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(_Handler, directory=str(root)))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/price-monitoring/"
+    server.shutdown()
+    server.server_close()
+
+
+def _urls(links):
+    return [link["url"].rsplit("/", 1)[-1] for link in links]
+
+
+def test_follows_pagination_and_archives(site, tmp_path):
+    results = crawl_pdf_links(site, workers=3, cache_dir=str(tmp_path / "cache"))
+    assert _urls(results["daily"]) == [
+        "02082026-PRICE-MONITORING.pdf", "02072026-PRICE-MONITORING.pdf", "Daily-Price-Index-December-2-2024.pdf",
+    ]
+    assert [link["date"] for link in results["daily"]] == ["2026-02-08", "2026-02-07", "2024-12-02"]
+    assert results["daily"][2]["text"] == "DPI & more"
+
+    weekly, = results["weekly"]
+    assert weekly["text"] == "Weekly Average Prices January 26 - February 1, 2026"
+    assert weekly["date_range"]["start"] == "2026-01-26"
+    assert weekly["date"] == "2026-02-01"
+    assert [link["date"] for link in results["cigarette"]] == ["2026-01-05"]
+    assert _urls(results["other"]) == ["report.pdf"]
+
+    # Every page once; off-site and non-archive links aren't followed
+    assert sorted(path for path, _ in _Handler.requests) == [
+        "/price-monitoring/", "/price-monitoring/2024/", "/price-monitoring/2024/page/2/", "/price-monitoring/page/2/",
+    ]
+
+
+def test_max_pages(site, tmp_path):
+    results = crawl_pdf_links(site, max_pages=1, cache_dir=str(tmp_path / "cache"))
+    assert len(_Handler.requests) == 1
+    assert _urls(results["daily"]) == ["02082026-PRICE-MONITORING.pdf"]
+
+
+def test_recrawl_revalidates_cached_pages(site, tmp_path, capsys):
+    cache_dir = str(tmp_path / "cache")
+    first = crawl_pdf_links(site, cache_dir=cache_dir)
+    _Handler.requests = []
+    second = crawl_pdf_links(site, cache_dir=cache_dir)
+
+    assert second == first
+    assert len(_Handler.requests) == 4
+    assert all(since is not None for _, since in _Handler.requests)
+    assert "Fetched 4 pages (4 unchanged)" in capsys.readouterr().out
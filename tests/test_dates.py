@@ -0,0 +1,84 @@
+"""Date extraction from link text, PDF URLs and PDF headers (scraper/dates.py)."""
+import pytest
+
+from scraper.dates import (
+    HEADER_CHARS, month_number, parse_date, parse_header_date, parse_url_date, parse_weekly_date,
+)
+
+
+@pytest.mark.parametrize("name, number", [
+    ("January", "01"), ("Feb.", "02"), ("sept", "09"), ("DECEMBER", "12"),
+    ("Febr uary", "02"), ("Janu ary", "01"), ("MARHC", "03"), ("Marhc", "03"),
+    ("Smarch", None), ("", None),
+])
+def test_month_number(name, number):
+    assert month_number(name) == number
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Price Monitoring February 8, 2026", "2026-02-08"),
+    ("Feb. 8, 2026", "2026-02-08"),
+    ("September 30 2025", "2025-09-30"),
+    ("DAILY PRICE INDEX JANUARY 2,2026", "2026-01-02"),
+])
+def test_parse_date(text, expected):
+    assert parse_date(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Febr uary 8, 2026", "2026-02-08"),
+    ("Janu ary 15, 2025", "2025-01-15"),
+    ("Septem ber 1, 2025", "2025-09-01"),
+])
+def test_parse_date_split_month_names(text, expected):
+    assert parse_date(text) == expected
+
+
+def test_parse_date_marhc_typo():
+    assert parse_date("Daily Price Index MARHC 4, 2025") == "2025-03-04"
+
+
+def test_parse_date_skips_impossible_days_and_words_ending_in_a_month():
+    assert parse_date("Smarch 3, 2025") is None
+    assert parse_date("March 45, 2025 then March 5, 2025") == "2025-03-05"
+    assert parse_date("no date here") is None
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("https://www.da.gov.ph/wp-content/uploads/2026/02/02082026-PRICE-MONITORING.pdf", "2026-02-08"),
+    ("https://www.da.gov.ph/wp-content/uploads/2025/12/Daily-Price-Index-December-1-2025.pdf", "2025-12-01"),
+    ("https://www.da.gov.ph/wp-content/uploads/2025/03/Price-Monitoring-Marhc-4-2025.pdf", "2025-03-04"),
+    ("https://www.da.gov.ph/wp-content/uploads/2025/09/Sept-9-2025.pdf", "2025-09-09"),
+    ("https://www.da.gov.ph/wp-content/uploads/2025/03/price-monitoring.pdf", None),
+    # MMDDYYYY that isn't a date
+    ("https://www.da.gov.ph/wp-content/uploads/2026/02/13452026-PRICE-MONITORING.pdf", None),
+    ("https://www.da.gov.ph/wp-content/uploads/2026/02/02302026-PRICE-MONITORING.pdf", None),
+])
+def test_parse_url_date(url, expected):
+    assert parse_url_date(url) == expected
+
+
+def test_parse_header_date_only_reads_the_header():
+    assert parse_header_date("Price Monitoring March 4, 2025\n" + "x" * 5000) == "2025-03-04"
+    assert parse_header_date("x" * HEADER_CHARS + " March 4, 2025") is None
+
+
+@pytest.mark.parametrize("text, start, end", [
+    # same month
+    ("January 26-31, 2026", "2026-01-26", "2026-01-31"),
+    ("Prevailing prices for January 26 – 31, 2026", "2026-01-26", "2026-01-31"),
+    # across months
+    ("January 26 - February 1, 2026", "2026-01-26", "2026-02-01"),
+    ("Febr uary 23 - Marhc 1, 2025", "2025-02-23", "2025-03-01"),
+    # across years
+    ("December 29, 2025 - January 3, 2026", "2025-12-29", "2026-01-03"),
+    ("Dec. 29, 2025 — Jan. 3, 2026", "2025-12-29", "2026-01-03"),
+    ("December 29 - January 3, 2026", "2025-12-29", "2026-01-03"),
+])
+def test_parse_weekly_date(text, start, end):
+    assert parse_weekly_date(text) == {"raw": text, "start": start, "end": end}
+
+
+def test_parse_weekly_date_without_a_range():
+    assert parse_weekly_date("Weekly Average Prices") == {"raw": "Weekly Average Prices", "start": None, "end": None}
+    assert parse_weekly_date("January 26, 2026") == {"raw": "January 26, 2026", "start": None, "end": None}
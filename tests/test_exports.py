@@ -0,0 +1,32 @@
+"""Columnar exports keyed on the database instance and data version (exports.py)."""
+import os
+
+import pytest
+
+import database
+import exports
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def _make_db(path, price):
+    database.init_db(path)
+    database.store_parsed_data([{"date": "2025-03-04", "source_type": "daily", "source_file": "a.pdf",
+                                 "commodities": [{"name": "Rice", "category": "RICE", "price": price}]}], path)
+
+
+def test_databases_at_the_same_version_get_their_own_exports(tmp_path):
+    first, second = str(tmp_path / "a.db"), str(tmp_path / "b.db")
+    _make_db(first, 50.0)
+    _make_db(second, 60.0)
+    export_dir = str(tmp_path / "exports")
+
+    path = exports.get_columnar_export("parquet", database.get_data_key(first), first, export_dir)
+    assert pq.read_table(path).column("price").to_pylist() == [50.0]
+
+    other = exports.get_columnar_export("parquet", database.get_data_key(second), second, export_dir)
+    assert other != path
+    assert pq.read_table(other).column("price").to_pylist() == [60.0]
+    # The other database's files were cleaned up
+    key = database.get_data_key(second)
+    assert sorted(os.listdir(export_dir)) == ["export.lock", f"ph-price-index-{key}.arrow", f"ph-price-index-{key}.parquet"]
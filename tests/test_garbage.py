@@ -0,0 +1,83 @@
+"""Garbage-text detection for extracted PDF text (scraper.parser.garbage_score)."""
+from scraper.parser import (
+    CIGARETTE_KEYWORDS, GARBAGE_SAMPLE_CHARS, FOOD_KEYWORDS, _is_garbage_text, garbage_score,
+)
+
+PRICE_SHEET = (
+    "DEPARTMENT OF AGRICULTURE\nDAILY PRICE INDEX\nNational Capital Region\nMarch 4, 2025\n"
+    "COMMODITY SPECIFICATION PREVAILING RETAIL PRICE PER UNIT (P/UNIT)\n"
+    "IMPORTED COMMERCIAL RICE\nSpecial Rice White Rice 60.00\nPremium 5% broken 52.00\n"
+    "FISH PRODUCTS\nBangus Large 240.00\nTilapia Medium (5-6 pcs/kg) 150.00\n"
+    "PORK MEAT PRODUCTS\nPork Kasim 330.00\nPork Liempo 380.00\n"
+    "FRESH WHOLE CHICKEN\nWhole Chicken Fully Dressed 190.00\n"
+)
+# Text pulled out of an image-only PDF: mostly glyphs from a font without a usable cmap
+GLYPH_SOUP = "□■•ΔΩ" * 40
+
+
+def test_price_sheet_is_not_garbage():
+    score = garbage_score(PRICE_SHEET)
+    assert score["garbage"] is False
+    assert score["reason"] is None
+    assert score["keywords"] >= 4
+    assert score["readable_ratio"] > 0.95
+    assert 0.9 <= score["confidence"] <= 1.0
+
+
+def test_too_short():
+    score = garbage_score("  Rice 45.00  \n")
+    assert score["garbage"] is True
+    assert score["reason"] == "too_short"
+    assert garbage_score("")["reason"] == "too_short"
+
+
+def test_unreadable_text():
+    score = garbage_score(GLYPH_SOUP)
+    assert score["garbage"] is True
+    assert score["reason"] == "unreadable"
+    assert score["readable_ratio"] == 0.0
+    assert score["confidence"] == 1.0
+
+
+def test_unreadable_confidence_grows_as_readability_falls():
+    half = garbage_score("rice price " * 8 + GLYPH_SOUP[:150])
+    worse = garbage_score("rice price " * 2 + GLYPH_SOUP[:150])
+    assert half["reason"] == worse["reason"] == "unreadable"
+    assert worse["readable_ratio"] < half["readable_ratio"] < 0.4
+    assert 0.5 < half["confidence"] < worse["confidence"] <= 1.0
+
+
+def test_peso_sign_and_accents_are_readable():
+    text = "Presyo ng bigas at isda sa palengke: ₱45.00, ₱52.50, ₱60.00 — Pasig, Parañaque, Las Piñas " * 3
+    score = garbage_score(text, ["bigas", "isda"])
+    assert score["garbage"] is False
+    assert score["readable_ratio"] > 0.95
+
+
+def test_readable_text_without_keywords():
+    text = "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor. " * 3
+    none = garbage_score(text)
+    assert none["garbage"] is True
+    assert none["reason"] == "no_keywords"
+    assert none["keywords"] == 0
+    one = garbage_score(text + " fish")
+    assert one["reason"] == "no_keywords"
+    assert one["keywords"] == 1
+    assert one["confidence"] < none["confidence"]
+
+
+def test_keywords_are_case_insensitive_and_per_report_type():
+    cigarette = "CIGARETTE BRAND MONITORING\nMarlboro Red 20 sticks per pack, SRP 180.00\n" * 2
+    assert garbage_score(cigarette, CIGARETTE_KEYWORDS)["garbage"] is False
+    assert garbage_score(cigarette, FOOD_KEYWORDS)["reason"] == "no_keywords"
+
+
+def test_only_the_start_of_the_text_is_judged():
+    filler = " " * (GARBAGE_SAMPLE_CHARS - len(PRICE_SHEET))
+    assert garbage_score(PRICE_SHEET + filler + GLYPH_SOUP * 50)["garbage"] is False
+    assert garbage_score(GLYPH_SOUP * 50 + PRICE_SHEET)["reason"] == "unreadable"
+
+
+def test_is_garbage_text_follows_the_score():
+    for text in (PRICE_SHEET, GLYPH_SOUP, "short", "no food words here at all, just a long enough sentence."):
+        assert _is_garbage_text(text) is garbage_score(text)["garbage"]
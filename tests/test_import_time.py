@@ -0,0 +1,31 @@
+"""Importing the API stays fast and leaves scraper-only dependencies out (see scripts/check_import_time.py)."""
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_MS = 1500
+# Only the scraper / export builds need these
+FORBIDDEN = ["PyPDF2", "bs4", "requests", "pyarrow", "scraper"]
+
+LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)$")
+
+
+def test_api_import_time_and_modules():
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import api.main"],
+        cwd=ROOT, capture_output=True, text=True,
+        env={**os.environ, "PH_WARMUP": "0"},
+    )
+    assert result.returncode == 0, result.stderr
+
+    cumulative_us = {}
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            cumulative_us[match.group(3)] = int(match.group(2))
+
+    assert cumulative_us["api.main"] / 1000 <= BUDGET_MS
+    imported = {name.split(".")[0] for name in cumulative_us}
+    assert [module for module in FORBIDDEN if module in imported] == []
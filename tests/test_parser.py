@@ -0,0 +1,23 @@
+"""Category headers in extracted price-sheet text (scraper.parser)."""
+import pytest
+
+from scraper.parser import KNOWN_CATEGORIES, _detect_category, _parse_price_text
+
+
+@pytest.mark.parametrize("category", KNOWN_CATEGORIES)
+def test_known_category_headers(category):
+    assert _detect_category(category) == category
+    assert _detect_category(f"  {category.title()} ") == category
+
+
+def test_vegetable_subcategories_are_not_folded_into_vegetables():
+    text = (
+        "LOWLAND VEGETABLES\nAmpalaya 4-5 pcs/kg 120.00\n"
+        "HIGHLAND VEGETABLES\nCabbage Rareball 90.00\n"
+        "VEGETABLES\nKangkong 60.00\n"
+    )
+    assert [(c["name"], c["category"]) for c in _parse_price_text(text)] == [
+        ("Ampalaya 4-5 pcs/kg", "LOWLAND VEGETABLES"),
+        ("Cabbage Rareball", "HIGHLAND VEGETABLES"),
+        ("Kangkong", "VEGETABLES"),
+    ]
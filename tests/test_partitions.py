@@ -0,0 +1,93 @@
+"""Archived year partitions beyond SQLite's attach limit (database._prices_from)."""
+import os
+import sqlite3
+
+import pytest
+
+import database
+
+FIRST_YEAR, LAST_YEAR = 2009, 2024
+ARCHIVED = list(range(FIRST_YEAR, LAST_YEAR - 1))  # 14 years, more than SQLITE_MAX_ATTACHED
+COMMODITIES = [("Rice", "RICE", "Well milled"), ("Tilapia", "FISH PRODUCTS", None), ("Pork Kasim", "PORK", None)]
+DATES = ["01-05", "06-15", "12-28"]
+
+
+@pytest.fixture(scope="module")
+def archived_db(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("partitions") / "prices.db")
+    database.init_db(path)
+    database.store_parsed_data([
+        {"date": f"{year}-{day}", "source_type": "daily", "source_file": f"{year}-{day}.pdf",
+         "commodities": [{"name": name, "category": category, "specification": spec,
+                          "price": float(year - 2000 + i)}
+                         for i, (name, category, spec) in enumerate(COMMODITIES)]}
+        for year in range(FIRST_YEAR, LAST_YEAR + 1) for day in DATES
+    ], path)
+    before = list(database.export_all(path))
+    for year in ARCHIVED:
+        database.archive_year(year, path)
+    return path, before
+
+
+@pytest.fixture(params=["rw", "ro"])
+def mode(request, monkeypatch):
+    monkeypatch.setattr(database, "DB_MODE", request.param)
+    yield request.param
+    # Pooled serving connections are per thread; don't hand them to the next test
+    database._pool.conns = {}
+
+
+def test_more_archives_than_attachable(archived_db):
+    path, _ = archived_db
+    conn = database.get_db(path, mode="rw")
+    assert len(database._archived_partitions(conn)) > conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+    assert conn.execute("SELECT COUNT(*) FROM prices").fetchone()[0] == 2 * len(DATES) * len(COMMODITIES)
+    conn.close()
+
+
+def test_full_history_queries(archived_db, mode):
+    path, before = archived_db
+    total = (LAST_YEAR - FIRST_YEAR + 1) * len(DATES) * len(COMMODITIES)
+
+    assert list(database.export_all(path)) == before
+    assert sum(len(chunk) for chunk in database.export_chunks(db_path=path)) == total
+    assert len(database.export_columns(path)["price"]) == total
+    assert len(list(database.iter_changes(since_seq=0, db_path=path))) == total
+    assert len(database.get_price_points(db_path=path)["days"]) == (LAST_YEAR - FIRST_YEAR + 1) * len(DATES)
+    assert database.get_all_commodities(db_path=path)["meta"]["total"] == len(COMMODITIES)
+
+    stats = database.get_stats(path)
+    assert stats["total_prices"] == total
+    assert stats["total_dates"] == (LAST_YEAR - FIRST_YEAR + 1) * len(DATES)
+    assert (stats["first_date"], stats["last_date"]) == (f"{FIRST_YEAR}-01-05", f"{LAST_YEAR}-12-28")
+
+
+def test_repeated_and_narrow_queries_on_one_connection(archived_db, mode):
+    path, _ = archived_db
+    for _ in range(2):
+        rows = database.get_prices_range(f"{FIRST_YEAR}-01-01", f"{LAST_YEAR}-12-31", db_path=path)
+        assert len(rows) == (LAST_YEAR - FIRST_YEAR + 1) * len(DATES) * len(COMMODITIES)
+        for year in (FIRST_YEAR, 2015, LAST_YEAR):
+            prices = database.get_prices_by_date(f"{year}-06-15", db_path=path)["prices"]
+            assert sorted(p["price"] for p in prices) == [float(year - 2000 + i) for i in range(len(COMMODITIES))]
+        history = database.get_commodity_history("Rice", date_from="2010-01-01", date_to="2019-12-31", db_path=path)
+        assert len(history) == 10 * len(DATES)
+
+
+def test_reconcile_stats_finds_no_drift(archived_db):
+    path, _ = archived_db
+    assert database.reconcile_stats(path) == {}
+
+
+def test_missing_archive_is_skipped(archived_db, capsys):
+    path, _ = archived_db
+    archive = os.path.join(os.path.dirname(path), "archive", f"prices-{FIRST_YEAR}.db")
+    hidden = archive + ".hidden"
+    os.rename(archive, hidden)
+    try:
+        rows = list(database.export_all(path))
+        assert {row["date"][:4] for row in rows} == {str(y) for y in range(FIRST_YEAR + 1, LAST_YEAR + 1)}
+        assert database.get_prices_by_date(f"{FIRST_YEAR}-06-15", db_path=path)["prices"] == []
+        assert f"prices-{FIRST_YEAR}.db for {FIRST_YEAR} is missing" in capsys.readouterr().out
+    finally:
+        os.rename(hidden, archive)